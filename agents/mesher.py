@@ -1,50 +1,313 @@
 import os
+from typing import List, Optional
+
 import gmsh
+import numpy as np
 from core.types import Artifact, ArtifactType, AgentResult, AgentStatus
+from core.session import GmshSession
+from core.mesh_io import MESH_BIN_EXT
+from core.fineness import mesh_size_factor
+from core.assembly import fragment_volumes, mesh_assembly, surface_groups, weld
+from core.instances import find_instances, place
+from core.sizing import AdaptiveSizing, size_fields
+
+# Gmsh Mesh.Algorithm values by name
+ALGORITHMS_2D = {
+    "meshadapt": 1,
+    "automatic": 2,
+    "delaunay": 5,
+    "frontal-delaunay": 6,
+    "bamg": 7,
+    "frontal-quad": 8,
+    "packing-parallelograms": 9,
+    "quasi-structured-quad": 11,
+}
+
+
+def default_threads() -> int:
+    return os.cpu_count() or 1
+
 
 class MesherAgent:
-    def __init__(self, name="Mesher"):
+    def __init__(self, name="Mesher", threads: Optional[int] = None, algorithm: Optional[str] = None,
+                 assembly_workers: Optional[int] = None, dedupe_instances: bool = True,
+                 sizing: Optional[AdaptiveSizing] = None):
         self.name = name
+        # Gmsh meshes independent surfaces in parallel (when built with OpenMP).
+        # threads=None uses every core; batch workers pass their share of the cores.
+        self.threads = threads or default_threads()
+        if algorithm is not None and algorithm not in ALGORITHMS_2D:
+            raise ValueError(f"Unknown 2D meshing algorithm: {algorithm}")
+        self.algorithm = algorithm
+        # Multi-body models are meshed body by body on this many processes (None/1: off)
+        self.assembly_workers = assembly_workers
+        self._assembly = None  # (source_path, conformal BREP path, surface groups)
+        # Repeated solids are meshed once and copied to every placement
+        self.dedupe_instances = dedupe_instances
+        self._instances = None  # (source_path, instance groups)
+        # Last surface-tagged mesh, kept so failing surfaces can be remeshed on their own
+        self._last = None
+        # Curvature/feature-size adaptive element sizes (None: one global size from fineness)
+        self.sizing = sizing
 
-    def run(self, input_artifact: Artifact, output_dir: str, fineness: float = 0.5) -> AgentResult:
+    def run(self, input_artifact: Artifact, output_dir: str, fineness: float = 0.5,
+            session: Optional[GmshSession] = None) -> AgentResult:
         if input_artifact.type not in [ArtifactType.BREP_FILE, ArtifactType.STEP_FILE]:
             return AgentResult(AgentStatus.FAILURE, error=f"Invalid input type: {input_artifact.type}")
 
         input_path = input_artifact.path
-        filename = os.path.basename(input_path).replace(".brep", ".stl").replace(".step", ".stl")
-        output_path = os.path.join(output_dir, filename)
+        source_path = input_artifact.metadata.get("source_path", input_path)
+        base = input_artifact.metadata.get("model_name") or os.path.splitext(os.path.basename(source_path))[0]
+        output_path = os.path.join(output_dir, f"{base}{MESH_BIN_EXT}")
+
+        owns_session = session is None
+        if owns_session:
+            session = GmshSession()
 
         try:
-            gmsh.initialize()
-            gmsh.option.setNumber("General.Terminal", 1)
-            gmsh.open(input_path)
+            # Reuse the geometry the Parser left in memory; only the mesh is regenerated
+            reused = session.is_loaded(source_path)
+            if reused:
+                session.clear_mesh()
+            else:
+                session.load(input_path)
 
             # Set Mesh Fineness
             # Gmsh Mesh.MeshSizeFactor: smaller is finer
             # Mapping fineness (0.0-1.0) to MeshSizeFactor (1.0 - 0.1)
-            mesh_factor = 1.0 - (fineness * 0.9)
+            mesh_factor = mesh_size_factor(fineness)
+            assembly = self._use_assembly(source_path)
+            if assembly:
+                self._prepare_assembly(session, source_path, output_dir, base)
             gmsh.option.setNumber("Mesh.MeshSizeFactor", mesh_factor)
 
-            # Generate 2D Mesh (Surface)
-            gmsh.model.mesh.generate(2)
+            # Threading and algorithm are session-wide options, so they are set on every run
+            gmsh.option.setNumber("General.NumThreads", self.threads)
+            gmsh.option.setNumber("Mesh.MaxNumThreads2D", self.threads)
+            if self.algorithm is not None:
+                gmsh.option.setNumber("Mesh.Algorithm", ALGORITHMS_2D[self.algorithm])
+
+            sizes = None
+            if self.sizing is not None:
+                sizes = self.sizing.sizes(self.sizing.analyze(source_path), mesh_factor)
+
+            metadata = {"fineness": fineness, "threads": self.threads}
+            if sizes is not None:
+                metadata["sizing"] = "adaptive"
+            with size_fields(sizes):
+                if assembly:
+                    vertices, faces, tasks = self._mesh_assembly(mesh_factor, sizes)
+                    metadata.update({"assembly_tasks": tasks, "assembly_workers": self.assembly_workers})
+                elif self._instance_groups(input_artifact, source_path, reused):
+                    vertices, faces, copies = self._mesh_instances(self._instances[1])
+                    metadata["instance_copies"] = copies
+                else:
+                    # Generate 2D Mesh (Surface)
+                    gmsh.model.mesh.generate(2)
+
+                    # Pull the triangles straight out of Gmsh instead of an STL write/re-read.
+                    # The file at output_path is only written when the artifact is materialized.
+                    # Each face keeps its CAD surface tag so failures can be traced back to surfaces.
+                    vertices, faces, face_surfaces = self.extract_triangles(with_surfaces=True)
+                    metadata["face_surfaces"] = face_surfaces
+                    self._last = {"source_path": source_path, "factor": mesh_factor, "sizes": sizes, "fineness": {},
+                                  "vertices": vertices, "faces": faces, "face_surfaces": face_surfaces}
+            metadata["face_count"] = len(faces)
 
-            # Export
-            gmsh.write(output_path)
-            
-            # Get Node/Element counts
-            # (Optional: could extract from gmsh.model.mesh.getNodes())
-            
         except Exception as e:
             return AgentResult(AgentStatus.FAILURE, error=str(e))
         finally:
-            gmsh.finalize()
+            if owns_session:
+                session.close()
 
         return AgentResult(
             status=AgentStatus.SUCCESS,
             artifact=Artifact(
-                type=ArtifactType.STL_FILE,
+                type=ArtifactType.MESH_BIN,
                 path=output_path,
-                metadata={"fineness": fineness}
+                metadata=metadata,
+                payload=(vertices, faces),
+                persisted=False
             ),
-            log=f"Meshed with fineness {fineness}"
+            log=f"Meshed with fineness {fineness} ({self.threads} threads)"
         )
+
+    def remesh_surfaces(self, input_artifact: Artifact, output_dir: str, surfaces: List[int],
+                        fineness: float, session: GmshSession) -> AgentResult:
+        """
+        Remeshes only `surfaces` of the last mesh generated for this model, with element
+        sizes scaled to `fineness`. Every other face and every boundary curve node is kept,
+        so the cost follows the size of the defect rather than the model.
+        """
+        source_path = input_artifact.metadata.get("source_path", input_artifact.path)
+        last = self._last
+        if last is None or last["source_path"] != source_path or not session.is_loaded(source_path):
+            return AgentResult(AgentStatus.FAILURE, error="No surface-tagged mesh of this model to remesh locally")
+
+        surfaces = sorted(set(surfaces))
+        try:
+            # 1. Target size per surface: its current edge length, scaled by the fineness step
+            interior = {}
+            for surface in surfaces:
+                current = last["fineness"].get(surface)
+                ratio = mesh_size_factor(fineness) / (mesh_size_factor(current) if current is not None else last["factor"])
+                # Mesh.MeshSizeFactor also scales field sizes, so divide it back out
+                interior[surface] = self._edge_length(last, surface) * ratio / last["factor"]
+
+            # 2. Boundary curves are regenerated with the original settings (including adaptive
+            #    sizes), so they come out node for node identical; the interior sizes refine the
+            #    failing surfaces only
+            session.clear_mesh()
+            gmsh.option.setNumber("Mesh.MeshSizeFactor", last["factor"])
+
+            # Only the failing surfaces and their own curves are meshed
+            everything = gmsh.model.getEntities()
+            gmsh.model.setVisibility(everything, 0)
+            gmsh.model.setVisibility([(2, s) for s in surfaces], 1, recursive=True)
+            gmsh.option.setNumber("Mesh.MeshOnlyVisible", 1)
+            try:
+                with size_fields(last["sizes"], interior=interior):
+                    gmsh.model.mesh.generate(2)
+            finally:
+                gmsh.option.setNumber("Mesh.MeshOnlyVisible", 0)
+                gmsh.model.setVisibility(everything, 1)
+            new_part = self.extract_triangles(surfaces, with_surfaces=True)
+
+            # 3. Splice the new patches into the kept faces along the shared curve nodes
+            keep = ~np.isin(last["face_surfaces"], surfaces)
+            kept_part = (last["vertices"], last["faces"][keep], last["face_surfaces"][keep])
+            extent = np.ptp(last["vertices"], axis=0).max() if len(last["vertices"]) else 1.0
+            vertices, faces = weld([kept_part[:2], new_part[:2]], tolerance=extent * 1e-9)
+            used, faces = np.unique(faces, return_inverse=True)
+            vertices, faces = vertices[used], faces.reshape(-1, 3)
+            face_surfaces = np.concatenate([kept_part[2], new_part[2]])
+        except Exception as e:
+            return AgentResult(AgentStatus.FAILURE, error=str(e))
+
+        last.update(vertices=vertices, faces=faces, face_surfaces=face_surfaces)
+        last["fineness"].update({surface: fineness for surface in surfaces})
+        base = input_artifact.metadata.get("model_name") or os.path.splitext(os.path.basename(source_path))[0]
+        return AgentResult(
+            status=AgentStatus.SUCCESS,
+            artifact=Artifact(
+                type=ArtifactType.MESH_BIN,
+                path=os.path.join(output_dir, f"{base}{MESH_BIN_EXT}"),
+                metadata={"fineness": fineness, "face_count": len(faces), "threads": self.threads,
+                          "remeshed_surfaces": surfaces, "face_surfaces": face_surfaces},
+                payload=(vertices, faces),
+                persisted=False
+            ),
+            log=f"Remeshed {len(surfaces)} surface(s) with fineness {fineness} "
+                f"({int((~keep).sum())} faces replaced by {len(new_part[1])})"
+        )
+
+    @staticmethod
+    def _edge_length(last: dict, surface: int) -> float:
+        faces = last["faces"][last["face_surfaces"] == surface]
+        if not len(faces):
+            return float(np.ptp(last["vertices"], axis=0).max())
+        corners = last["vertices"][faces]
+        return float(np.linalg.norm(corners - np.roll(corners, 1, axis=1), axis=2).mean())
+
+    def _instance_groups(self, input_artifact: Artifact, source_path: str, reused: bool) -> list:
+        if not self.dedupe_instances:
+            return []
+        if self._instances is None or self._instances[0] != source_path:
+            # The Parser's groups hold entity tags of the model it loaded, which are only
+            # valid while that model is still in memory; anything else is fingerprinted here
+            groups = input_artifact.metadata.get("instances") if reused else None
+            if groups is None:
+                groups = find_instances() if len(gmsh.model.getEntities(3)) > 1 else []
+            self._instances = (source_path, groups)
+        return self._instances[1]
+
+    def _mesh_instances(self, groups: list):
+        # 1. Mesh everything except the copies
+        copies = [(3, v) for group in groups for v in group["solids"][1:]]
+        gmsh.model.setVisibility(copies, 0, recursive=True)
+        gmsh.option.setNumber("Mesh.MeshOnlyVisible", 1)
+        try:
+            gmsh.model.mesh.generate(2)
+        finally:
+            gmsh.option.setNumber("Mesh.MeshOnlyVisible", 0)
+            gmsh.model.setVisibility(copies, 1, recursive=True)
+
+        # 2. Place the representative's mesh at every copy (solids are not welded to each other)
+        parts = [self.extract_triangles()]
+        for group in groups:
+            boundary = gmsh.model.getBoundary([(3, group["solids"][0])], oriented=False)
+            vertices, faces = self.extract_triangles([abs(s) for _, s in boundary])
+            parts.extend((place(vertices, transform), faces) for transform in group["transforms"][1:])
+
+        offsets = np.cumsum([0] + [len(v) for v, _ in parts])
+        vertices = np.concatenate([v for v, _ in parts])
+        faces = np.concatenate([f + offset for (_, f), offset in zip(parts, offsets)])
+        return vertices, faces, len(copies)
+
+    def _use_assembly(self, source_path: str) -> bool:
+        if not self.assembly_workers or self.assembly_workers < 2:
+            return False
+        if self._assembly is not None and self._assembly[0] == source_path:
+            return True
+        return len(gmsh.model.getEntities(3)) > 1
+
+    def _prepare_assembly(self, session: GmshSession, source_path: str, output_dir: str, base: str):
+        # 1. Make the bodies conformal once per model. The workers read the result from a BREP,
+        #    and surface tags are only stable across a write/read, so this process reloads it too.
+        if self._assembly is not None and self._assembly[0] == source_path:
+            return
+        fragment_volumes()
+        brep_path = os.path.join(output_dir, f"{base}_assembly.brep")
+        gmsh.write(brep_path)
+        session.replace(brep_path, key=source_path)
+        self._assembly = (source_path, brep_path, surface_groups())
+
+    def _mesh_assembly(self, mesh_factor: float, sizes: Optional[dict] = None):
+        _, brep_path, groups = self._assembly
+
+        # 2. Each worker meshes its bodies single-threaded; the pool provides the parallelism
+        options = {"Mesh.MeshSizeFactor": mesh_factor, "General.NumThreads": 1, "Mesh.MaxNumThreads2D": 1}
+        if self.algorithm is not None:
+            options["Mesh.Algorithm"] = ALGORITHMS_2D[self.algorithm]
+
+        # 3. Shared curves carry identical nodes in every part, so a tight weld tolerance suffices
+        xmin, ymin, zmin, xmax, ymax, zmax = gmsh.model.getBoundingBox(-1, -1)
+        diagonal = float(np.linalg.norm([xmax - xmin, ymax - ymin, zmax - zmin])) or 1.0
+        return mesh_assembly(brep_path, groups, options, self.assembly_workers, tolerance=diagonal * 1e-9,
+                             sizes=sizes)
+
+    def cache_options(self) -> dict:
+        # Settings besides fineness that change the generated mesh (part of the cache key).
+        # The thread count only changes how fast the mesh is produced, not the mesh.
+        # Assembly mode fragments touching bodies, which changes the mesh at their interfaces.
+        # Placing copies of a repeated solid yields the same surface as meshing each copy, so
+        # instance deduplication is not part of the key.
+        options = {"dim": 2, "algorithm": self.algorithm or "default"}
+        if self.assembly_workers and self.assembly_workers > 1:
+            options["assembly"] = True
+        if self.sizing is not None:
+            options.update(self.sizing.options())
+        return options
+
+    @staticmethod
+    def extract_triangles(surfaces: Optional[List[int]] = None, with_surfaces: bool = False):
+        # Gmsh node tags are not contiguous; map them to 0-based vertex indices
+        node_tags, coords, _ = gmsh.model.mesh.getNodes()
+        if surfaces is None and not with_surfaces:
+            _, tri_nodes = gmsh.model.mesh.getElementsByType(2)
+        else:
+            if surfaces is None:
+                surfaces = [s for _, s in gmsh.model.getEntities(2)]
+            blocks = [gmsh.model.mesh.getElementsByType(2, s)[1] for s in surfaces]
+            tri_nodes = np.concatenate(blocks or [[]])
+            face_surfaces = np.repeat(np.asarray(surfaces, dtype=np.int64), [len(b) // 3 for b in blocks])
+        node_tags = np.asarray(node_tags)
+        order = np.argsort(node_tags)
+        tri_nodes = np.asarray(tri_nodes, dtype=np.uint64).reshape(-1, 3)
+        faces = order[np.searchsorted(node_tags, tri_nodes, sorter=order)]
+        vertices = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+        # Drop nodes no triangle references (e.g. isolated geometry points)
+        used, faces = np.unique(faces, return_inverse=True)
+        if with_surfaces:
+            return vertices[used], faces.reshape(-1, 3), face_surfaces
+        return vertices[used], faces.reshape(-1, 3)
@@ -1,76 +1,187 @@
 import trimesh
 import trimesh.repair
 import os
+from typing import List, Optional
 from core.types import Artifact, ArtifactType, AgentResult, AgentStatus
+from core.mesh_io import load_mesh, MESH_BIN_EXT
+from core import trace
+from core.smoothing import smooth
+from core.decimation import decimate, deviation
+
+MESH_TYPES = [ArtifactType.STL_FILE, ArtifactType.MESH_BIN]
+
+# Ordered repair plan for task="repair_plan": (validator failure, optimizer task).
+# Dropping stray components first means the later steps only work on the parts we keep;
+# smoothing runs last so it sees the final topology.
+# Real self-intersections have no trimesh repair; the Supervisor remeshes for those.
+REPAIR_PLAN = [
+    ("disconnected_components", "repair_components"),
+    ("is_watertight", "repair_watertight"),
+    ("inconsistent_winding", "repair_intersection"),
+    ("bad_aspect_ratio", "optimize_jacobian"),
+]
 
 class OptimizerAgent:
-    def __init__(self, name="Optimizer"):
+    def __init__(self, name="Optimizer", smoothing: str = "taubin", smooth_below: Optional[float] = None):
         self.name = name
+        # Smoothing method for optimize_jacobian (see core.smoothing); with smooth_below
+        # only vertices of faces under that Jacobian quality are moved
+        self.smoothing = smoothing
+        self.smooth_below = smooth_below
 
-    def run(self, input_artifact: Artifact, output_dir: str, task: str = "repair") -> AgentResult:
-        if input_artifact.type != ArtifactType.STL_FILE:
+    def run(self, input_artifact: Artifact, output_dir: str, task: str = "repair",
+            failures: Optional[List[str]] = None, bodies: int = 1) -> AgentResult:
+        if input_artifact.type not in MESH_TYPES:
             return AgentResult(AgentStatus.FAILURE, error=f"Invalid input type: {input_artifact.type}")
 
         input_path = input_artifact.path
-        filename = os.path.basename(input_path).replace(".stl", "_optimized.stl")
+        base, _ = os.path.splitext(os.path.basename(input_path))
+        filename = f"{base}_optimized{MESH_BIN_EXT}"
         output_path = os.path.join(output_dir, filename)
 
+        applied = []
         try:
-            mesh = trimesh.load(input_path)
+            # Repairs work in place on the input payload; the input artifact is consumed
+            mesh = load_mesh(input_artifact)
+            face_count = len(mesh.faces)
             
             log = []
-            
-            if task == "repair_watertight":
-                # 1. Fill Holes
-                trimesh.repair.fill_holes(mesh)
-                log.append("Filled holes.")
-                
-                # 2. Fix Normals
-                trimesh.repair.fix_normals(mesh)
-                log.append("Fixed normals.")
-                
-                # 3. Fix Inversion
-                trimesh.repair.fix_inversion(mesh)
-                log.append("Fixed inversion.")
-                
-            elif task == "optimize_jacobian":
-                # Trimesh doesn't have direct Jacobian optimization (usually FEM specific)
-                # We simulate this by smoothing, which often improves element quality
-                trimesh.smoothing.filter_laplacian(mesh, iterations=5)
-                log.append("Applied Laplacian smoothing.")
-                
-                trimesh.smoothing.filter_laplacian(mesh, iterations=5)
-                log.append("Applied Laplacian smoothing.")
-                
-            elif task == "repair_intersection":
-                # Attempt to fix winding and remove degenerate faces which often cause intersections
-                trimesh.repair.fix_winding(mesh)
-                trimesh.repair.fix_inversion(mesh)
-                log.append("Fixed winding and inversion for intersections.")
-
-            elif task == "repair_components":
-                # Keep only the largest component (assuming others are noise/artifacts)
-                # Or we could try to stitch them, but keeping largest is a standard "cleanup" strategy
-                components = mesh.split(only_watertight=False)
-                if len(components) > 0:
-                    # Sort by volume (if watertight) or vertex count
-                    components.sort(key=lambda m: len(m.vertices), reverse=True)
-                    mesh = components[0]
-                    log.append("Kept largest component.")
-                else:
-                    log.append("No components found to filter.")
-
-            mesh.export(output_path)
-            
+
+            if task == "repair_plan":
+                # All repairs for the reported failures in one pass over one mesh
+                for failure, step in REPAIR_PLAN:
+                    if failure not in (failures or []):
+                        continue
+                    if not self.still_applies(mesh, step, bodies):
+                        log.append(f"Skipped {step} (no longer needed).")
+                        continue
+                    mesh = self.traced_apply(mesh, step, log, bodies)
+                    applied.append(step)
+            else:
+                mesh = self.traced_apply(mesh, task, log, bodies)
+                applied.append(task)
+
         except Exception as e:
             return AgentResult(AgentStatus.FAILURE, error=str(e))
 
+        metadata = {"last_op": task, "applied": applied}
+        # Per-face CAD surface tags stay valid while the faces keep their order
+        face_surfaces = input_artifact.metadata.get("face_surfaces")
+        if face_surfaces is not None and "repair_components" not in applied and len(mesh.faces) == face_count:
+            metadata["face_surfaces"] = face_surfaces
+
         return AgentResult(
             status=AgentStatus.SUCCESS,
             artifact=Artifact(
-                type=ArtifactType.STL_FILE,
+                type=ArtifactType.MESH_BIN,
                 path=output_path,
-                metadata={"last_op": task}
+                metadata=metadata,
+                payload=mesh,
+                persisted=False
             ),
             log="; ".join(log)
         )
+
+    def build_lods(self, input_artifact: Artifact, output_dir: str, face_targets: Optional[List[int]] = None,
+                   max_error: Optional[float] = None) -> AgentResult:
+        """
+        Decimated levels of detail of a (validated) mesh in one pass: one per face target,
+        or a single one decimated as far as max_error allows. Each LOD artifact records its
+        face count and its measured deviation from the input.
+        """
+        if input_artifact.type not in MESH_TYPES:
+            return AgentResult(AgentStatus.FAILURE, error=f"Invalid input type: {input_artifact.type}")
+
+        base, _ = os.path.splitext(os.path.basename(input_artifact.path))
+        try:
+            mesh = load_mesh(input_artifact)
+            with trace.span("optimize.decimate", faces_before=len(mesh.faces)) as step_span:
+                lods = decimate(mesh.vertices, mesh.faces, face_targets=face_targets, max_error=max_error)
+                step_span["faces_after"] = [len(lod["faces"]) for lod in lods]
+
+            artifacts = []
+            for level, lod in enumerate(lods, start=1):
+                lod_mesh = trimesh.Trimesh(lod["vertices"], lod["faces"], process=False)
+                with trace.span("optimize.deviation", faces=len(lod["faces"])):
+                    measured = deviation(mesh, lod_mesh)
+                artifacts.append(Artifact(
+                    type=ArtifactType.MESH_BIN,
+                    path=os.path.join(output_dir, f"{base}_lod{level}{MESH_BIN_EXT}"),
+                    metadata={"lod": level, "target_faces": lod["target_faces"], "face_count": len(lod["faces"]),
+                              "quadric_error": lod["quadric_error"], "deviation": measured},
+                    payload=lod_mesh,
+                    persisted=False
+                ))
+        except Exception as e:
+            return AgentResult(AgentStatus.FAILURE, error=str(e))
+
+        return AgentResult(
+            status=AgentStatus.SUCCESS,
+            artifacts=artifacts,
+            log="; ".join(f"LOD{a.metadata['lod']}: {a.metadata['face_count']} faces, "
+                          f"max deviation {a.metadata['deviation']['hausdorff']:.4g}" for a in artifacts)
+        )
+
+    @staticmethod
+    def still_applies(mesh: trimesh.Trimesh, task: str, bodies: int = 1) -> bool:
+        # Earlier steps of a plan often fix later failures as a side effect
+        if task == "repair_components":
+            return mesh.body_count > bodies
+        if task == "repair_watertight":
+            return not mesh.is_watertight
+        if task == "repair_intersection":
+            return not mesh.is_winding_consistent
+        return True
+
+    def traced_apply(self, mesh: trimesh.Trimesh, task: str, log: List[str], bodies: int = 1) -> trimesh.Trimesh:
+        with trace.span(f"optimize.{task}", faces_before=len(mesh.faces)) as step_span:
+            mesh = self.apply(mesh, task, log, bodies)
+            step_span["faces_after"] = len(mesh.faces)
+        return mesh
+
+    def apply(self, mesh: trimesh.Trimesh, task: str, log: List[str], bodies: int = 1) -> trimesh.Trimesh:
+        if task == "repair_watertight":
+            # 1. Fill Holes
+            trimesh.repair.fill_holes(mesh)
+            log.append("Filled holes.")
+            
+            # 2. Fix Normals
+            trimesh.repair.fix_normals(mesh)
+            log.append("Fixed normals.")
+            
+            # 3. Fix Inversion
+            trimesh.repair.fix_inversion(mesh)
+            log.append("Fixed inversion.")
+            
+        elif task == "optimize_jacobian":
+            # Sparse smoothing with boundary/feature vertices pinned; it stops as soon as the
+            # Jacobian quality stops improving and never lowers the worst element
+            vertices, info = smooth(mesh.vertices, mesh.faces, method=self.smoothing,
+                                    below_quality=self.smooth_below)
+            mesh.vertices = vertices
+            (min_before, mean_before), (min_after, mean_after) = info["quality_before"], info["quality_after"]
+            log.append(f"Applied {self.smoothing} smoothing ({info['iterations']} iterations, "
+                       f"{info['moved_vertices']} vertices): min quality {min_before:.3f} -> {min_after:.3f}, "
+                       f"mean {mean_before:.3f} -> {mean_after:.3f}.")
+            
+        elif task == "repair_intersection":
+            # Attempt to fix winding and remove degenerate faces which often cause intersections
+            trimesh.repair.fix_winding(mesh)
+            trimesh.repair.fix_inversion(mesh)
+            log.append("Fixed winding and inversion for intersections.")
+
+        elif task == "repair_components":
+            # Keep only the largest components, one per CAD solid (assuming the others are noise/artifacts)
+            # Or we could try to stitch them, but keeping largest is a standard "cleanup" strategy
+            components = mesh.split(only_watertight=False)
+            if len(components) > 0:
+                # Sort by volume (if watertight) or vertex count
+                components.sort(key=lambda m: len(m.vertices), reverse=True)
+                kept = components[:bodies]
+                mesh = kept[0] if len(kept) == 1 else trimesh.util.concatenate(kept)
+                log.append("Kept largest component." if len(kept) == 1
+                           else f"Kept largest {len(kept)} of {len(components)} components.")
+            else:
+                log.append("No components found to filter.")
+
+        return mesh
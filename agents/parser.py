@@ -1,12 +1,17 @@
 import os
+from typing import Optional
+
 import gmsh
 from core.types import Artifact, ArtifactType, AgentResult, AgentStatus
+from core.session import GmshSession
+from core.instances import find_instances
 
 class ParserAgent:
     def __init__(self, name="Parser"):
         self.name = name
 
-    def run(self, input_artifact: Artifact, output_dir: str) -> AgentResult:
+    def run(self, input_artifact: Artifact, output_dir: str, session: Optional[GmshSession] = None,
+            export_brep: bool = False, dedupe_instances: bool = True) -> AgentResult:
         if input_artifact.type != ArtifactType.STEP_FILE:
             return AgentResult(AgentStatus.FAILURE, error=f"Invalid input type: {input_artifact.type}")
 
@@ -18,13 +23,16 @@ class ParserAgent:
         filename = f"{base}.brep"
         output_path = os.path.join(output_dir, filename)
 
+        # Without a shared session nothing survives this call, so the .brep is the only hand-off
+        owns_session = session is None
+        if owns_session:
+            session = GmshSession()
+            export_brep = True
+
         try:
-            gmsh.initialize()
-            gmsh.option.setNumber("General.Terminal", 1)
-            
             # 1. Load STEP File
             # Gmsh uses OpenCASCADE internally to read STEP
-            gmsh.open(step_path)
+            session.load(step_path)
             
             # 2. Basic Topology Check
             # We can check if entities were loaded
@@ -33,25 +41,39 @@ class ParserAgent:
                  return AgentResult(AgentStatus.FAILURE, error="No entities found in STEP file.")
             
             # 3. Export to .brep (Native OpenCASCADE format)
-            # This normalizes the geometry for the Mesher
-            gmsh.write(output_path)
+            # Only needed for debugging or when no session keeps the model in memory
+            if export_brep:
+                gmsh.write(output_path)
             
             # 4. Extract Metadata
             # Count volumes/surfaces
             volumes = gmsh.model.getEntities(3)
             surfaces = gmsh.model.getEntities(2)
-            
+
+            # 5. Fingerprint Solids
+            # Repeated parts (fasteners, brackets) are meshed once and placed at every copy,
+            # unless the Mesher meshes every copy anyway
+            instances = find_instances() if dedupe_instances and len(volumes) > 1 else []
+
         except Exception as e:
             return AgentResult(AgentStatus.FAILURE, error=str(e))
         finally:
-            gmsh.finalize()
+            if owns_session:
+                session.close()
 
         return AgentResult(
             status=AgentStatus.SUCCESS,
             artifact=Artifact(
                 type=ArtifactType.BREP_FILE,
-                path=output_path,
-                metadata={"surface_count": len(surfaces), "volume_count": len(volumes)}
+                path=output_path if export_brep else step_path,
+                metadata={
+                    "surface_count": len(surfaces),
+                    "volume_count": len(volumes),
+                    "source_path": step_path,
+                    "model_name": base,
+                    "instances": instances
+                }
             ),
             log=f"Parsed STEP file using Gmsh. Surfaces: {len(surfaces)}"
+                + (f", repeated solids: {sum(len(g['solids']) - 1 for g in instances)}" if instances else "")
         )
@@ -1,85 +1,121 @@
+from typing import Collection, Optional
+
+import numpy as np
 import trimesh
 from core.types import Artifact, ArtifactType, AgentResult, AgentStatus
+from core.mesh_io import load_mesh
+from core.intersections import find_self_intersections
+from core.quality import element_quality, poor_elements
+from core.topology import EdgeMap
+from core import trace
+
+MESH_TYPES = [ArtifactType.STL_FILE, ArtifactType.MESH_BIN]
+
+# Cap on intersecting face pairs listed in the report (the count is always exact)
+MAX_REPORTED_PAIRS = 1000
+
+# Per-face lists used to locate failures; kept out of the report's quality summary
+FACE_LISTS = ("worst_faces", "bad_faces")
+
+# Checks run in tiers from cheap to expensive, each with the failures it can report
+TIERS = (
+    ("topology", ("is_watertight", "inconsistent_winding", "disconnected_components")),
+    ("quality", ("bad_aspect_ratio",)),
+    ("intersections", ("self_intersection",)),
+)
 
 class ValidatorAgent:
-    def __init__(self, name="Validator"):
+    def __init__(self, name="Validator", aspect_ratio_limit=50.0):
         self.name = name
+        self.aspect_ratio_limit = aspect_ratio_limit
 
-    def run(self, input_artifact: Artifact) -> AgentResult:
-        if input_artifact.type != ArtifactType.STL_FILE:
+    def run(self, input_artifact: Artifact, stop_at: Optional[Collection[str]] = None,
+            bodies: int = 1) -> AgentResult:
+        """
+        Validates the mesh tier by tier (TIERS). By default every tier runs with full quality
+        statistics. stop_at names the failures the caller acts on (e.g. the repairable ones):
+        once one of them is found, tiers that can only report other failures are skipped
+        (listed under "skipped"), and the full quality statistics are computed only while the
+        mesh can still pass. bodies is the number of separate solids the CAD model has; only
+        components beyond those count as disconnected.
+        """
+        if input_artifact.type not in MESH_TYPES:
             return AgentResult(AgentStatus.FAILURE, error=f"Invalid input type: {input_artifact.type}")
 
-        # Load Mesh
+        # Load Mesh (reuses the in-memory payload when the previous agent attached one)
         try:
-            mesh = trimesh.load(input_artifact.path)
+            with trace.span("validate.load"):
+                mesh = load_mesh(input_artifact)
         except Exception as e:
             return AgentResult(AgentStatus.FAILURE, error=f"Trimesh load failed: {e}")
 
-        # Checks
-        is_watertight = mesh.is_watertight
-        euler_number = mesh.euler_number
-        volume = mesh.volume if is_watertight else 0.0
-        
-        # Calculate Jacobian (Heuristic: Triangle Quality)
-        # Q = 4*sqrt(3)*Area / (sum of edge lengths squared)
-        # Range 0 (degenerate) to 1 (equilateral)
-        try:
-            # trimesh.triangles.area is (n,)
-            areas = mesh.area_faces
-            # mesh.edges_unique_length is for unique edges, we need per-face edge lengths
-            # mesh.faces is (n, 3) indices
-            # vertices is (v, 3)
-            # We can get edge lengths per face
-            # A bit expensive in python, but fine for PoC
-            # Using trimesh built-in quality check if available or simplified approach
-            # Simplified: Use existing aspect ratio check as base for Jacobian
-            # Real implementation:
-            import numpy as np
-            a = mesh.vertices[mesh.faces[:, 0]]
-            b = mesh.vertices[mesh.faces[:, 1]]
-            c = mesh.vertices[mesh.faces[:, 2]]
-            edge_sq = np.sum((a-b)**2, axis=1) + np.sum((b-c)**2, axis=1) + np.sum((c-a)**2, axis=1)
-            # Avoid divide by zero
-            edge_sq[edge_sq < 1e-9] = 1.0
-            
-            jacobian = (4 * np.sqrt(3) * areas) / edge_sq
-            avg_jacobian = float(np.mean(jacobian))
-            min_jacobian = float(np.min(jacobian))
-        except Exception as e:
-            avg_jacobian = 0.0
-            min_jacobian = 0.0
-
-        
-        # Detailed Failure Analysis
         failures = []
         details = []
-        
-        if not is_watertight:
-            failures.append("is_watertight")
-            # Check for holes/open edges
-            # trimesh.graph.connected_components(mesh.edges_unique)
-            details.append("open_edges_detected")
-
-        # Check for self-intersections (using winding consistency as proxy or explicit check)
-        # Note: trimesh.intersection.is_intersection is expensive, so we use winding/volume checks as proxies or simpler heuristics
-        try:
-            if not mesh.is_winding_consistent:
-                 failures.append("self_intersection")
-        except:
-            pass
-
-        # Check for disconnected components
-        if mesh.body_count > 1:
-            failures.append("disconnected_components")
-            details.append(f"found_{mesh.body_count}_components")
-
-        # Aspect Ratio (Mock approximation using edge lengths)
-        edges = mesh.edges_unique_length
-        if len(edges) > 0:
-            min_edge = edges.min()
-            max_edge = edges.max()
-            if min_edge > 0 and (max_edge / min_edge) > 50: # Arbitrary threshold
+        failing_faces = []
+        skipped = []
+
+        def skips(tier_failures) -> bool:
+            return (stop_at is not None and any(failure in stop_at for failure in failures)
+                    and not any(failure in stop_at for failure in tier_failures))
+
+        # 1. Topology, all read off one shared edge map
+        with trace.span("validate.topology"):
+            edges = EdgeMap(len(mesh.vertices), mesh.faces)
+            is_watertight = edges.is_watertight
+            euler_number = edges.euler_number
+            volume = mesh.volume if is_watertight else 0.0
+            if not is_watertight:
+                failures.append("is_watertight")
+                # Check for holes/open edges: faces on an edge no other face shares
+                failing_faces.append(edges.open_edge_faces())
+                details.append("open_edges_detected")
+
+            # Inconsistent winding used to stand in for intersections; it is its own (repairable) defect
+            if not edges.is_winding_consistent:
+                failures.append("inconsistent_winding")
+
+            # Check for disconnected components (each CAD solid is one of them)
+            body_count = edges.body_count
+            if body_count > bodies:
+                failures.append("disconnected_components")
+                details.append(f"found_{body_count}_components_for_{bodies}_solids")
+
+        # 2. Per-element quality (Jacobian-style 4*sqrt(3)*A/sum(l^2), aspect ratio, angles, skewness),
+        #    computed in bounded-memory face chunks. A passing mesh is final and its report gets the
+        #    full statistics, so with stop_at set only a mesh that already failed gets the cheaper
+        #    aspect-ratio flags
+        quality = {}
+        if skips(TIERS[1][1]):
+            skipped.append("quality")
+        else:
+            try:
+                with trace.span("validate.quality"):
+                    measure = poor_elements if stop_at is not None and failures else element_quality
+                    quality = measure(mesh.vertices, mesh.faces, aspect_ratio_limit=self.aspect_ratio_limit)
+            except Exception as e:
+                return AgentResult(AgentStatus.FAILURE, error=f"Quality check failed: {e}")
+
+            # Aspect Ratio per element (a mesh mixing large and small features is not a failure)
+            bad_elements = quality.get("bad_element_count", 0)
+            if bad_elements > 0:
                 failures.append("bad_aspect_ratio")
+                failing_faces.append(np.asarray(quality["bad_faces"], dtype=np.int64))
+                details.append(f"found_{bad_elements}_elements_over_aspect_ratio_{self.aspect_ratio_limit:g}")
+
+        # 3. Self-intersections: spatial-hash broad phase + exact triangle tests
+        intersecting = None
+        if skips(TIERS[2][1]):
+            skipped.append("intersections")
+        else:
+            with trace.span("validate.intersections"):
+                intersecting = find_self_intersections(mesh.vertices, mesh.faces)
+            if len(intersecting):
+                failures.append("self_intersection")
+                failing_faces.append(np.asarray(intersecting).ravel())
+                details.append(f"found_{len(intersecting)}_intersecting_face_pairs")
+
+        avg_jacobian = float(quality["jacobian"]["mean"]) if quality else 0.0
+        min_jacobian = float(quality["jacobian"]["min"]) if quality else 0.0
 
         status = AgentStatus.SUCCESS # The AGENT succeeded, even if the MESH failed validation
         
@@ -87,6 +123,11 @@ class ValidatorAgent:
             "status": "SUCCESS" if not failures else "FAIL",
             "failures": failures,
             "details": details,
+            "skipped": skipped,
+            "intersecting_faces": intersecting[:MAX_REPORTED_PAIRS].tolist() if intersecting is not None else [],
+            "worst_faces": quality.get("worst_faces", []),
+            "failing_surfaces": self.failing_surfaces(input_artifact, mesh, failing_faces),
+            "quality": {name: value for name, value in quality.items() if name not in FACE_LISTS},
             "metrics": {
                 "is_watertight": is_watertight,
                 "euler_number": euler_number,
@@ -94,7 +135,8 @@ class ValidatorAgent:
                 "vertex_count": len(mesh.vertices),
                 "face_count": len(mesh.faces),
                 "avg_jacobian": avg_jacobian,
-                "min_jacobian": min_jacobian
+                "min_jacobian": min_jacobian,
+                "self_intersection_count": int(len(intersecting)) if intersecting is not None else None
             }
         }
 
@@ -107,3 +149,13 @@ class ValidatorAgent:
             ),
             log=f"Validation complete. Status: {report_data['status']}"
         )
+
+    @staticmethod
+    def failing_surfaces(input_artifact: Artifact, mesh: trimesh.Trimesh, failing_faces) -> list:
+        # CAD surface tags of the failing faces, when the Mesher attached per-face tags
+        # that still line up with this mesh (repairs that add or drop faces invalidate them)
+        face_surfaces = input_artifact.metadata.get("face_surfaces")
+        if face_surfaces is None or len(face_surfaces) != len(mesh.faces) or not failing_faces:
+            return []
+        faces = np.unique(np.concatenate(failing_faces).astype(np.int64))
+        return sorted(int(tag) for tag in np.unique(np.asarray(face_surfaces)[faces]) if tag > 0)
@@ -0,0 +1,106 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import gmsh
+import numpy as np
+
+from core.session import GmshSession
+from core.sizing import size_fields
+
+# Tasks per worker: small enough to balance uneven bodies, large enough to amortize task overhead
+TASKS_PER_WORKER = 4
+
+# One Gmsh session per pool worker; the BREP is loaded once and reused across tasks
+_worker_session: Optional[GmshSession] = None
+
+
+def fragment_volumes():
+    """Makes the loaded model conformal: bodies that touch end up sharing their interface surface."""
+    volumes = gmsh.model.getEntities(3)
+    if len(volumes) > 1:
+        gmsh.model.occ.fragment(volumes, [])
+        gmsh.model.occ.synchronize()
+
+
+def surface_groups() -> Dict[int, List[int]]:
+    """
+    Assigns every surface of the loaded model to one owner: the lowest-tagged volume it
+    bounds, or the surface itself (negated) for free shells. Returns {owner: [surface tags]}.
+    """
+    groups = {}
+    for _, surface in gmsh.model.getEntities(2):
+        upward, _ = gmsh.model.getAdjacencies(2, surface)
+        owner = int(min(upward)) if len(upward) else -int(surface)
+        groups.setdefault(owner, []).append(int(surface))
+    return groups
+
+
+def partition(groups: Dict[int, List[int]], n_tasks: int) -> List[List[int]]:
+    """Greedy largest-first split of the owner groups into n_tasks surface lists."""
+    tasks = [[] for _ in range(max(1, min(n_tasks, len(groups))))]
+    for surfaces in sorted(groups.values(), key=len, reverse=True):
+        min(tasks, key=len).extend(surfaces)
+    return [t for t in tasks if t]
+
+
+def _init_worker():
+    global _worker_session
+    _worker_session = GmshSession(terminal=0)
+
+
+def mesh_surfaces(brep_path: str, surfaces: List[int], options: Dict[str, float],
+                  sizes: Optional[dict] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Meshes only `surfaces` of the model in brep_path. Curves are meshed for the whole
+    model, which is identical in every worker, so edges shared with surfaces meshed
+    elsewhere get the same nodes. `sizes` are adaptive element sizes (core.sizing).
+    """
+    from agents.mesher import MesherAgent
+
+    session = _worker_session or GmshSession(terminal=0)
+    try:
+        session.load(brep_path)
+        session.clear_mesh()
+        for name, value in options.items():
+            gmsh.option.setNumber(name, value)
+
+        gmsh.model.setVisibility(gmsh.model.getEntities(2), 0)
+        gmsh.model.setVisibility([(2, s) for s in surfaces], 1)
+        gmsh.option.setNumber("Mesh.MeshOnlyVisible", 1)
+        try:
+            with size_fields(sizes):
+                gmsh.model.mesh.generate(2)
+        finally:
+            gmsh.option.setNumber("Mesh.MeshOnlyVisible", 0)
+        return MesherAgent.extract_triangles()
+    finally:
+        if _worker_session is None:
+            session.close()
+
+
+def weld(parts: List[Tuple[np.ndarray, np.ndarray]], tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenates part meshes and merges vertices closer than `tolerance` (shared interfaces)."""
+    offsets = np.cumsum([0] + [len(v) for v, _ in parts])
+    vertices = np.concatenate([v for v, _ in parts])
+    faces = np.concatenate([f + offset for (_, f), offset in zip(parts, offsets)])
+    keys = np.round(vertices / tolerance).astype(np.int64)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    return vertices[first], inverse.reshape(-1)[faces]
+
+
+def mesh_assembly(brep_path: str, groups: Dict[int, List[int]], options: Dict[str, float],
+                  workers: int, tolerance: float, sizes: Optional[dict] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Meshes the owner groups on a spawn pool and welds the parts; returns (vertices, faces, n_tasks)."""
+    tasks = partition(groups, workers * TASKS_PER_WORKER)
+    # spawn: never inherit a parent's Gmsh state through fork
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=ctx,
+                             initializer=_init_worker) as pool:
+        parts = list(pool.map(mesh_surfaces, [brep_path] * len(tasks), tasks, [options] * len(tasks),
+                              [sizes] * len(tasks)))
+    parts = [p for p in parts if len(p[1])]
+    if not parts:
+        return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64), len(tasks)
+    vertices, faces = weld(parts, tolerance)
+    return vertices, faces, len(tasks)
@@ -0,0 +1,229 @@
+import atexit
+import contextlib
+import csv
+import os
+import shutil
+import time
+from typing import Callable, Dict, List, Optional
+
+import gmsh
+import trimesh
+
+from core.cache import ArtifactCache
+from core.journal import BatchJournal
+from core.scheduler import Scheduler, estimate_cost, load_history
+from core.session import GmshSession
+from core.supervisor import Supervisor
+from core.trace import Tracer
+
+CAD_EXTENSIONS = ('.step', '.stp')
+
+ROW_FIELDS = [
+    "Model", "Status", "Iterations", "Duration_sec", "Error", "Final_Mesh",
+    "Watertight", "Faces", "Vertices", "Volume", "Avg_Jacobian", "Min_Jacobian"
+]
+
+# One Gmsh instance per worker process (Gmsh keeps global state), reused across jobs
+_worker_session: Optional[GmshSession] = None
+
+
+def find_cad_files(input_dir: str, extensions=CAD_EXTENSIONS) -> List[str]:
+    files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(extensions))
+    return [os.path.join(input_dir, f) for f in files]
+
+
+def make_row(filename: str, result: dict, duration: float) -> dict:
+    row = {
+        "Model": filename,
+        "Status": result["status"],
+        "Iterations": result.get("iterations", 0),
+        "Duration_sec": round(duration, 2),
+        "Error": result.get("error", ""),
+        "Final_Mesh": result.get("final_mesh_path", "")
+    }
+    report = result.get("validation_report", {}).get("metrics", {})
+    row.update({
+        "Watertight": report.get("is_watertight", ""),
+        "Faces": report.get("face_count", ""),
+        "Vertices": report.get("vertex_count", ""),
+        "Volume": report.get("volume", ""),
+        "Avg_Jacobian": report.get("avg_jacobian", ""),
+        "Min_Jacobian": report.get("min_jacobian", "")
+    })
+    return row
+
+
+def _init_worker():
+    global _worker_session
+    _worker_session = GmshSession(terminal=0)
+    atexit.register(_worker_session.close)
+
+
+def process_model(input_path: str, output_dir: str, quiet: bool = False,
+                  cache_dir: Optional[str] = None, cache_max_bytes: int = 2 * 1024 ** 3,
+                  mesh_threads: Optional[int] = None, trace: bool = False,
+                  on_stage: Optional[Callable[[str], None]] = None) -> dict:
+    """
+    Runs the Supervisor on one model in its own workspace and returns its CSV row.
+    A successful final mesh is copied to output_dir as <model>_final.stl.
+    With trace, per-stage spans are written to <workspace>/trace.jsonl.
+    on_stage(name) is called as each traced stage starts (scheduler heartbeat).
+    """
+    filename = os.path.basename(input_path)
+    model_name = os.path.splitext(filename)[0]
+
+    # Dedicated workspace per model to avoid collisions between workers
+    model_workspace = os.path.join(output_dir, model_name)
+    if not os.path.exists(model_workspace):
+        os.makedirs(model_workspace)
+
+    # Workers share the cache directory; entries are published atomically
+    cache = ArtifactCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+    tracer = Tracer(os.path.join(model_workspace, "trace.jsonl") if trace else None, on_span_start=on_stage)
+    supervisor = Supervisor(workspace_dir=model_workspace, session=_worker_session, cache=cache,
+                            mesh_threads=mesh_threads, tracer=tracer)
+
+    start_time = time.time()
+    try:
+        if quiet:
+            # Keep the Supervisor's narration out of the interleaved batch output
+            with open(os.path.join(model_workspace, "supervisor.log"), "w") as log, \
+                    contextlib.redirect_stdout(log):
+                result = supervisor.run(input_path)
+        else:
+            result = supervisor.run(input_path)
+    except Exception as e:
+        print(f"CRITICAL ERROR processing {filename} (ACMS): {e}")
+        result = {"model": filename, "status": "CRASH", "error": str(e)}
+    duration = time.time() - start_time
+
+    # Copy final mesh to main output dir if successful
+    final_mesh = result.get("final_mesh_path")
+    if result["status"] == "SUCCESS" and final_mesh and os.path.exists(final_mesh):
+        shutil.copy(final_mesh, os.path.join(output_dir, f"{model_name}_final.stl"))
+
+    return make_row(filename, result, duration)
+
+
+def batch_settings() -> dict:
+    # Everything besides the input file that changes a model's result (journal key)
+    return {"gmsh": gmsh.__version__, "trimesh": trimesh.__version__}
+
+
+def failure_row(input_path: str, status: str, error: str, duration: float) -> dict:
+    # Row for a job whose worker was killed (TIMEOUT) or died (CRASH)
+    return make_row(os.path.basename(input_path), {"status": status, "error": error}, duration)
+
+
+def estimate_costs(input_paths: List[str], history: Optional[Dict[str, float]] = None,
+                   cache: Optional[ArtifactCache] = None) -> List[float]:
+    """Estimated seconds per model: previous duration, cached surface and volume counts, or file size."""
+    costs = []
+    for input_path in input_paths:
+        metadata = {}
+        if cache is not None and os.path.exists(input_path):
+            entry = cache.get(Supervisor.brep_cache_key(ArtifactCache.file_hash(input_path)))
+            if entry is not None:
+                metadata = entry["metadata"]
+        costs.append(estimate_cost(input_path, history, metadata.get("surface_count"),
+                                   metadata.get("volume_count"))[0])
+    return costs
+
+
+def run_batch(input_paths: List[str], output_dir: str, results_csv: Optional[str] = None,
+              workers: Optional[int] = None,
+              on_result: Optional[Callable[[dict], None]] = None,
+              cache_dir: Optional[str] = None, cache_max_bytes: int = 2 * 1024 ** 3,
+              trace: bool = False, stage_timeout: Optional[float] = None,
+              stage_timeouts: Optional[Dict[str, float]] = None,
+              history: Optional[Dict[str, float]] = None,
+              journal: Optional[str] = None, resume: bool = True) -> List[dict]:
+    """
+    Processes input_paths with a pool of `workers` processes (default: all cores),
+    most expensive models first. Each row is appended to results_csv as soon as its
+    model finishes. A Supervisor stage running longer than stage_timeout (or its entry
+    in stage_timeouts) is killed and its model reported with status TIMEOUT.
+    Costs come from `history` (default: the previous contents of results_csv),
+    cached surface and volume counts and file sizes.
+
+    With a journal, every finished row is also appended to that crash-safe JSON-lines
+    file, and (with resume) models whose input hash and settings are already journaled
+    with a SUCCESS or FAILURE row are not run again; their journaled rows are still
+    written to results_csv. Journaled TIMEOUT and CRASH rows are retried.
+    """
+    workers = workers or os.cpu_count() or 1
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    # Journaled durations are added below, so a caller's dict is copied first
+    history = load_history(results_csv) if history is None else dict(history)
+
+    batch_journal = BatchJournal(journal) if journal else None
+    job_keys, resumed = {}, []
+    if batch_journal is not None:
+        settings = batch_settings()
+        completed = batch_journal.completed() if resume else {}
+        # Retried jobs keep their journaled duration as a cost estimate too
+        for record in (batch_journal.latest() if resume else {}).values():
+            history[record["row"]["Model"]] = float(record["row"].get("Duration_sec") or 0.0)
+        remaining = []
+        for input_path in input_paths:
+            if os.path.exists(input_path):
+                job_keys[os.path.basename(input_path)] = (
+                    input_path, BatchJournal.job_key(ArtifactCache.file_hash(input_path), settings))
+            key = job_keys.get(os.path.basename(input_path), (None, None))[1]
+            if key in completed:
+                resumed.append(completed[key]["row"])
+            else:
+                remaining.append(input_path)
+        if resumed:
+            print(f"Resuming: {len(resumed)} of {len(input_paths)} models already in {batch_journal.path}")
+        input_paths = remaining
+
+    rows = []
+    csv_file = open(results_csv, "w", newline="") if results_csv else None
+    try:
+        writer = None
+        if csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=ROW_FIELDS)
+            writer.writeheader()
+            csv_file.flush()
+
+        for row in resumed:
+            rows.append(row)
+            if writer:
+                writer.writerow(row)
+        if csv_file:
+            csv_file.flush()
+
+        def collect(row):
+            if batch_journal is not None and row["Model"] in job_keys:
+                input_path, key = job_keys[row["Model"]]
+                batch_journal.append(key, input_path, row, settings)
+            rows.append(row)
+            if writer:
+                writer.writerow(row)
+                csv_file.flush()
+            if on_result:
+                on_result(row)
+
+        timeouts = stage_timeout is not None or bool(stage_timeouts)
+        if input_paths and not timeouts and (workers <= 1 or len(input_paths) <= 1):
+            # A single model at a time gets every core for Gmsh's own threads
+            for input_path in input_paths:
+                collect(process_model(input_path, output_dir, False, cache_dir, cache_max_bytes, trace=trace))
+        elif input_paths:
+            pool_size = min(workers, len(input_paths))
+            # Split the cores between workers so Gmsh threads do not oversubscribe the machine
+            mesh_threads = max(1, (os.cpu_count() or 1) // pool_size)
+            cache = ArtifactCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+            costs = estimate_costs(input_paths, history, cache)
+            scheduler = Scheduler(pool_size, process_model,
+                                  job_args=(output_dir, True, cache_dir, cache_max_bytes, mesh_threads, trace),
+                                  failure_row=failure_row, initializer=_init_worker,
+                                  stage_timeout=stage_timeout, stage_timeouts=stage_timeouts)
+            scheduler.run(list(zip(input_paths, costs)), collect)
+    finally:
+        if csv_file:
+            csv_file.close()
+
+    return rows
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+
+class ArtifactCache:
+    """
+    Content-addressed on-disk cache for parsed BREPs and generated meshes.
+
+    Each entry is a directory <root>/<key[:2]>/<key>/ holding one data file and a
+    meta.json whose mtime is the LRU timestamp. Entries are published with an
+    atomic rename, so several batch workers can share one cache directory.
+    """
+
+    META_FILE = "meta.json"
+
+    def __init__(self, root: str, max_bytes: int = 2 * 1024 ** 3):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    @staticmethod
+    def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(kind: str, **parts) -> str:
+        # Stable across runs: parts are serialized with sorted keys
+        blob = json.dumps({"kind": kind, **parts}, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns {"path", "metadata"} for a cached entry, or None on a miss."""
+        meta_path = os.path.join(self._entry_dir(key), self.META_FILE)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            os.utime(meta_path)  # mark as recently used
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        path = os.path.join(self._entry_dir(key), meta["filename"])
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return {"path": path, "metadata": meta.get("metadata", {})}
+
+    def put(self, key: str, filename: str, write: Callable[[str], Any],
+            metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Stores an entry by calling write(path) inside a staging directory,
+        then evicts least recently used entries beyond max_bytes.
+        """
+        entry_dir = self._entry_dir(key)
+        staging = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            write(os.path.join(staging, filename))
+            with open(os.path.join(staging, self.META_FILE), "w") as f:
+                json.dump({"filename": filename, "metadata": metadata or {}, "created": time.time()}, f)
+
+            os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+            try:
+                os.rename(staging, entry_dir)
+            except OSError:
+                # Another worker published the same key first; keep theirs
+                pass
+        finally:
+            if os.path.exists(staging):
+                shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict()
+        return os.path.join(entry_dir, filename)
+
+    def _entries(self):
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if shard.startswith(".") or not os.path.isdir(shard_dir):
+                continue
+            for key in os.listdir(shard_dir):
+                entry_dir = os.path.join(shard_dir, key)
+                try:
+                    last_used = os.path.getmtime(os.path.join(entry_dir, self.META_FILE))
+                    size = sum(os.path.getsize(os.path.join(entry_dir, name)) for name in os.listdir(entry_dir))
+                except OSError:
+                    continue
+                yield entry_dir, last_used, size
+
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for entry_dir, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        entries = list(self._entries())
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, _, size in entries)
+        }
+
+    def report(self) -> str:
+        s = self.stats()
+        return (f"Cache: {s['hits']} hits, {s['misses']} misses ({s['hit_rate']:.0%} hit rate), "
+                f"{s['evictions']} evictions, {s['entries']} entries / {s['size_bytes'] / 1024 ** 2:.1f} MB")
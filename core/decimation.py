@@ -0,0 +1,272 @@
+from typing import List, Optional
+
+import numpy as np
+import trimesh
+from scipy import sparse
+
+from core.fidelity import TriangleIndex
+from core.quality import triangle_jacobian
+from core.smoothing import pinned_vertices
+
+# Collapses may not create triangles below this Jacobian quality. Aspect ratio <= 3 / Q, so
+# 0.1 keeps every new element well inside the Validator's aspect ratio limit of 50.
+MIN_QUALITY = 0.1
+
+# A collapse is rejected when a surviving face's normal turns by more than acos(FLIP_COSINE)
+FLIP_COSINE = 0.2
+
+# Share of the eligible edges (cheapest first) considered for collapse in one pass
+PASS_FRACTION = 0.25
+
+# Points sampled on each surface when measuring the deviation of a LOD from the original
+DEVIATION_SAMPLES = 10000
+
+
+def _plane_quadrics(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    # Garland-Heckbert error quadric per vertex: sum of p p^T over the planes of its faces
+    a, b, c = (vertices[faces[:, i]] for i in range(3))
+    normals = np.cross(b - a, c - a)
+    lengths = np.linalg.norm(normals, axis=1)
+    normals[lengths > 0] /= lengths[lengths > 0, None]
+    planes = np.column_stack([normals, -np.einsum("ij,ij->i", normals, a)])
+    outer = (planes[:, :, None] * planes[:, None, :]).reshape(-1, 16)
+    quadrics = np.zeros((len(vertices), 16))
+    for corner in range(3):
+        for k in range(16):
+            quadrics[:, k] += np.bincount(faces[:, corner], weights=outer[:, k], minlength=len(vertices))
+    return quadrics.reshape(-1, 4, 4)
+
+
+def _quadric_cost(quadrics: np.ndarray, points: np.ndarray) -> np.ndarray:
+    homogeneous = np.column_stack([points, np.ones(len(points))])
+    return np.maximum(np.einsum("ni,nij,nj->n", homogeneous, quadrics, homogeneous), 0.0)
+
+
+def _collapse_targets(quadrics: np.ndarray, vertices: np.ndarray, edges: np.ndarray):
+    """Cheapest position (and its cost) for every edge among the optimum, both ends and the midpoint."""
+    q = quadrics[edges[:, 0]] + quadrics[edges[:, 1]]
+    start, end = vertices[edges[:, 0]], vertices[edges[:, 1]]
+    midpoint = (start + end) / 2.0
+    length = np.linalg.norm(end - start, axis=1)
+
+    optimum = midpoint.copy()
+    # Flat and straight regions leave the 3x3 system singular; the optimum is only trusted near the edge
+    solvable = np.abs(np.linalg.det(q[:, :3, :3])) > 1e-12 * np.maximum(length, 1e-300) ** 6
+    if solvable.any():
+        optimum[solvable] = np.linalg.solve(q[solvable, :3, :3], -q[solvable, :3, 3:4])[:, :, 0]
+    stray = np.linalg.norm(optimum - midpoint, axis=1) > length
+    optimum[stray] = midpoint[stray]
+
+    candidates = np.stack([optimum, start, end, midpoint])
+    costs = np.stack([_quadric_cost(q, points) for points in candidates])
+    best = np.argmin(costs, axis=0)
+    index = np.arange(len(edges))
+    return candidates[best, index], costs[best, index]
+
+
+def _touching(mask: np.ndarray, elements: np.ndarray) -> np.ndarray:
+    # Rows of `elements` (faces or edges) with any vertex in mask; column-wise, which is much
+    # faster than mask[elements].any(axis=1) on large meshes
+    touching = mask[elements[:, 0]].copy()
+    for column in range(1, elements.shape[1]):
+        touching |= mask[elements[:, column]]
+    return touching
+
+
+def _independent(edges: np.ndarray, faces: np.ndarray, cost: np.ndarray, eligible: np.ndarray,
+                 vertex_count: int) -> np.ndarray:
+    """
+    A maximal set of the cheapest PASS_FRACTION of eligible edges whose end point stars share
+    no face, so all of them can be collapsed at once. Each round takes the edges that are the
+    cheapest around every face they touch, then blocks everything next to them.
+    """
+    candidates = np.flatnonzero(eligible)
+    count = max(1, int(len(candidates) * PASS_FRACTION))
+    if count < len(candidates):
+        candidates = candidates[np.argpartition(cost[candidates], count - 1)[:count]]
+    candidates = candidates[np.argsort(cost[candidates])]
+    rank = np.full(len(edges), np.iinfo(np.int64).max)
+    rank[candidates] = np.arange(len(candidates))
+
+    blocked = np.zeros(vertex_count, dtype=bool)
+    ends = np.zeros(vertex_count, dtype=bool)
+    selected = []
+    while len(candidates):
+        # Only faces touching a remaining candidate take part in this round
+        ends[:] = False
+        ends[edges[candidates].ravel()] = True
+        faces = faces[_touching(ends, faces)]
+
+        vertex_min = np.full(vertex_count, np.iinfo(np.int64).max)
+        np.minimum.at(vertex_min, edges[candidates, 0], rank[candidates])
+        np.minimum.at(vertex_min, edges[candidates, 1], rank[candidates])
+        face_min = np.minimum(np.minimum(vertex_min[faces[:, 0]], vertex_min[faces[:, 1]]), vertex_min[faces[:, 2]])
+        star_min = np.full(vertex_count, np.iinfo(np.int64).max)
+        np.minimum.at(star_min, faces.ravel(), np.repeat(face_min, 3))
+
+        pairs = edges[candidates]
+        chosen = candidates[rank[candidates] == np.minimum(star_min[pairs[:, 0]], star_min[pairs[:, 1]])]
+        selected.append(chosen)
+        # Faces in the chosen stars are taken; any edge reaching one of their vertices would overlap
+        taken = np.zeros(vertex_count, dtype=bool)
+        taken[edges[chosen].ravel()] = True
+        blocked[faces[_touching(taken, faces)].ravel()] = True
+        candidates = candidates[~_touching(blocked, edges[candidates])]
+
+    selected = np.concatenate(selected) if selected else np.zeros(0, dtype=np.int64)
+    return selected[np.argsort(rank[selected])]
+
+
+def _valid_collapses(vertices: np.ndarray, faces: np.ndarray, edges: np.ndarray, targets: np.ndarray,
+                     min_quality: float) -> np.ndarray:
+    """
+    Link condition (exactly two shared neighbours, neither of valence 3) and flip/quality checks
+    for independent collapses; returns a mask over `edges`.
+    """
+    count = len(vertices)
+    pairs = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    adjacency = sparse.csr_matrix((np.ones(len(pairs) * 2), (np.concatenate([pairs[:, 0], pairs[:, 1]]),
+                                                             np.concatenate([pairs[:, 1], pairs[:, 0]]))),
+                                  shape=(count, count))
+    adjacency.data[:] = 1.0
+    valence = np.asarray(adjacency.sum(axis=1)).ravel()
+    shared = adjacency[edges[:, 0]].multiply(adjacency[edges[:, 1]]).tocsr()
+    valid = np.asarray(shared.sum(axis=1)).ravel() == 2
+    rows, columns = shared.nonzero()
+    low_valence = np.zeros(len(edges), dtype=bool)
+    np.logical_or.at(low_valence, rows, valence[columns] <= 3)
+    valid &= ~low_valence
+
+    # Faces around each collapse: removed when they hold both end points, moved otherwise
+    owner = np.full(count, -1)
+    owner[edges[:, 0]] = np.arange(len(edges))
+    owner[edges[:, 1]] = np.arange(len(edges))
+    # Stars are disjoint, so every owned corner of a face is an end point of that face's collapse
+    ends = owner[faces] >= 0
+    face_owner = owner[faces].max(axis=1)
+    moved = np.flatnonzero((face_owner >= 0) & (ends.sum(axis=1) == 1))
+
+    before = vertices[faces[moved]]
+    after = before.copy()
+    corner = np.argmax(ends[moved], axis=1)
+    after[np.arange(len(moved)), corner] = targets[face_owner[moved]]
+
+    def unit_normals(triangles):
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        return normals / np.maximum(np.linalg.norm(normals, axis=1), 1e-300)[:, None]
+
+    flipped = np.einsum("ij,ij->i", unit_normals(before), unit_normals(after)) < FLIP_COSINE
+    local = np.arange(3 * len(moved)).reshape(-1, 3)
+    quality_before = triangle_jacobian(before.reshape(-1, 3), local)
+    quality_after = triangle_jacobian(after.reshape(-1, 3), local)
+    degraded = quality_after < np.minimum(min_quality, quality_before)
+    rejected = np.zeros(len(edges), dtype=bool)
+    np.logical_or.at(rejected, face_owner[moved], flipped | degraded)
+    return valid & ~rejected
+
+
+def _compact(vertices: np.ndarray, faces: np.ndarray):
+    used = np.unique(faces)
+    remap = np.full(len(vertices), -1)
+    remap[used] = np.arange(len(used))
+    return vertices[used].copy(), remap[faces]
+
+
+def decimate(vertices, faces, face_targets: Optional[List[int]] = None, max_error: Optional[float] = None,
+             min_quality: float = MIN_QUALITY) -> List[dict]:
+    """
+    Quadric edge-collapse decimation in batches: every pass collapses an independent set of the
+    cheapest edges at once, each checked for the link condition (so a closed manifold stays closed),
+    normal flips and new elements below min_quality. Open boundary and non-manifold vertices stay.
+
+    One run emits a level of detail per face target (largest first). max_error bounds the quadric
+    error of every collapse (roughly the distance from the original surface); without face targets
+    the mesh is decimated until that bound stops it. Returns [{"target_faces", "vertices", "faces",
+    "quadric_error"}] with one entry per distinct LOD reached.
+    """
+    vertices = np.array(vertices, dtype=np.float64)
+    faces = np.array(faces, dtype=np.int64)
+    if not face_targets and max_error is None:
+        raise ValueError("decimate needs face targets or an error bound")
+    targets = sorted(face_targets or [4], reverse=True)
+
+    original = len(faces)
+    quadrics = _plane_quadrics(vertices, faces)
+    locked = pinned_vertices(vertices, faces, feature_angle=180.0)
+    max_cost = max_error ** 2 if max_error is not None else np.inf
+    rejected = np.zeros(0, dtype=np.int64)  # keys of edges whose last collapse attempt failed
+    # Collapse targets of the previous pass, by edge key; only edges at moved vertices are recomputed
+    cached_keys = cached_positions = cached_cost = np.zeros(0)
+    moved = np.zeros(len(vertices), dtype=bool)
+    error = 0.0
+
+    lods = []
+    for target in targets:
+        while len(faces) > max(target, 4):
+            pairs = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+            keys, counts = np.unique(pairs[:, 0] * len(vertices) + pairs[:, 1], return_counts=True)
+            edges = np.column_stack([keys // len(vertices), keys % len(vertices)])
+            if len(cached_keys):
+                slot = np.searchsorted(cached_keys, keys).clip(max=len(cached_keys) - 1)
+                fresh = (cached_keys[slot] != keys) | _touching(moved, edges)
+                positions, cost = cached_positions[slot], cached_cost[slot]
+            else:
+                fresh = np.ones(len(keys), dtype=bool)
+                positions, cost = np.zeros((len(keys), 3)), np.zeros(len(keys))
+            positions[fresh], cost[fresh] = _collapse_targets(quadrics, vertices, edges[fresh])
+            cached_keys, cached_positions, cached_cost = keys, positions, cost
+            moved[:] = False
+            eligible = (counts == 2) & ~_touching(locked, edges) & (cost <= max_cost) & ~np.isin(keys, rejected)
+            selected = _independent(edges, faces, cost, eligible, len(vertices))
+            # Each collapse of an interior edge removes two faces; never overshoot the target
+            selected = selected[:(len(faces) - target + 1) // 2]
+            if not len(selected):
+                break
+
+            valid = _valid_collapses(vertices, faces, edges[selected], positions[selected], min_quality)
+            rejected = np.concatenate([rejected, keys[selected[~valid]]])
+            accepted = selected[valid]
+            if not len(accepted):
+                continue
+
+            keep, drop = edges[accepted, 0], edges[accepted, 1]
+            vertices[keep] = positions[accepted]
+            moved[keep] = True
+            quadrics[keep] += quadrics[drop]
+            error = max(error, float(np.sqrt(cost[accepted].max())))
+            remap = np.arange(len(vertices))
+            remap[drop] = keep
+            faces = remap[faces]
+            faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])]
+
+            # Geometry around the collapses changed, so their neighbours may be retried
+            touched = np.zeros(len(vertices), dtype=bool)
+            touched[keep] = True
+            touched[faces[_touching(touched, faces)].ravel()] = True
+            rejected = rejected[~(touched[rejected // len(vertices)] | touched[rejected % len(vertices)])]
+
+        if len(faces) < (len(lods[-1]["faces"]) if lods else original):
+            lod_vertices, lod_faces = _compact(vertices, faces)
+            lods.append({"target_faces": target, "vertices": lod_vertices, "faces": lod_faces,
+                         "quadric_error": error})
+        if len(faces) > max(target, 4):
+            break  # the error bound (or the checks) stopped the decimation
+    return lods
+
+
+def deviation(original: trimesh.Trimesh, lod: trimesh.Trimesh, samples: int = DEVIATION_SAMPLES) -> dict:
+    """
+    Two-sided surface distance between a LOD and the original from points sampled on both:
+    the maximum (a Hausdorff estimate) and the RMS, absolute and relative to the bounding-box diagonal.
+    """
+    seed = np.random.default_rng(0)
+    distances = []
+    for source, target in ((original, lod), (lod, original)):
+        points, _ = trimesh.sample.sample_surface(source, samples, seed=seed)
+        distance, _ = TriangleIndex(target.vertices, target.faces).query(points)
+        distances.append(distance)
+    distances = np.concatenate(distances)
+    diagonal = float(np.linalg.norm(original.extents)) or 1.0
+    hausdorff, rms = float(distances.max()), float(np.sqrt(np.mean(distances ** 2)))
+    return {"hausdorff": hausdorff, "rms": rms,
+            "hausdorff_relative": hausdorff / diagonal, "rms_relative": rms / diagonal}
@@ -0,0 +1,278 @@
+from typing import Dict, Tuple
+
+import gmsh
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Points sampled on the BREP (spread over the surfaces by area) and on the mesh per measurement
+SAMPLE_COUNT = 20000
+MIN_SAMPLES_PER_SURFACE = 4
+
+# (u, v) draws per wanted sample on trimmed surfaces, and rounds before giving up
+OVERSAMPLING = 1.5
+SAMPLING_ROUNDS = 4
+
+# Points per boundary curve in the (u, v) trimming loops, and the size of the inside-test batches
+BOUNDARY_SAMPLES = 64
+INSIDE_CHUNK = 2 ** 22
+
+# Triangle size classes in the nearest-triangle index (radii halve from one to the next), and
+# nearest centroids examined per class before widening the search
+SIZE_CLASSES = 16
+NEIGHBOURS = 16
+
+# Tangent disks of the nearest BREP samples tried for every mesh point, and their radius in sample
+# spacings (random samples leave gaps, so the disks overlap)
+DISK_CANDIDATES = 16
+DISK_RADIUS = 1.5
+
+
+def closest_points_on_triangles(points: np.ndarray, a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Closest point on each triangle (a, b, c) to the matching point (Ericson's Voronoi-region test, batched)."""
+    ab, ac, ap = b - a, c - a, points - a
+    bp, cp = points - b, points - c
+    d1, d2 = np.einsum("ij,ij->i", ab, ap), np.einsum("ij,ij->i", ac, ap)
+    d3, d4 = np.einsum("ij,ij->i", ab, bp), np.einsum("ij,ij->i", ac, bp)
+    d5, d6 = np.einsum("ij,ij->i", ab, cp), np.einsum("ij,ij->i", ac, cp)
+    va, vb, vc = d3 * d6 - d5 * d4, d5 * d2 - d1 * d6, d1 * d4 - d3 * d2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denominator = va + vb + vc
+        result = a + ab * (vb / denominator)[:, None] + ac * (vc / denominator)[:, None]
+        # Regions in reverse order of the scalar algorithm, so the first matching test wins
+        regions = [
+            ((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0),
+             lambda m: b[m] + (c[m] - b[m]) * ((d4 - d3)[m] / ((d4 - d3)[m] + (d5 - d6)[m]))[:, None]),
+            ((vb <= 0) & (d2 >= 0) & (d6 <= 0), lambda m: a[m] + ac[m] * (d2[m] / (d2[m] - d6[m]))[:, None]),
+            ((d6 >= 0) & (d5 <= d6), lambda m: c[m]),
+            ((vc <= 0) & (d1 >= 0) & (d3 <= 0), lambda m: a[m] + ab[m] * (d1[m] / (d1[m] - d3[m]))[:, None]),
+            ((d3 >= 0) & (d4 <= d3), lambda m: b[m]),
+            ((d1 <= 0) & (d2 <= 0), lambda m: a[m]),
+        ]
+        for mask, closest in regions:
+            if mask.any():
+                result[mask] = closest(mask)
+
+    # Degenerate (zero-area) triangles: fall back to their nearest corner
+    broken = ~np.isfinite(result).all(axis=1)
+    if broken.any():
+        corners = np.stack([a[broken], b[broken], c[broken]], axis=1)
+        nearest = np.argmin(np.linalg.norm(corners - points[broken, None], axis=2), axis=1)
+        result[broken] = corners[np.arange(len(corners)), nearest]
+    return result
+
+
+class TriangleIndex:
+    """
+    Nearest-triangle queries on a mesh. Triangles are indexed by their centroids, one tree per
+    size class (bounding radii within a factor of two), and no point of a triangle lies farther
+    from its centroid than its class's `reach`: once the nearest centroids of a class are all
+    farther than best + reach, no unseen triangle of that class can be closer. Every triangle is
+    a single index point, however large.
+    """
+
+    def __init__(self, vertices, faces):
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.faces = np.asarray(faces, dtype=np.int64)
+        a, b, c = (self.vertices[self.faces[:, i]] for i in range(3))
+        centroids = (a + b + c) / 3.0
+        radii = np.max(np.stack([np.linalg.norm(a - centroids, axis=1), np.linalg.norm(b - centroids, axis=1),
+                                 np.linalg.norm(c - centroids, axis=1)]), axis=0)
+        # Class l holds radii in (top / 2 ** (l + 1), top / 2 ** l]; the smallest classes are merged
+        top = float(radii.max()) if len(radii) else 0.0
+        with np.errstate(divide="ignore"):
+            level = np.floor(np.log2(top / radii)) if top > 0 else np.zeros(len(radii))
+        level = np.clip(np.nan_to_num(level, posinf=SIZE_CLASSES), 0, SIZE_CLASSES - 1).astype(np.int64)
+
+        # (tree, faces, reach) per class
+        self.classes = []
+        for cls in np.unique(level):
+            members = np.flatnonzero(level == cls)
+            self.classes.append((cKDTree(centroids[members]), members, float(radii[members].max())))
+
+    def query(self, points) -> Tuple[np.ndarray, np.ndarray]:
+        """Distance from every point to the mesh and the index of the nearest face."""
+        points = np.asarray(points, dtype=np.float64)
+        distances = np.full(len(points), np.inf)
+        nearest = np.full(len(points), -1)
+        # Start from the triangle of the nearest centroid in every class, so that a class far from
+        # a point is ruled out at once instead of searched until its own bound settles
+        first = []
+        for tree, members, _ in self.classes:
+            index_distance, index = tree.query(points)
+            self._improve(points, np.arange(len(points)), members[index][:, None], distances, nearest)
+            first.append(index_distance)
+
+        for (tree, members, reach), index_distance in zip(self.classes, first):
+            # Skip the points already closer to another class than anything in this one
+            pending = np.flatnonzero(distances > index_distance - reach)
+            k = NEIGHBOURS
+            while len(pending):
+                k = min(k, tree.n)
+                index_distance, index = tree.query(points[pending], k=k)
+                index_distance, index = index_distance.reshape(len(pending), k), index.reshape(len(pending), k)
+                self._improve(points, pending, members[index], distances, nearest)
+                # Settled once no unseen centroid can belong to a closer triangle
+                settled = (k >= tree.n) | (distances[pending] <= index_distance[:, -1] - reach)
+                pending = pending[~settled]
+                k *= 2
+        return distances, nearest
+
+    def _improve(self, points, pending, candidates, distances, nearest):
+        """Lower the distances of the pending points to their best (pending, k) candidate faces."""
+        k = candidates.shape[1]
+        repeated = np.repeat(points[pending], k, axis=0)
+        tri = self.faces[candidates.ravel()]
+        closest = closest_points_on_triangles(repeated, self.vertices[tri[:, 0]], self.vertices[tri[:, 1]],
+                                              self.vertices[tri[:, 2]])
+        exact = np.linalg.norm(closest - repeated, axis=1).reshape(len(pending), k)
+        best = np.argmin(exact, axis=1)
+        rows = np.arange(len(pending))
+        closer = exact[rows, best] < distances[pending]
+        distances[pending[closer]] = exact[rows, best][closer]
+        nearest[pending[closer]] = candidates[rows, best][closer]
+
+
+def _boundary_segments(surface: int) -> np.ndarray:
+    """The trimming loops of a surface as (u, v) segments, from its boundary curves' pcurves."""
+    segments, seen = [], {}
+    for _, curve in gmsh.model.getBoundary([(2, surface)], combined=False, oriented=False):
+        curve = abs(curve)
+        # A seam bounds a periodic surface twice, once on either side of the period
+        which = seen[curve] = seen.get(curve, -1) + 1
+        (tmin,), (tmax,) = gmsh.model.getParametrizationBounds(1, curve)
+        uv = np.reshape(gmsh.model.reparametrizeOnSurface(
+            1, curve, np.linspace(tmin, tmax, BOUNDARY_SAMPLES), surface, which), (-1, 2))
+        segments.append(np.stack([uv[:-1], uv[1:]], axis=1))
+    return np.concatenate(segments) if segments else np.zeros((0, 2, 2))
+
+
+def _inside(uv: np.ndarray, segments: np.ndarray) -> np.ndarray:
+    """Even-odd test of (u, v) points against unordered boundary segments (a ray toward +u)."""
+    inside = np.zeros(len(uv), dtype=bool)
+    (u0, v0), (u1, v1) = segments[:, 0].T, segments[:, 1].T
+    step = max(1, INSIDE_CHUNK // max(len(segments), 1))
+    for start in range(0, len(uv), step):
+        u, v = uv[start:start + step, :1], uv[start:start + step, 1:]
+        spans = (v0 > v) != (v1 > v)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = u0 + (v - v0) * (u1 - u0) / (v1 - v0)
+        inside[start:start + step] = np.count_nonzero(spans & (crossing > u), axis=1) % 2 == 1
+    return inside
+
+
+def sample_surfaces(count: int = SAMPLE_COUNT, seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Points on the trimmed surfaces of the loaded Gmsh model, spread by area, through each
+    surface's (u, v) parametrization. Returns the points, the unit normals there, and the
+    radius each point covers on its surface (the sample spacing).
+    """
+    rng = np.random.default_rng(seed)
+    surfaces = [tag for _, tag in gmsh.model.getEntities(2)]
+    areas = np.array([gmsh.model.occ.getMass(2, tag) for tag in surfaces])
+    wanted = np.maximum(np.round(count * areas / max(areas.sum(), 1e-300)).astype(int), MIN_SAMPLES_PER_SURFACE)
+
+    points, normals, radii = [], [], []
+    for surface, area, target in zip(surfaces, areas, wanted):
+        (umin, vmin), (umax, vmax) = np.reshape(gmsh.model.getParametrizationBounds(2, surface), (2, 2))
+        segments = _boundary_segments(surface)
+        found, drawn, draws = [], 0, int(target * OVERSAMPLING)
+        for _ in range(SAMPLING_ROUNDS):
+            uv = np.column_stack([rng.uniform(umin, umax, draws), rng.uniform(vmin, vmax, draws)])
+            # Holes and trimmed edges: keep the parameters that fall on the face itself
+            found.append(uv[_inside(uv, segments)])
+            drawn += draws
+            kept = sum(len(f) for f in found)
+            if kept >= target:
+                break
+            # Enough for the rest at the acceptance rate seen so far (a heavily trimmed face
+            # may have accepted nothing yet, so the draws grow at most geometrically)
+            draws = min(int(OVERSAMPLING * (target - kept) * drawn / max(kept, 1)), 16 * drawn)
+        uv = np.concatenate(found)[:target]
+        if not len(uv):
+            continue
+        points.append(np.reshape(gmsh.model.getValue(2, surface, uv.ravel()), (-1, 3)))
+        normals.append(np.reshape(gmsh.model.getNormal(surface, uv.ravel()), (-1, 3)))
+        radii.append(np.full(len(uv), np.sqrt(area / len(uv))))
+    if not points:
+        return np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0)
+    return np.concatenate(points), np.concatenate(normals), np.concatenate(radii)
+
+
+def _stats(distances: np.ndarray) -> Dict[str, float]:
+    if not len(distances):
+        return {"max": 0.0, "rms": 0.0, "mean": 0.0}
+    return {"max": float(distances.max()), "rms": float(np.sqrt(np.mean(distances ** 2))),
+            "mean": float(distances.mean())}
+
+
+def _sample_mesh(vertices: np.ndarray, faces: np.ndarray, count: int, rng) -> np.ndarray:
+    a, b, c = (vertices[faces[:, i]] for i in range(3))
+    areas = 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+    if not len(faces) or areas.sum() <= 0:
+        return np.zeros((0, 3))
+    chosen = rng.choice(len(faces), size=count, p=areas / areas.sum())
+    r1, r2 = rng.random(count), rng.random(count)
+    flip = r1 + r2 > 1
+    r1[flip], r2[flip] = 1 - r1[flip], 1 - r2[flip]
+    return a[chosen] + (b - a)[chosen] * r1[:, None] + (c - a)[chosen] * r2[:, None]
+
+
+def disk_distances(points: np.ndarray, centers: np.ndarray, normals: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    """Distance from every point to the matching disk (center, unit normal, radius)."""
+    offset = points - centers
+    height = np.einsum("ij,ij->i", offset, normals)
+    tangential = np.linalg.norm(offset - height[:, None] * normals, axis=1)
+    return np.hypot(height, np.maximum(tangential - radii, 0.0))
+
+
+class FidelityCheck:
+    """
+    Distance between a mesh and the BREP it came from, cheap enough for every iteration.
+
+    BREP -> mesh: exact point-to-triangle distances from BREP samples through a TriangleIndex.
+    Mesh -> BREP: the surfaces are approximated by the tangent disks of the BREP samples, an
+    estimate good to about one sample spacing per point that stays within a few percent in
+    the maximum and the RMS. The samples of a model are drawn once and cached per key, so only the first
+    measurement queries Gmsh; the model must be loaded then.
+    """
+
+    def __init__(self, samples: int = SAMPLE_COUNT):
+        self.samples = samples
+        self._reference = None  # (model key, (points, normals, radii, tree, diagonal))
+
+    def reference(self, key: str):
+        if self._reference is None or self._reference[0] != key:
+            points, normals, radii = sample_surfaces(self.samples)
+            xmin, ymin, zmin, xmax, ymax, zmax = gmsh.model.getBoundingBox(-1, -1)
+            diagonal = float(np.linalg.norm([xmax - xmin, ymax - ymin, zmax - zmin])) or 1.0
+            self._reference = (key, (points, normals, radii, cKDTree(points), diagonal))
+        return self._reference[1]
+
+    def measure(self, key: str, vertices, faces) -> dict:
+        """
+        One-sided ("brep_to_mesh", "mesh_to_brep") and symmetric Hausdorff/RMS distances,
+        the symmetric ones also relative to the model's bounding-box diagonal.
+        """
+        points, normals, radii, tree, diagonal = self.reference(key)
+        vertices = np.asarray(vertices, dtype=np.float64)
+        faces = np.asarray(faces, dtype=np.int64)
+
+        brep_to_mesh, _ = TriangleIndex(vertices, faces).query(points)
+
+        mesh_points = _sample_mesh(vertices, faces, len(points), np.random.default_rng(0))
+        mesh_to_brep = np.zeros(len(mesh_points))
+        if len(mesh_points) and len(points):
+            k = min(DISK_CANDIDATES, len(points))
+            _, nearest = tree.query(mesh_points, k=k)
+            nearest = nearest.reshape(len(mesh_points), k).ravel()
+            distances = disk_distances(np.repeat(mesh_points, k, axis=0), points[nearest], normals[nearest],
+                                       DISK_RADIUS * radii[nearest])
+            mesh_to_brep = distances.reshape(-1, k).min(axis=1)
+
+        both = np.concatenate([brep_to_mesh, mesh_to_brep])
+        hausdorff = float(both.max()) if len(both) else 0.0
+        rms = float(np.sqrt(np.mean(both ** 2))) if len(both) else 0.0
+        return {"brep_to_mesh": _stats(brep_to_mesh), "mesh_to_brep": _stats(mesh_to_brep),
+                "hausdorff": hausdorff, "rms": rms,
+                "hausdorff_relative": hausdorff / diagonal, "rms_relative": rms / diagonal}
@@ -0,0 +1,110 @@
+import json
+import math
+import os
+from typing import Optional
+
+
+def mesh_size_factor(fineness: float) -> float:
+    # Same mapping as MesherAgent: fineness 0.0-1.0 -> Mesh.MeshSizeFactor 1.0-0.1
+    return 1.0 - (fineness * 0.9)
+
+
+def fineness_for_factor(factor: float) -> float:
+    return (1.0 - factor) / 0.9
+
+
+class FinenessSearch:
+    """
+    Chooses the fineness for each remesh of one job.
+
+    Remeshing only happens when a finer mesh is needed, so the search bisects upwards
+    between the finest setting that still failed and the finest setting allowed
+    (max_fineness, or the predicted face budget). Face counts scale with
+    1 / MeshSizeFactor^2, which lets the first mesh predict the cost of later ones.
+    Settings that converged are remembered per part signature in an optional JSON file.
+    """
+
+    def __init__(self, face_budget: Optional[int] = None, history_path: Optional[str] = None,
+                 start: float = 0.5, max_fineness: float = 1.0, min_step: float = 0.05):
+        self.face_budget = face_budget
+        self.history_path = history_path
+        self.start = start
+        self.max_fineness = max_fineness
+        self.min_step = min_step
+        self.current: Optional[float] = None
+        self.failed_at: Optional[float] = None
+        self.observations = []  # (fineness, face_count)
+
+    @staticmethod
+    def signature(parse_metadata: dict) -> str:
+        # Parts with a similar number of surfaces (same power of two) and volumes share settings
+        surfaces = int(parse_metadata.get("surface_count") or 0)
+        volumes = int(parse_metadata.get("volume_count") or 0)
+        return f"s{int(math.log2(surfaces + 1))}-v{volumes}"
+
+    def _load_history(self) -> dict:
+        if not self.history_path or not os.path.exists(self.history_path):
+            return {}
+        try:
+            with open(self.history_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def initial(self, parse_metadata: dict) -> float:
+        remembered = self._load_history().get(self.signature(parse_metadata))
+        if remembered:
+            # Median of the settings that converged for similar parts
+            self.current = sorted(remembered)[len(remembered) // 2]
+        else:
+            self.current = self.start
+        return self.current
+
+    def record(self, fineness: float, face_count: Optional[int]):
+        self.current = fineness
+        if face_count:
+            self.observations.append((fineness, int(face_count)))
+
+    def predict_faces(self, fineness: float) -> Optional[float]:
+        if not self.observations:
+            return None
+        seen_fineness, seen_faces = self.observations[-1]
+        return seen_faces * (mesh_size_factor(seen_fineness) / mesh_size_factor(fineness)) ** 2
+
+    def budget_limit(self) -> float:
+        # Finest setting whose predicted face count stays within the budget
+        if not self.face_budget or not self.observations:
+            return self.max_fineness
+        seen_fineness, seen_faces = self.observations[-1]
+        factor = mesh_size_factor(seen_fineness) * math.sqrt(seen_faces / self.face_budget)
+        return min(self.max_fineness, fineness_for_factor(factor))
+
+    def next(self) -> Optional[float]:
+        """
+        Fineness for the next remesh, or None when no finer setting can make progress
+        (interval exhausted or face budget reached).
+        """
+        if self.current is not None:
+            self.failed_at = max(self.failed_at or 0.0, self.current)
+        low = self.failed_at if self.failed_at is not None else self.start
+        high = self.budget_limit()
+        if high - low < self.min_step:
+            return None
+        return round((low + high) / 2.0, 4)
+
+    def exhausted_reason(self) -> str:
+        # Which limit closed the interval once next() returned None
+        if self.face_budget and self.budget_limit() < self.max_fineness:
+            return f"no finer setting within the face budget of {self.face_budget}"
+        return f"no finer setting below the maximum fineness {self.max_fineness:g}"
+
+    def remember(self, parse_metadata: dict):
+        if not self.history_path or self.current is None:
+            return
+        history = self._load_history()
+        key = self.signature(parse_metadata)
+        history[key] = (history.get(key, []) + [self.current])[-20:]
+        tmp_path = f"{self.history_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(history, f, indent=2)
+        os.replace(tmp_path, self.history_path)
@@ -0,0 +1,149 @@
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+import gmsh
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Signatures are rounded to this many significant digits (coordinates in STEP files are not exact)
+SIGNATURE_DIGITS = 6
+
+# Probe points must land within this fraction of the solid's size to accept a placement
+MATCH_TOLERANCE = 1e-5
+
+
+def _round(value: float) -> float:
+    return float(f"{value:.{SIGNATURE_DIGITS}g}")
+
+
+def _exclusive_surfaces(volume: int) -> Optional[List[int]]:
+    # Solids sharing a face with another solid are never treated as instances
+    surfaces = [abs(s) for _, s in gmsh.model.getBoundary([(3, volume)], oriented=False)]
+    for surface in surfaces:
+        upward, _ = gmsh.model.getAdjacencies(2, surface)
+        if len(upward) != 1:
+            return None
+    return surfaces
+
+
+def fingerprint(volume: int, surfaces: List[int]) -> tuple:
+    """
+    Placement-independent signature of a solid: its topology (entity counts, surface types)
+    and its volume, area and principal moments of inertia.
+    """
+    curves = gmsh.model.getBoundary([(2, s) for s in surfaces], combined=False, oriented=False)
+    curves = {abs(c) for _, c in curves}
+    surface_types = sorted(gmsh.model.getType(2, s) for s in surfaces)
+    area = sum(gmsh.model.occ.getMass(2, s) for s in surfaces)
+    moments = np.linalg.eigvalsh(np.reshape(gmsh.model.occ.getMatrixOfInertia(3, volume), (3, 3)))
+    return (len(surfaces), len(curves), tuple(surface_types),
+            _round(gmsh.model.occ.getMass(3, volume)), _round(area),
+            tuple(_round(m) for m in moments))
+
+
+def _frame(volume: int, surfaces: List[int]):
+    # Center of mass, principal axes and probe points (vertices and surface centroids)
+    center = np.array(gmsh.model.occ.getCenterOfMass(3, volume))
+    _, axes = np.linalg.eigh(np.reshape(gmsh.model.occ.getMatrixOfInertia(3, volume), (3, 3)))
+    points = gmsh.model.getBoundary([(3, volume)], recursive=True)
+    probes = [gmsh.model.getValue(0, abs(p), []) for _, p in points]
+    probes += [gmsh.model.occ.getCenterOfMass(2, s) for s in surfaces]
+    return center, axes, np.asarray(probes, dtype=np.float64)
+
+
+def _frame_from(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    # Orthonormal frame spanned by two non-parallel vectors (columns)
+    e1 = first / np.linalg.norm(first)
+    e2 = second - e1 * (e1 @ second)
+    e2 /= np.linalg.norm(e2)
+    return np.column_stack([e1, e2, np.cross(e1, e2)])
+
+
+def _candidate_rotations(source, target, tolerance: float):
+    source_center, source_axes, source_probes = source
+    target_center, target_axes, target_probes = target
+    # 1. Principal axes, which are only defined up to sign
+    for signs in itertools.product((1, -1), repeat=3):
+        yield target_axes @ np.diag(signs) @ source_axes.T
+
+    # 2. Repeated principal moments (round or cubic parts) leave the axes arbitrary, so
+    #    align the farthest probe and the probe least parallel to it with every target pair
+    #    of matching lengths and angle
+    a = source_probes - source_center
+    b = target_probes - target_center
+    norms_a, norms_b = np.linalg.norm(a, axis=1), np.linalg.norm(b, axis=1)
+    i = int(np.argmax(norms_a))
+    cross = np.linalg.norm(np.cross(a[i], a), axis=1)
+    j = int(np.argmax(cross))
+    if cross[j] <= tolerance * norms_a[i]:
+        return  # all probes on one line
+    source_frame = _frame_from(a[i], a[j])
+    for k in np.flatnonzero(np.abs(norms_b - norms_a[i]) <= tolerance):
+        for m in np.flatnonzero(np.abs(norms_b - norms_a[j]) <= tolerance):
+            if abs(b[k] @ b[m] - a[i] @ a[j]) > tolerance * (norms_a[i] + norms_a[j]):
+                continue
+            if np.linalg.norm(np.cross(b[k], b[m])) <= tolerance * norms_b[k]:
+                continue
+            yield _frame_from(b[k], b[m]) @ source_frame.T
+
+
+def placement(source, target) -> Optional[np.ndarray]:
+    """
+    Rigid transform (4x4) mapping the `source` frame onto `target`, or None.
+    A candidate rotation is accepted when every probe point lands on one of the target's;
+    reflections never match, so mirrored parts are not instances.
+    """
+    source_center, _, source_probes = source
+    target_center, _, target_probes = target
+    if len(source_probes) != len(target_probes) or not len(source_probes):
+        return None
+    tolerance = MATCH_TOLERANCE * (np.ptp(target_probes, axis=0).max() or 1.0)
+    tree = cKDTree(target_probes)
+    for rotation in _candidate_rotations(source, target, tolerance):
+        if np.linalg.det(rotation) < 0:
+            continue
+        moved = (source_probes - source_center) @ rotation.T + target_center
+        distances, _ = tree.query(moved)
+        if distances.max() <= tolerance:
+            transform = np.eye(4)
+            transform[:3, :3] = rotation
+            transform[:3, 3] = target_center - rotation @ source_center
+            return transform
+    return None
+
+
+def find_instances() -> List[Dict]:
+    """
+    Groups the solids of the loaded model that are copies of one another.
+    Returns [{"solids": [representative, copy, ...], "transforms": [4x4 per solid]}] for every
+    group with at least one copy; transforms map the representative onto each solid.
+    """
+    candidates: Dict[tuple, List[Tuple[int, List[int]]]] = {}
+    for _, volume in gmsh.model.getEntities(3):
+        surfaces = _exclusive_surfaces(volume)
+        if surfaces is None:
+            continue
+        candidates.setdefault(fingerprint(volume, surfaces), []).append((volume, surfaces))
+
+    groups = []
+    for members in candidates.values():
+        if len(members) < 2:
+            continue
+        classes = []  # [(representative frame, group dict)]
+        for volume, surfaces in members:
+            frame = _frame(volume, surfaces)
+            for representative, group in classes:
+                transform = placement(representative, frame)
+                if transform is not None:
+                    group["solids"].append(volume)
+                    group["transforms"].append(transform.tolist())
+                    break
+            else:
+                classes.append((frame, {"solids": [volume], "transforms": [np.eye(4).tolist()]}))
+        groups.extend(group for _, group in classes if len(group["solids"]) > 1)
+    return groups
+
+
+def place(vertices: np.ndarray, transform) -> np.ndarray:
+    transform = np.asarray(transform, dtype=np.float64)
+    return vertices @ transform[:3, :3].T + transform[:3, 3]
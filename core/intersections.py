@@ -0,0 +1,152 @@
+import numpy as np
+
+# Candidate pairs are tested in fixed-size chunks to bound peak memory
+PAIR_CHUNK = 1 << 18
+# Triangles per broad-phase lookup batch (each looks up at most 27 cells)
+QUERY_CHUNK = 1 << 16
+# Triangle size (percentile) that the finest regular grid level is fitted to
+BULK_PERCENTILE = 90
+# Grid levels below the mesh size: bounds the cell keys for degenerate slivers
+MAX_LEVELS = 18
+# Per-axis cell offsets of a lookup block
+STEPS = np.arange(3)
+# Parallel tolerance, relative to the lengths of the segment and the triangle edges
+EPS = 1e-12
+
+
+def _candidate_pairs(tri_min: np.ndarray, tri_max: np.ndarray) -> np.ndarray:
+    """
+    Broad phase: hierarchical grid over triangle bounding boxes. Each triangle is
+    stored once, in the cell holding its min corner, at the finest level whose cell
+    is at least as large as the triangle; it then looks up at most 27 cells on its
+    own and each coarser occupied level. Per-triangle work is bounded however graded
+    the mesh is. Returns each pair of faces with overlapping boxes exactly once.
+    """
+    n_faces = len(tri_min)
+    size = (tri_max - tri_min).max(axis=1)
+    origin = tri_min.min(axis=0)
+    top = float((tri_max.max(axis=0) - origin).max())
+    if top <= 0:
+        # Every triangle collapsed onto one point: all boxes overlap
+        a, b = np.triu_indices(n_faces, k=1)
+        return np.stack([a, b], axis=1)
+    # Level 0 fits the bulk of the triangles snugly; levels run coarser and finer from
+    # there, the finest clamped so that degenerate slivers cannot overflow the cell keys
+    base = float(np.percentile(size, BULK_PERCENTILE)) or top
+    finest = np.floor(np.log2(top / base)) - MAX_LEVELS
+    level = np.ceil(np.log2(np.maximum(size, base * 2.0 ** finest) / base)).astype(np.int64)
+
+    min_axes, max_axes = np.ascontiguousarray(tri_min.T), np.ascontiguousarray(tri_max.T)
+    pairs = []
+    for lvl in np.unique(level):
+        cell = base * 2.0 ** lvl
+        # Cells indexed from -1 so that the lookups below stay non-negative
+        dims = np.floor(top / cell).astype(np.int64) + 3
+        stored = np.flatnonzero(level == lvl)
+        corner = np.floor((tri_min[stored] - origin) / cell).astype(np.int64) + 1
+        keys = corner[:, 0] + dims * (corner[:, 1] + dims * corner[:, 2])
+        order = np.argsort(keys)
+        keys, stored = keys[order], stored[order]
+
+        # Finer and equal triangles look up this level; a stored box is no wider than
+        # a cell, so its min corner lies at most one cell below the querying box.
+        # Queries run in cell order too, which keeps the lookups and gathers cache-local.
+        queries = np.flatnonzero(level <= lvl)
+        corner = np.floor((tri_min[queries] - origin) / cell).astype(np.int64)
+        queries = queries[np.lexsort(corner.T)]
+        for start in range(0, len(queries), QUERY_CHUNK):
+            query = queries[start:start + QUERY_CHUNK]
+            lo = np.floor((tri_min[query] - origin) / cell).astype(np.int64)
+            hi = np.floor((tri_max[query] - origin) / cell).astype(np.int64) + 1
+            # Per axis, the cells lo - 1 .. hi (shifted by one), as a 3x3x3 block per query
+            axis = lo[:, :, None] + STEPS
+            inside = axis <= hi[:, :, None]
+            lookup = axis[:, 0, None, None, :] + dims * (axis[:, 1, None, :, None] + dims * axis[:, 2, :, None, None])
+            inside = inside[:, 0, None, None, :] & inside[:, 1, None, :, None] & inside[:, 2, :, None, None]
+            # A same-level pair would be found from both sides: only look up cells keyed
+            # at or below the triangle's own, and break ties inside its own cell by index
+            own = lookup[:, 1, 1, 1]
+            inside &= (level[query] < lvl)[:, None, None, None] | (lookup <= own[:, None, None, None])
+            owner = np.broadcast_to(query[:, None, None, None], inside.shape)[inside]
+            tie = (lookup == own[:, None, None, None])[inside]
+            lookup = lookup[inside]
+            left = np.searchsorted(keys, lookup, side="left")
+            counts = np.searchsorted(keys, lookup, side="right") - left
+            a = np.repeat(owner, counts)
+            b = stored[np.repeat(left - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+            keep = ~np.repeat(tie, counts) | (level[a] < lvl) | (a < b)
+            a, b = a[keep], b[keep]
+            # Box overlap one axis at a time, so each gather only touches the survivors
+            for low, high in zip(min_axes, max_axes):
+                keep = (low[a] <= high[b]) & (low[b] <= high[a])
+                a, b = a[keep], b[keep]
+            pairs.append(np.stack([a, b], axis=1))
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(pairs)
+
+
+def _segments_hit_triangles(p0, p1, v0, v1, v2) -> np.ndarray:
+    # Vectorized Moller-Trumbore, restricted to the open segment p0 -> p1
+    direction = p1 - p0
+    e1 = v1 - v0
+    e2 = v2 - v0
+    h = np.cross(direction, e2)
+    a = np.einsum("ij,ij->i", e1, h)
+    scale = np.linalg.norm(direction, axis=1) * np.linalg.norm(e1, axis=1) * np.linalg.norm(e2, axis=1)
+    valid = np.abs(a) > EPS * scale
+    f = np.where(valid, 1.0 / np.where(valid, a, 1.0), 0.0)
+    s = p0 - v0
+    u = f * np.einsum("ij,ij->i", s, h)
+    q = np.cross(s, e1)
+    v = f * np.einsum("ij,ij->i", direction, q)
+    t = f * np.einsum("ij,ij->i", e2, q)
+    tol = 1e-9
+    return valid & (u >= -tol) & (v >= -tol) & (u + v <= 1 + tol) & (t > tol) & (t < 1 - tol)
+
+
+def _triangles_intersect(ta: np.ndarray, tb: np.ndarray) -> np.ndarray:
+    """
+    Narrow phase for (k, 3, 3) triangle pairs: two non-coplanar triangles intersect
+    iff an edge of one crosses the other. Coplanar overlaps are not reported.
+    """
+    hit = np.zeros(len(ta), dtype=bool)
+    for first, second in ((ta, tb), (tb, ta)):
+        for i, j in ((0, 1), (1, 2), (2, 0)):
+            hit |= _segments_hit_triangles(first[:, i], first[:, j], second[:, 0], second[:, 1], second[:, 2])
+    return hit
+
+
+def find_self_intersections(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """
+    Returns an (n, 2) array of intersecting face index pairs. Faces sharing a
+    vertex (adjacent faces) are skipped.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    if len(faces) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+
+    triangles = vertices[faces]
+    tri_min = triangles.min(axis=1)
+    tri_max = triangles.max(axis=1)
+
+    candidates = _candidate_pairs(tri_min, tri_max)
+    found = []
+    for start in range(0, len(candidates), PAIR_CHUNK):
+        pairs = candidates[start:start + PAIR_CHUNK]
+        a, b = pairs[:, 0], pairs[:, 1]
+
+        # Adjacent faces share a vertex and always "touch"
+        shared = (faces[a][:, :, None] == faces[b][:, None, :]).any(axis=(1, 2))
+        pairs = pairs[~shared]
+        if not len(pairs):
+            continue
+
+        hit = _triangles_intersect(triangles[pairs[:, 0]], triangles[pairs[:, 1]])
+        found.append(pairs[hit])
+
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(found)
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+# Row statuses that settle a job; a killed (TIMEOUT) or dead (CRASH) worker says nothing about the model
+FINAL_STATUSES = ("SUCCESS", "FAILURE")
+
+
+class BatchJournal:
+    """
+    Append-only JSON-lines record of finished batch jobs.
+
+    Each record is written with a single append and fsync'd, so a crash loses at most
+    the record being written; a torn last line is ignored when the journal is read.
+    Records are keyed on the input file hash plus the settings that affect the result,
+    so a resumed batch skips exactly the models it already processed the same way (and
+    runs the ones whose worker timed out or crashed again).
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        directory = os.path.dirname(self.path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    @staticmethod
+    def job_key(input_hash: str, settings: Optional[dict] = None) -> str:
+        blob = json.dumps({"input": input_hash, "settings": settings or {}}, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def records(self) -> List[dict]:
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # torn write from a crash
+        return records
+
+    def latest(self) -> Dict[str, dict]:
+        """Latest record per job key."""
+        return {record["key"]: record for record in self.records() if "key" in record}
+
+    def completed(self) -> Dict[str, dict]:
+        """Latest record per job key, for the jobs it gave a final outcome (TIMEOUT and CRASH are retried)."""
+        return {key: record for key, record in self.latest().items()
+                if record.get("row", {}).get("Status") in FINAL_STATUSES}
+
+    def append(self, key: str, input_path: str, row: dict, settings: Optional[dict] = None):
+        record = {"key": key, "input_path": input_path, "settings": settings or {},
+                  "finished_at": time.time(), "row": row}
+        line = (json.dumps(record, default=str) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            # Terminate a torn last line first so it cannot swallow this record
+            size = os.fstat(fd).st_size
+            if size:
+                with open(self.path, "rb") as f:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        os.write(fd, b"\n")
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def read_rows(path: str) -> List[dict]:
+    """Result rows from a journal, latest per model, in the order the models finished."""
+    latest = {}
+    for record in BatchJournal(path).records():
+        row = record.get("row")
+        if row:
+            latest.pop(row["Model"], None)
+            latest[row["Model"]] = row
+    return list(latest.values())
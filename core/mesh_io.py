@@ -0,0 +1,339 @@
+import json
+import os
+import struct
+
+import numpy as np
+import trimesh
+
+from core.types import Artifact
+
+# Intermediate mesh container: indexed vertices/faces (plus optional cached
+# adjacency) stored as raw little-endian arrays behind a small JSON header,
+# so they can be opened with numpy.memmap without parsing or re-welding.
+# STL stays the final deliverable only.
+MESH_BIN_EXT = ".meshbin"
+_MAGIC = b"ACMSMESH"
+_ALIGN = 64
+
+# Binary STL/PLY are written and read in blocks of this many faces, so the
+# buffers beyond the vertex/face arrays themselves stay a few MB
+CHUNK_FACES = 1 << 16
+
+_STL_HEADER = 80
+_STL_RECORD = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attributes", "<u2")])
+_PLY_FACE = np.dtype([("count", "u1"), ("indices", "<i4", (3,))])
+_PLY_TYPES = {"char": "i1", "uchar": "u1", "short": "i2", "ushort": "u2", "int": "i4", "uint": "u4",
+              "float": "f4", "double": "f8", "int8": "i1", "uint8": "u1", "int16": "i2", "uint16": "u2",
+              "int32": "i4", "uint32": "u4", "float32": "f4", "float64": "f8"}
+
+
+def to_trimesh(payload) -> trimesh.Trimesh:
+    # Payloads are either a live Trimesh or a (vertices, faces) pair of arrays
+    if isinstance(payload, trimesh.Trimesh):
+        return payload
+    vertices, faces = payload
+    return trimesh.Trimesh(vertices=np.asarray(vertices, dtype=np.float64),
+                           faces=np.asarray(faces, dtype=np.int64),
+                           process=True)
+
+
+def write_meshbin(path: str, vertices, faces, face_adjacency=None) -> str:
+    arrays = {
+        "vertices": np.ascontiguousarray(vertices, dtype="<f8"),
+        "faces": np.ascontiguousarray(faces, dtype="<i8")
+    }
+    if face_adjacency is not None:
+        arrays["face_adjacency"] = np.ascontiguousarray(face_adjacency, dtype="<i8")
+
+    # Lay out the arrays first so the header can record their offsets
+    header = {"version": 1, "arrays": {}}
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // _ALIGN) * _ALIGN
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(len(_MAGIC) + 8 + len(header_bytes)) // _ALIGN) * _ALIGN
+
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header["arrays"][name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    return path
+
+
+def read_meshbin(path: str, mode: str = "c") -> dict:
+    """
+    Memory-maps every array in a .meshbin file. The default copy-on-write
+    mode lets repairs modify the arrays without touching the file.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"Not a {MESH_BIN_EXT} file: {path}")
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    data_start = -(-(len(_MAGIC) + 8 + header_len) // _ALIGN) * _ALIGN
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        shape = tuple(spec["shape"])
+        if 0 in shape:
+            arrays[name] = np.zeros(shape, dtype=spec["dtype"])
+        else:
+            arrays[name] = np.memmap(path, dtype=spec["dtype"], mode=mode,
+                                     offset=data_start + spec["offset"], shape=shape)
+    return arrays
+
+
+def open_meshbin(path: str) -> trimesh.Trimesh:
+    arrays = read_meshbin(path)
+    # Already indexed and welded: skip trimesh's processing pass
+    mesh = trimesh.Trimesh(vertices=arrays["vertices"], faces=arrays["faces"], process=False)
+    if "face_adjacency" in arrays:
+        mesh._cache["face_adjacency"] = np.asarray(arrays["face_adjacency"])
+    return mesh
+
+
+def write_stl(path: str, vertices, faces, chunk_faces: int = CHUNK_FACES) -> str:
+    """Binary STL written block by block straight from indexed arrays (no triangle soup in memory)."""
+    vertices, faces = np.asarray(vertices), np.asarray(faces)
+    with open(path, "wb") as f:
+        f.write(b"ACMS binary STL".ljust(_STL_HEADER, b" "))
+        f.write(struct.pack("<I", len(faces)))
+        records = np.zeros(min(chunk_faces, len(faces)), dtype=_STL_RECORD)
+        for start in range(0, len(faces), chunk_faces):
+            triangles = vertices[faces[start:start + chunk_faces]].astype(np.float64)
+            block = records[:len(triangles)]
+            normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+            lengths = np.linalg.norm(normals, axis=1)
+            block["normal"] = normals / np.where(lengths > 0, lengths, 1.0)[:, None]
+            block["vertices"] = triangles
+            f.write(block.tobytes())
+    return path
+
+
+def stl_view(path: str) -> np.memmap:
+    """
+    Read-only memory map of a binary STL's triangle records (fields "normal", "vertices"
+    and "attributes"): pages are read on access, nothing is copied up front.
+    """
+    with open(path, "rb") as f:
+        f.seek(_STL_HEADER)
+        (count,) = struct.unpack("<I", f.read(4))
+    size = os.path.getsize(path)
+    if size != _STL_HEADER + 4 + count * _STL_RECORD.itemsize:
+        raise ValueError(f"Not a binary STL file: {path}")
+    if count == 0:
+        return np.zeros(0, dtype=_STL_RECORD)
+    return np.memmap(path, dtype=_STL_RECORD, mode="r", offset=_STL_HEADER + 4, shape=(count,))
+
+
+def _corner_hash(bits: np.ndarray) -> np.ndarray:
+    # 64-bit mix of a corner's 96 coordinate bits; equal corners hash alike, and the rare
+    # unequal corners that do too are told apart by their bits
+    h = (bits[:, 0].astype(np.uint64) << np.uint64(32)) | bits[:, 1]
+    h ^= bits[:, 2].astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    return h ^ (h >> np.uint64(31))
+
+
+def _find_corners(run, hashes: np.ndarray, bits: np.ndarray, index: np.ndarray):
+    """Sets `index` for the corners (hashes, bits) found in a run of known vertices sorted by hash."""
+    run_hash, run_bits, run_index = run
+    position = np.searchsorted(run_hash, hashes)
+    hit = (index < 0) & (position < len(run_hash))
+    hit[hit] = run_hash[position[hit]] == hashes[hit]
+    same = hit.copy()
+    same[hit] = np.all(run_bits[position[hit]] == bits[hit], axis=1)
+    index[same] = run_index[position[same]]
+    for row in np.flatnonzero(hit & ~same):
+        # Hash collision: check every vertex of the run with this hash
+        at = position[row]
+        while at < len(run_hash) and run_hash[at] == hashes[row]:
+            if np.array_equal(run_bits[at], bits[row]):
+                index[row] = run_index[at]
+                break
+            at += 1
+
+
+def read_stl(path: str, chunk_faces: int = CHUNK_FACES):
+    """
+    Indexed (vertices, faces) from a binary STL. Corners are copied out of the memory map
+    block by block and welded where their coordinates are bit-identical, as they are
+    in any file written from an indexed mesh. Welding is incremental: besides the
+    result, memory holds one block and the vertices found so far, hashed into sorted runs.
+    """
+    records = stl_view(path)
+    faces = np.empty((len(records), 3), dtype=np.int64)
+    found = []
+    # (hash, coordinate bits, vertex index) runs sorted by hash, each at least twice the size of
+    # the next, so every vertex is merged a logarithmic number of times
+    runs = []
+    count = 0
+    for start in range(0, len(records), chunk_faces):
+        # -0.0 and 0.0 are the same point but not the same bytes
+        block = records["vertices"][start:start + chunk_faces].reshape(-1, 3) + np.float32(0.0)
+        bits = block.view("<u4")
+
+        # Weld the block on its own first: by hash, or exactly if two different corners share one
+        hashes = _corner_hash(bits)
+        order = np.argsort(hashes)
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = hashes[order[1:]] != hashes[order[:-1]]
+        group = np.cumsum(first) - 1
+        if np.any(bits[order] != bits[order[first]][group]):
+            order = np.lexsort(bits.T)
+            first[1:] = np.any(bits[order[1:]] != bits[order[:-1]], axis=1)
+            group = np.cumsum(first) - 1
+        local = np.empty(len(order), dtype=np.int64)
+        local[order] = group
+        unique_bits = bits[order[first]]
+        hashes = hashes[order[first]]
+
+        # Then look its vertices up among the earlier blocks'
+        index = np.full(len(hashes), -1, dtype=np.int64)
+        for run in runs:
+            _find_corners(run, hashes, unique_bits, index)
+        new = np.flatnonzero(index < 0)
+        index[new] = count + np.arange(len(new))
+        count += len(new)
+        found.append(unique_bits[new].view("<f4"))
+        faces[start:start + chunk_faces] = index[local].reshape(-1, 3)
+
+        new = new[np.argsort(hashes[new], kind="stable")]
+        runs.append((hashes[new], unique_bits[new], index[new]))
+        while len(runs) > 1 and len(runs[-2][0]) <= 2 * len(runs[-1][0]):
+            merged = [np.concatenate(arrays) for arrays in zip(runs.pop(), runs.pop())]
+            order = np.argsort(merged[0], kind="stable")
+            runs.append(tuple(array[order] for array in merged))
+
+    vertices = np.concatenate(found).astype(np.float64) if found else np.zeros((0, 3))
+    return vertices, faces
+
+
+def write_ply(path: str, vertices, faces, chunk_faces: int = CHUNK_FACES) -> str:
+    """Binary little-endian PLY (double coordinates, int indices) written block by block."""
+    vertices, faces = np.asarray(vertices), np.asarray(faces)
+    header = ("ply\nformat binary_little_endian 1.0\ncomment ACMS\n"
+              f"element vertex {len(vertices)}\nproperty double x\nproperty double y\nproperty double z\n"
+              f"element face {len(faces)}\nproperty list uchar int vertex_indices\nend_header\n")
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        for start in range(0, len(vertices), chunk_faces):
+            f.write(np.ascontiguousarray(vertices[start:start + chunk_faces], dtype="<f8").tobytes())
+        records = np.zeros(min(chunk_faces, len(faces)), dtype=_PLY_FACE)
+        records["count"] = 3
+        for start in range(0, len(faces), chunk_faces):
+            block = records[:len(faces[start:start + chunk_faces])]
+            block["indices"] = faces[start:start + chunk_faces]
+            f.write(block.tobytes())
+    return path
+
+
+def read_ply(path: str):
+    """
+    Indexed (vertices, faces) from a binary little-endian triangle PLY, through memory maps.
+    Returns None for anything else (ASCII, big-endian, polygons, extra face properties),
+    which is left to trimesh.
+    """
+    with open(path, "rb") as f:
+        if f.readline().strip() != b"ply":
+            return None
+        elements, offset = [], None
+        while True:
+            line = f.readline()
+            if not line:
+                return None
+            words = line.decode("ascii", "replace").split()
+            if not words or words[0] in ("comment", "obj_info"):
+                continue
+            if words[0] == "format" and words[1] != "binary_little_endian":
+                return None
+            if words[0] == "element":
+                elements.append((words[1], int(words[2]), []))
+            elif words[0] == "property":
+                elements[-1][2].append(words[1:])
+            elif words[0] == "end_header":
+                offset = f.tell()
+                break
+
+    arrays = {}
+    for name, count, properties in elements:
+        if name == "vertex" and all(p[0] in _PLY_TYPES for p in properties):
+            dtype = np.dtype([(p[1], "<" + _PLY_TYPES[p[0]]) for p in properties])
+        elif (name == "face" and len(properties) == 1 and properties[0][0] == "list"
+                and properties[0][1] in _PLY_TYPES and properties[0][2] in _PLY_TYPES):
+            dtype = np.dtype([("count", "<" + _PLY_TYPES[properties[0][1]]),
+                              ("indices", "<" + _PLY_TYPES[properties[0][2]], (3,))])
+        else:
+            # Other elements (or their variable-length records) cannot be skipped without parsing
+            return None
+        records = (np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+                   if count else np.zeros(0, dtype=dtype))
+        arrays[name] = records
+        offset += count * dtype.itemsize
+        if "vertex" in arrays and "face" in arrays:
+            break
+    if set(arrays) != {"vertex", "face"} or not np.all(arrays["face"]["count"] == 3):
+        return None
+    vertex = arrays["vertex"]
+    vertices = np.column_stack([vertex["x"], vertex["y"], vertex["z"]]).astype(np.float64)
+    return vertices, np.asarray(arrays["face"]["indices"], dtype=np.int64)
+
+
+def load_mesh(artifact: Artifact) -> trimesh.Trimesh:
+    """
+    Returns the artifact's mesh, parsing the file only if no payload is attached.
+    The result is cached on the artifact so later hops reuse it by reference.
+    """
+    if artifact.payload is not None:
+        mesh = to_trimesh(artifact.payload)
+    elif artifact.path.endswith(MESH_BIN_EXT):
+        mesh = open_meshbin(artifact.path)
+    else:
+        mesh = _read_indexed(artifact.path)
+        if mesh is None:
+            mesh = trimesh.load(artifact.path)
+    artifact.payload = mesh
+    return mesh
+
+
+def write_mesh(payload, path: str, with_adjacency: bool = False) -> str:
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    if path.endswith(MESH_BIN_EXT):
+        if isinstance(payload, trimesh.Trimesh):
+            adjacency = payload.face_adjacency if with_adjacency else None
+            return write_meshbin(path, payload.vertices, payload.faces, adjacency)
+        vertices, faces = payload
+        return write_meshbin(path, vertices, faces)
+    writer = {".stl": write_stl, ".ply": write_ply}.get(os.path.splitext(path)[1].lower())
+    if writer is None:
+        to_trimesh(payload).export(path)
+        return path
+    # Streamed from the arrays, so the output never exists in memory as a whole
+    if isinstance(payload, trimesh.Trimesh):
+        return writer(path, payload.vertices, payload.faces)
+    vertices, faces = payload
+    return writer(path, vertices, faces)
+
+
+def _read_indexed(path: str):
+    # Binary STL/PLY through the streaming readers; None leaves other files to trimesh
+    extension = os.path.splitext(path)[1].lower()
+    arrays = None
+    if extension == ".stl":
+        try:
+            arrays = read_stl(path)
+        except ValueError:  # ASCII STL
+            return None
+    elif extension == ".ply":
+        arrays = read_ply(path)
+    if arrays is None:
+        return None
+    vertices, faces = arrays
+    return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
@@ -0,0 +1,169 @@
+import numpy as np
+
+# Faces are processed in fixed-size chunks so peak memory does not grow with the mesh
+QUALITY_CHUNK = 1 << 16
+
+# Fixed histogram bins per metric; percentiles are read off the merged histograms.
+# Out-of-range values are clamped into the first/last bin.
+HISTOGRAM_BINS = {
+    "jacobian": np.linspace(0.0, 1.0, 101),
+    "skewness": np.linspace(0.0, 1.0, 101),
+    "min_angle": np.linspace(0.0, 60.0, 121),
+    "max_angle": np.linspace(60.0, 180.0, 121),
+    "aspect_ratio": np.logspace(0.0, 4.0, 121),
+}
+PERCENTILES = (1, 5, 50, 95, 99)
+
+
+def _jacobian(area: np.ndarray, edge_sq: np.ndarray) -> np.ndarray:
+    # Q = 4*sqrt(3)*Area / (sum of edge lengths squared), 1 for equilateral
+    edge_sq = np.where(edge_sq < 1e-9, 1.0, edge_sq)
+    return (4 * np.sqrt(3) * area) / edge_sq
+
+
+def triangle_jacobian(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    a = vertices[faces[:, 0]]
+    b = vertices[faces[:, 1]]
+    c = vertices[faces[:, 2]]
+    area = 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+    edge_sq = np.einsum("ij,ij->i", b - c, b - c) + np.einsum("ij,ij->i", c - a, c - a) + np.einsum("ij,ij->i", a - b, a - b)
+    return _jacobian(area, edge_sq)
+
+
+def _shape(vertices: np.ndarray, faces: np.ndarray):
+    a = vertices[faces[:, 0]]
+    b = vertices[faces[:, 1]]
+    c = vertices[faces[:, 2]]
+    # Edge opposite each corner: la opposite a, etc.
+    la = np.linalg.norm(b - c, axis=1)
+    lb = np.linalg.norm(c - a, axis=1)
+    lc = np.linalg.norm(a - b, axis=1)
+    area = 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+    jacobian = _jacobian(area, la ** 2 + lb ** 2 + lc ** 2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Longest edge over 2*sqrt(3)*inradius, 1 for equilateral
+        aspect_ratio = np.maximum(np.maximum(la, lb), lc) * (la + lb + lc) / (4 * np.sqrt(3) * area)
+        aspect_ratio[~np.isfinite(aspect_ratio)] = np.inf
+    return la, lb, lc, jacobian, aspect_ratio
+
+
+def _chunk_metrics(vertices: np.ndarray, faces: np.ndarray) -> dict:
+    la, lb, lc, jacobian, aspect_ratio = _shape(vertices, faces)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Law of cosines for the three corner angles
+        cos_a = (lb ** 2 + lc ** 2 - la ** 2) / (2 * lb * lc)
+        cos_b = (la ** 2 + lc ** 2 - lb ** 2) / (2 * la * lc)
+        cos_c = (la ** 2 + lb ** 2 - lc ** 2) / (2 * la * lb)
+    angles = np.degrees(np.arccos(np.clip(np.stack([cos_a, cos_b, cos_c], axis=1), -1.0, 1.0)))
+    angles = np.nan_to_num(angles, nan=0.0)
+    min_angle = angles.min(axis=1)
+    max_angle = angles.max(axis=1)
+
+    # Equiangular skewness: 0 for equilateral, 1 for degenerate
+    skewness = np.maximum((max_angle - 60.0) / 120.0, (60.0 - min_angle) / 60.0)
+
+    return {
+        "jacobian": jacobian,
+        "aspect_ratio": aspect_ratio,
+        "min_angle": min_angle,
+        "max_angle": max_angle,
+        "skewness": skewness,
+    }
+
+
+def _percentiles(edges: np.ndarray, counts: np.ndarray) -> dict:
+    total = counts.sum()
+    if total == 0:
+        return {f"p{p}": 0.0 for p in PERCENTILES}
+    cumulative = np.cumsum(counts)
+    result = {}
+    for p in PERCENTILES:
+        index = int(np.searchsorted(cumulative, total * p / 100.0))
+        index = min(index, len(counts) - 1)
+        # Upper edge of the bin containing the percentile
+        result[f"p{p}"] = float(edges[index + 1])
+    return result
+
+
+def poor_elements(vertices, faces, aspect_ratio_limit: float = 50.0, chunk_size: int = QUALITY_CHUNK) -> dict:
+    """
+    The part of element_quality a repair decision needs: the elements above
+    aspect_ratio_limit and the Jacobian min/mean, without angles, histograms or ranking.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    bad_faces, low, total = [], np.inf, 0.0
+    for start in range(0, len(faces), chunk_size):
+        _, _, _, jacobian, aspect_ratio = _shape(vertices, faces[start:start + chunk_size])
+        bad_faces.append(np.flatnonzero(aspect_ratio > aspect_ratio_limit) + start)
+        low = min(low, float(jacobian.min()))
+        total += float(jacobian[np.isfinite(jacobian)].sum())
+    bad_faces = np.concatenate(bad_faces) if bad_faces else np.empty(0, dtype=np.int64)
+    return {
+        "jacobian": {"min": low if len(faces) else 0.0, "mean": total / max(len(faces), 1)},
+        "bad_element_count": int(len(bad_faces)),
+        "bad_faces": bad_faces.tolist(),
+        "aspect_ratio_limit": aspect_ratio_limit,
+    }
+
+
+def element_quality(vertices, faces, aspect_ratio_limit: float = 50.0,
+                    worst_count: int = 50, chunk_size: int = QUALITY_CHUNK) -> dict:
+    """
+    Per-element triangle quality over the whole mesh: min/max/mean, percentiles and
+    histograms for each metric, the number of elements above aspect_ratio_limit and
+    the indices of the worst elements (lowest Jacobian first) and of every element above the limit.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+
+    stats = {name: {"min": np.inf, "max": -np.inf, "sum": 0.0, "counts": np.zeros(len(bins) - 1, dtype=np.int64)}
+             for name, bins in HISTOGRAM_BINS.items()}
+    bad_faces = []
+    worst_idx = np.empty(0, dtype=np.int64)
+    worst_val = np.empty(0, dtype=np.float64)
+
+    for start in range(0, len(faces), chunk_size):
+        metrics = _chunk_metrics(vertices, faces[start:start + chunk_size])
+        for name, values in metrics.items():
+            s = stats[name]
+            finite = values[np.isfinite(values)]
+            s["min"] = min(s["min"], float(values.min()))
+            s["max"] = max(s["max"], float(values.max()))
+            s["sum"] += float(finite.sum())
+            bins = HISTOGRAM_BINS[name]
+            s["counts"] += np.histogram(np.clip(values, bins[0], bins[-1]), bins=bins)[0]
+        bad_faces.append(np.flatnonzero(metrics["aspect_ratio"] > aspect_ratio_limit) + start)
+
+        # Keep a running top-k of the lowest-quality elements
+        jacobian = metrics["jacobian"]
+        k = min(worst_count, len(jacobian))
+        if k == 0:
+            continue
+        local = np.argpartition(jacobian, k - 1)[:k]
+        worst_idx = np.concatenate([worst_idx, local + start])
+        worst_val = np.concatenate([worst_val, jacobian[local]])
+        keep = np.argsort(worst_val, kind="stable")[:worst_count]
+        worst_idx, worst_val = worst_idx[keep], worst_val[keep]
+
+    n_faces = max(len(faces), 1)
+    report = {}
+    for name, s in stats.items():
+        lo, hi = (s["min"], s["max"]) if len(faces) else (0.0, 0.0)
+        # Bin edges are an upper bound; never report a percentile outside the observed range
+        percentiles = {p: min(max(value, lo), hi) for p, value in _percentiles(HISTOGRAM_BINS[name], s["counts"]).items()}
+        report[name] = {
+            "min": lo,
+            "max": hi,
+            "mean": s["sum"] / n_faces,
+            "percentiles": percentiles,
+            "histogram": {"edges": HISTOGRAM_BINS[name].tolist(), "counts": s["counts"].tolist()},
+        }
+    bad_faces = np.concatenate(bad_faces) if bad_faces else np.empty(0, dtype=np.int64)
+    report["bad_element_count"] = int(len(bad_faces))
+    report["bad_faces"] = bad_faces.tolist()
+    report["aspect_ratio_limit"] = aspect_ratio_limit
+    report["worst_faces"] = worst_idx.tolist()
+    return report
@@ -0,0 +1,193 @@
+import csv
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait as wait_connections
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Supervisor stages reported by the workers' tracer heartbeats: every top-level span of a
+# run, so no stage's time is charged to the one before it; "start" covers a job until its
+# first stage begins
+STAGES = ("start", "parse", "mesh", "iteration", "validate", "fidelity", "optimize", "lods", "finalize")
+
+# Rough cost model for ordering only (seconds on one core, fitted to tests/CAD files)
+SECONDS_PER_MB = 3.0
+SECONDS_PER_SURFACE = 0.005
+# Per solid, on top of its surfaces (healing and meshing set-up per volume)
+SECONDS_PER_VOLUME = 0.1
+
+
+def load_history(results_csv: Optional[str]) -> Dict[str, float]:
+    """Model -> Duration_sec from a previous results CSV (missing file: no history)."""
+    history = {}
+    if not results_csv or not os.path.exists(results_csv):
+        return history
+    with open(results_csv, newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                history[row["Model"]] = float(row["Duration_sec"])
+            except (KeyError, ValueError):
+                continue
+    return history
+
+
+def estimate_cost(input_path: str, history: Optional[Dict[str, float]] = None,
+                  surface_count: Optional[int] = None, volume_count: Optional[int] = None) -> Tuple[float, str]:
+    """
+    Estimated run time of one job from the cheapest signal available:
+    a previous run's duration, the parsed surface and volume counts, or the file size.
+    Returns (seconds, signal).
+    """
+    filename = os.path.basename(input_path)
+    if history and filename in history:
+        return history[filename], "history"
+    if surface_count or volume_count:
+        return (surface_count or 0) * SECONDS_PER_SURFACE + (volume_count or 0) * SECONDS_PER_VOLUME, "surfaces"
+    size_mb = os.path.getsize(input_path) / 1024 ** 2 if os.path.exists(input_path) else 0.0
+    return size_mb * SECONDS_PER_MB, "file_size"
+
+
+def _worker_main(conn, initializer, job_fn, job_args):
+    if initializer is not None:
+        initializer()
+    # Start-up (imports, Gmsh init) is not charged to the first job's timeout
+    conn.send(("ready", None, None))
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        index, input_path = message
+
+        def heartbeat(stage, index=index):
+            if stage in STAGES:
+                conn.send(("stage", index, stage))
+
+        try:
+            row = job_fn(input_path, *job_args, on_stage=heartbeat)
+            conn.send(("done", index, row))
+        except Exception as e:
+            conn.send(("error", index, str(e)))
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.job = None  # (index, input_path)
+        self.job_started = 0.0
+        self.stage = None
+        self.stage_started = 0.0
+
+
+class Scheduler:
+    """
+    Runs jobs on worker processes, most expensive first (longest-processing-time
+    order keeps one big model from finishing alone at the end of a batch).
+
+    Workers report each Supervisor stage as it starts. A stage that runs longer than
+    its timeout gets the worker killed and replaced, and the job is reported with
+    status TIMEOUT; a worker that dies is reported as CRASH.
+
+    job_fn(input_path, *job_args, on_stage=callback) must return the job's result row;
+    failure_row(input_path, status, error, duration) builds rows for killed jobs.
+    """
+
+    def __init__(self, workers: int, job_fn: Callable, job_args: tuple = (),
+                 failure_row: Callable = None, initializer: Optional[Callable] = None,
+                 stage_timeout: Optional[float] = None, stage_timeouts: Optional[Dict[str, float]] = None,
+                 poll_interval: float = 0.2):
+        self.workers = max(1, workers)
+        self.job_fn = job_fn
+        self.job_args = job_args
+        self.failure_row = failure_row
+        self.initializer = initializer
+        self.stage_timeout = stage_timeout
+        self.stage_timeouts = stage_timeouts or {}
+        self.poll_interval = poll_interval
+        # spawn: never inherit a parent's Gmsh state through fork
+        self._ctx = multiprocessing.get_context("spawn")
+
+    def timeout_for(self, stage: Optional[str]) -> Optional[float]:
+        return self.stage_timeouts.get(stage, self.stage_timeout)
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(target=_worker_main,
+                                    args=(child_conn, self.initializer, self.job_fn, self.job_args),
+                                    daemon=True)
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _assign(self, worker: _Worker, index: int, input_path: str):
+        worker.job = (index, input_path)
+        worker.job_started = worker.stage_started = time.monotonic()
+        worker.stage = "start"
+        worker.conn.send((index, input_path))
+
+    def _replace(self, workers: List[_Worker], worker: _Worker, status: str, error: str) -> dict:
+        # Kill (not terminate): a hung CAD kernel call does not return to handle signals
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+        row = self.failure_row(worker.job[1], status, error, time.monotonic() - worker.job_started)
+        workers[workers.index(worker)] = self._spawn()
+        return row
+
+    def run(self, jobs: List[Tuple[str, float]], on_result: Callable[[dict], None]):
+        """jobs: (input_path, estimated cost); on_result is called with each row as it finishes."""
+        queue = sorted(enumerate(jobs), key=lambda item: item[1][1], reverse=True)
+        workers = [self._spawn() for _ in range(min(self.workers, len(jobs)))]
+        try:
+            while queue or any(w.job for w in workers):
+                for worker in workers:
+                    if worker.ready and worker.job is None and queue:
+                        index, (input_path, _) = queue.pop(0)
+                        self._assign(worker, index, input_path)
+
+                watched = {w.conn: w for w in workers if w.job is not None or not w.ready}
+                for conn in wait_connections(list(watched), timeout=self.poll_interval):
+                    worker = watched[conn]
+                    try:
+                        kind, _, payload = conn.recv()
+                    except (EOFError, OSError):
+                        code = worker.process.exitcode
+                        if worker.job is None:
+                            raise RuntimeError(f"Batch worker failed to start (exit code {code})")
+                        on_result(self._replace(workers, worker, "CRASH", f"worker died (exit code {code})"))
+                        continue
+                    if kind == "ready":
+                        worker.ready = True
+                    elif kind == "stage":
+                        worker.stage, worker.stage_started = payload, time.monotonic()
+                    elif kind == "done":
+                        worker.job = None
+                        on_result(payload)
+                    else:
+                        on_result(self.failure_row(worker.job[1], "CRASH", payload,
+                                                   time.monotonic() - worker.job_started))
+                        worker.job = None
+
+                now = time.monotonic()
+                for worker in list(workers):
+                    if worker.job is None:
+                        continue
+                    limit = self.timeout_for(worker.stage)
+                    if limit is not None and now - worker.stage_started > limit:
+                        error = f"{worker.stage} exceeded {limit:g}s"
+                        on_result(self._replace(workers, worker, "TIMEOUT", error))
+        finally:
+            for worker in workers:
+                try:
+                    worker.conn.send(None)
+                except OSError:
+                    pass
+            for worker in workers:
+                worker.process.join(5)
+                if worker.process.is_alive():
+                    worker.process.kill()
@@ -0,0 +1,341 @@
+import contextlib
+import json
+import multiprocessing
+import os
+import re
+import signal
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Supervisor keyword arguments a job may set
+JOB_OPTIONS = ("face_budget", "mesh_algorithm", "keep_intermediates", "export_brep")
+
+_JOB_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def _write_json(path: str, data: dict):
+    # Readers never see a partial file: write aside, then rename into place
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, default=str)
+    os.replace(tmp_path, path)
+
+
+class JobQueue:
+    """
+    Directory-backed job queue shared by the service, its workers and clients.
+
+    A job is a JSON file that moves pending/ -> running/<worker>/ -> results/.
+    Workers claim jobs with an atomic rename, so each job runs exactly once, and
+    results are published atomically, so clients can poll the results directory.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.pending_dir = os.path.join(self.root, "pending")
+        self.running_dir = os.path.join(self.root, "running")
+        self.results_dir = os.path.join(self.root, "results")
+        for d in (self.pending_dir, self.running_dir, self.results_dir):
+            os.makedirs(d, exist_ok=True)
+
+    def submit(self, input_path: str, options: Optional[dict] = None, job_id: Optional[str] = None) -> str:
+        job_id = job_id or uuid.uuid4().hex[:12]
+        if not _JOB_ID.match(job_id):
+            raise ValueError(f"Invalid job id: {job_id!r}")
+        unknown = set(options or {}) - set(JOB_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown job options: {sorted(unknown)}")
+        job = {"id": job_id, "input_path": os.path.abspath(input_path),
+               "options": options or {}, "queued_at": time.time()}
+        _write_json(os.path.join(self.pending_dir, f"{job_id}.json"), job)
+        return job_id
+
+    def claim(self, worker_id: str) -> Optional[dict]:
+        """Oldest pending job, moved to running/<worker_id>/; None when the queue is empty."""
+        worker_dir = os.path.join(self.running_dir, worker_id)
+        os.makedirs(worker_dir, exist_ok=True)
+        try:
+            names = [n for n in os.listdir(self.pending_dir) if n.endswith(".json")]
+        except OSError:
+            return None
+        for name in sorted(names, key=lambda n: self._mtime(os.path.join(self.pending_dir, n))):
+            target = os.path.join(worker_dir, name)
+            try:
+                os.rename(os.path.join(self.pending_dir, name), target)
+            except OSError:
+                continue  # another worker won this one
+            with open(target) as f:
+                return json.load(f)
+        return None
+
+    @staticmethod
+    def _mtime(path: str) -> float:
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0.0
+
+    def complete(self, job: dict, worker_id: str, result: dict):
+        _write_json(os.path.join(self.results_dir, f"{job['id']}.json"), dict(job, **result))
+        with contextlib.suppress(OSError):
+            os.remove(os.path.join(self.running_dir, worker_id, f"{job['id']}.json"))
+
+    def recover(self, worker_id: str, error: str = "worker process died") -> list:
+        """Fails the jobs a dead worker was holding, so clients are not left waiting."""
+        worker_dir = os.path.join(self.running_dir, worker_id)
+        failed = []
+        if not os.path.isdir(worker_dir):
+            return failed
+        for name in os.listdir(worker_dir):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(worker_dir, name)) as f:
+                job = json.load(f)
+            self.complete(job, worker_id, {"status": "CRASH", "error": error, "finished_at": time.time()})
+            failed.append(job["id"])
+        with contextlib.suppress(OSError):
+            os.rmdir(worker_dir)
+        return failed
+
+    def status(self, job_id: str) -> dict:
+        if not _JOB_ID.match(job_id):
+            return {"id": job_id, "state": "unknown"}
+        result_path = os.path.join(self.results_dir, f"{job_id}.json")
+        if os.path.exists(result_path):
+            with open(result_path) as f:
+                return dict(json.load(f), state="done")
+        if os.path.exists(os.path.join(self.pending_dir, f"{job_id}.json")):
+            return {"id": job_id, "state": "pending"}
+        for worker_id in os.listdir(self.running_dir):
+            if os.path.exists(os.path.join(self.running_dir, worker_id, f"{job_id}.json")):
+                return {"id": job_id, "state": "running", "worker": worker_id}
+        return {"id": job_id, "state": "unknown"}
+
+    def wait(self, job_id: str, timeout: float = 60.0, poll_interval: float = 0.02) -> dict:
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.status(job_id)
+            if status["state"] in ("done", "unknown") or time.monotonic() >= deadline:
+                return status
+            time.sleep(poll_interval)
+
+
+def run_job(job: dict, session, output_dir: str, cache=None, mesh_threads: Optional[int] = None) -> dict:
+    """Runs one job with a worker's warm Gmsh session; returns the fields of its result."""
+    # Imported here so JobQueue clients do not pay for Gmsh/trimesh imports
+    from core.batch import make_row
+    from core.supervisor import Supervisor
+
+    workspace = os.path.join(output_dir, job["id"])
+    os.makedirs(workspace, exist_ok=True)
+    started = time.time()
+    session.reset()
+    supervisor = Supervisor(workspace_dir=workspace, session=session, cache=cache, mesh_threads=mesh_threads,
+                            **job.get("options", {}))
+    try:
+        with open(os.path.join(workspace, "supervisor.log"), "w") as log, contextlib.redirect_stdout(log):
+            result = supervisor.run(job["input_path"])
+    except Exception as e:
+        result = {"model": os.path.basename(job["input_path"]), "status": "CRASH", "error": str(e)}
+    finished = time.time()
+    return {
+        "status": result["status"],
+        "error": result.get("error", ""),
+        "final_mesh_path": result.get("final_mesh_path") if result["status"] == "SUCCESS" else None,
+        "row": make_row(os.path.basename(job["input_path"]), result, finished - started),
+        "started_at": started,
+        "finished_at": finished,
+        "queue_latency_sec": round(started - job.get("queued_at", started), 4),
+    }
+
+
+def _worker_main(queue_root: str, output_dir: str, cache_dir: Optional[str], cache_max_bytes: int,
+                 mesh_threads: Optional[int], stop, poll_interval: float):
+    from core.cache import ArtifactCache
+    from core.session import GmshSession
+
+    queue = JobQueue(queue_root)
+    worker_id = str(os.getpid())
+    parent = os.getppid()
+    cache = ArtifactCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+
+    # Pre-warm: imports are done and Gmsh is initialized before the first job arrives
+    import core.batch  # noqa: F401
+    import core.supervisor  # noqa: F401
+    session = GmshSession(terminal=0)
+    session.start()
+    try:
+        # Also stop when the service process is gone (killed without a clean shutdown)
+        while not stop.is_set() and os.getppid() == parent:
+            job = queue.claim(worker_id)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+            result = run_job(job, session, output_dir, cache, mesh_threads=mesh_threads)
+            result["worker"] = worker_id
+            queue.complete(job, worker_id, result)
+    finally:
+        session.close()
+
+
+class MeshService:
+    """
+    Long-running mesh service: a pool of pre-warmed worker processes pulling jobs
+    from a JobQueue. Jobs can also be fed from a JSON-lines file (tailed for new
+    lines) and from a small local HTTP API.
+    """
+
+    def __init__(self, queue_dir: str, output_dir: Optional[str] = None, workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None, cache_max_bytes: int = 2 * 1024 ** 3,
+                 poll_interval: float = 0.02):
+        self.queue = JobQueue(queue_dir)
+        self.output_dir = os.path.abspath(output_dir or os.path.join(self.queue.root, "output"))
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.workers = workers or os.cpu_count() or 1
+        # Split the cores between workers, as in batch mode
+        self.mesh_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self.cache_dir = cache_dir and os.path.abspath(cache_dir)
+        self.cache_max_bytes = cache_max_bytes
+        self.poll_interval = poll_interval
+
+        # spawn: never inherit a parent's Gmsh state through fork
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._processes = []
+        # Read offset per tailed job file, kept with the queue so a restart does not resubmit old lines
+        self._offsets_path = os.path.join(self.queue.root, "jobs_files.json")
+        self._jobs_file_offsets = {}
+        if os.path.exists(self._offsets_path):
+            with open(self._offsets_path) as f:
+                self._jobs_file_offsets = json.load(f)
+        self._http = None
+
+    def _spawn_worker(self):
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.queue.root, self.output_dir, self.cache_dir, self.cache_max_bytes,
+                  self.mesh_threads, self._stop, self.poll_interval),
+            daemon=True)
+        process.start()
+        return process
+
+    def start(self):
+        self._processes = [self._spawn_worker() for _ in range(self.workers)]
+
+    def check_workers(self) -> list:
+        """Replaces dead workers; their in-flight jobs are failed. Returns the failed job ids."""
+        failed = []
+        for i, process in enumerate(self._processes):
+            if process.is_alive() or self._stop.is_set():
+                continue
+            failed += self.queue.recover(str(process.pid), error=f"worker exited with code {process.exitcode}")
+            self._processes[i] = self._spawn_worker()
+        return failed
+
+    def poll_jobs_file(self, path: str) -> list:
+        """Submits lines appended to a JSON-lines job file since the last poll, also across restarts."""
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            return []
+        offset = self._jobs_file_offsets.get(path, 0)
+        if os.path.getsize(path) < offset:
+            offset = 0  # truncated or replaced: a new file
+        submitted = []
+        with open(path) as f:
+            f.seek(offset)
+            while True:
+                line = f.readline()
+                if not line.endswith("\n"):
+                    break  # incomplete last line; picked up once it is finished
+                if line.strip():
+                    try:
+                        spec = json.loads(line)
+                        submitted.append(self.queue.submit(spec["input_path"], spec.get("options"), spec.get("id")))
+                    except (ValueError, KeyError) as e:
+                        print(f"Skipping invalid job line: {e}")
+                # Recorded line by line, so a crash resubmits at most the line just submitted
+                self._jobs_file_offsets[path] = f.tell()
+                _write_json(self._offsets_path, self._jobs_file_offsets)
+        return submitted
+
+    def serve_http(self, host: str = "127.0.0.1", port: int = 8765):
+        self._http = make_http_server(self.queue, host, port)
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        return self._http
+
+    def serve_forever(self, jobs_file: Optional[str] = None):
+        # SIGTERM shuts down like Ctrl+C, so workers finish their current job and exit
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        self.start()
+        try:
+            while True:
+                if jobs_file:
+                    for job_id in self.poll_jobs_file(jobs_file):
+                        print(f"Queued {job_id}")
+                for job_id in self.check_workers():
+                    print(f"Job {job_id} failed: worker died")
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._http is not None:
+            self._http.shutdown()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+
+def make_http_server(queue: JobQueue, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Local HTTP front end for the queue:
+      POST /jobs        {"input_path": ..., "options": {...}, "wait": seconds}  -> job status
+      GET  /jobs/<id>   (optional ?wait=seconds)                                -> job status
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, code: int, body: dict):
+            data = json.dumps(body, default=str).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                return self._reply(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                spec = json.loads(self.rfile.read(length) or b"{}")
+                # Checked first, so that a bad request leaves no job behind
+                wait = float(spec.get("wait", 0))
+                job_id = queue.submit(spec["input_path"], spec.get("options"), spec.get("id"))
+            except (ValueError, KeyError, TypeError) as e:
+                return self._reply(400, {"error": str(e)})
+            self._reply(200, queue.wait(job_id, wait) if wait > 0 else queue.status(job_id))
+
+        def do_GET(self):
+            path, _, query = self.path.partition("?")
+            if not path.startswith("/jobs/"):
+                return self._reply(404, {"error": "not found"})
+            params = dict(p.split("=", 1) for p in query.split("&") if "=" in p)
+            try:
+                wait = float(params.get("wait", 0))
+            except ValueError:
+                return self._reply(400, {"error": "invalid wait"})
+            job_id = path[len("/jobs/"):]
+            status = queue.wait(job_id, wait) if wait > 0 else queue.status(job_id)
+            self._reply(404 if status["state"] == "unknown" else 200, status)
+
+        def log_message(self, format, *args):
+            pass  # keep the service output to job events
+
+    return ThreadingHTTPServer((host, port), Handler)
@@ -0,0 +1,66 @@
+import gmsh
+
+
+class GmshSession:
+    """
+    Owns the process-wide Gmsh state for the lifetime of a job.
+
+    Gmsh is initialized once and the parsed geometry stays loaded, so the
+    Mesher can clear and regenerate the mesh without re-reading the model.
+    """
+
+    def __init__(self, terminal: int = 1):
+        self.terminal = terminal
+        self.active = False
+        self.loaded_path = None
+
+    def start(self):
+        if not self.active:
+            gmsh.initialize()
+            gmsh.option.setNumber("General.Terminal", self.terminal)
+            self.active = True
+
+    def load(self, path: str):
+        # No-op when the model is already in memory (e.g. Parser -> Mesher hop)
+        self.start()
+        if self.loaded_path != path:
+            gmsh.clear()
+            self.loaded_path = None
+            gmsh.open(path)
+            self.loaded_path = path
+
+    def replace(self, path: str, key: str):
+        # Loads path in place of the model known as key (e.g. a rewritten copy of the parsed model),
+        # so later is_loaded(key) checks keep reusing it
+        self.start()
+        gmsh.clear()
+        gmsh.open(path)
+        self.loaded_path = key
+
+    def is_loaded(self, path: str) -> bool:
+        return self.active and self.loaded_path == path
+
+    def clear_mesh(self):
+        # Drops the mesh but keeps the geometry loaded
+        if self.active:
+            gmsh.model.mesh.clear()
+
+    def reset(self):
+        # Forgets the loaded model but keeps Gmsh initialized (long-lived workers, between jobs)
+        if self.active:
+            gmsh.clear()
+        self.loaded_path = None
+
+    def close(self):
+        if self.active:
+            gmsh.finalize()
+        self.active = False
+        self.loaded_path = None
+
+    def __enter__(self):
+        # Gmsh is started lazily by the first load()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
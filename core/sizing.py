@@ -0,0 +1,193 @@
+import contextlib
+import math
+from typing import Dict, List, Optional
+
+import gmsh
+import numpy as np
+
+# Allowed gap between a curved face and its chords, as a fraction of the bounding-box diagonal
+CHORD_TOLERANCE = 0.005
+
+# Elements across the narrowest width of a face (thin strips, slots)
+ELEMENTS_ACROSS = 1
+
+# Parametric samples per direction when estimating a surface's curvature
+CURVATURE_SAMPLES = 5
+
+# Default size bounds as fractions of the model's bounding-box diagonal (at fineness factor 1)
+DEFAULT_MAX_FRACTION = 0.15
+DEFAULT_MIN_FRACTION = 0.002
+
+# Entities are grouped into size bins this far apart, one Gmsh field per bin
+SIZE_BIN_RATIO = 1.2
+
+
+def triangle_count(area: float, size: float) -> float:
+    # Equilateral triangles with edge `size`
+    return area / (math.sqrt(3.0) / 4.0 * size ** 2)
+
+
+def _surface_curvature(surface: int) -> float:
+    (umin, vmin), (umax, vmax) = np.reshape(gmsh.model.getParametrizationBounds(2, surface), (2, 2))
+    u, v = np.meshgrid(np.linspace(umin, umax, CURVATURE_SAMPLES), np.linspace(vmin, vmax, CURVATURE_SAMPLES))
+    coords = np.column_stack([u.ravel(), v.ravel()]).ravel()
+    curv_max, curv_min, _, _ = gmsh.model.getPrincipalCurvatures(surface, coords)
+    curvatures = np.abs(np.concatenate([curv_max, curv_min]))
+    curvatures = curvatures[np.isfinite(curvatures)]
+    return float(curvatures.max()) if len(curvatures) else 0.0
+
+
+def _curve_curvature(curve: int) -> float:
+    low, high = gmsh.model.getParametrizationBounds(1, curve)
+    curvatures = np.abs(gmsh.model.getCurvature(1, curve, np.linspace(low[0], high[0], CURVATURE_SAMPLES)))
+    curvatures = curvatures[np.isfinite(curvatures)]
+    return float(curvatures.max()) if len(curvatures) else 0.0
+
+
+def curvature_size(curvature: float, tolerance: float) -> float:
+    # Longest chord of a circle with this curvature whose sagitta stays within tolerance
+    if curvature <= 0:
+        return math.inf
+    radius = 1.0 / curvature
+    return 2.0 * math.sqrt(max(2.0 * radius * tolerance - tolerance ** 2, 0.0)) if tolerance < radius else 2.0 * radius
+
+
+class AdaptiveSizing:
+    """
+    Element sizes derived from the BREP instead of one global size.
+
+    Each surface and curved edge gets a curvature size: the longest chord that stays within
+    CHORD_TOLERANCE of its tightest bend. Fineness and the element_budget scale these like any
+    other size, while a surface's feature size (ELEMENTS_ACROSS elements over its width,
+    area / longest boundary curve) is a geometric cap they never coarsen past. Flat regions
+    coarsen up to size_max and every size is clamped to [size_min, size_max]. The result is
+    installed as Gmsh size fields, so Mesh.MeshSizeFactor is divided back out of the values.
+    """
+
+    def __init__(self, size_min: Optional[float] = None, size_max: Optional[float] = None,
+                 element_budget: Optional[int] = None):
+        self.size_min = size_min
+        self.size_max = size_max
+        self.element_budget = element_budget
+        self._analysis = None  # (model key, analysis dict)
+
+    def options(self) -> dict:
+        # Settings that change the generated mesh (part of the mesh cache key)
+        return {"sizing": "adaptive", "size_min": self.size_min, "size_max": self.size_max,
+                "element_budget": self.element_budget}
+
+    def analyze(self, key: str) -> dict:
+        """Curvature and feature sizes of every surface and curve of the loaded model (cached per key)."""
+        if self._analysis is not None and self._analysis[0] == key:
+            return self._analysis[1]
+
+        xmin, ymin, zmin, xmax, ymax, zmax = gmsh.model.getBoundingBox(-1, -1)
+        diagonal = float(np.linalg.norm([xmax - xmin, ymax - ymin, zmax - zmin])) or 1.0
+        tolerance = diagonal * CHORD_TOLERANCE
+        surfaces, curves = {}, {}
+        for _, curve in gmsh.model.getEntities(1):
+            curves[curve] = {"length": gmsh.model.occ.getMass(1, curve),
+                             "size": curvature_size(_curve_curvature(curve), tolerance)}
+        for _, surface in gmsh.model.getEntities(2):
+            area = gmsh.model.occ.getMass(2, surface)
+            boundary = gmsh.model.getBoundary([(2, surface)], combined=False, oriented=False)
+            # Holes add perimeter but not width, so measure across the longest boundary curve
+            longest = max((curves.get(abs(c), {}).get("length", 0.0) for _, c in boundary), default=0.0)
+            width = area / longest if longest > 0 else math.inf
+            surfaces[surface] = {"area": area, "size": curvature_size(_surface_curvature(surface), tolerance),
+                                 "feature": width / ELEMENTS_ACROSS}
+
+        analysis = {"diagonal": diagonal, "surfaces": surfaces, "curves": curves}
+        self._analysis = (key, analysis)
+        return analysis
+
+    def sizes(self, analysis: dict, mesh_factor: float) -> Dict[str, Dict[int, float]]:
+        """
+        Field values per surface and curve. Gmsh multiplies them by Mesh.MeshSizeFactor,
+        so bounds and budget are applied to the final size and divided back out. Explicit
+        bounds are absolute; the defaults scale with the fineness like every other size.
+        """
+        diagonal = analysis["diagonal"]
+        size_min = self.size_min or diagonal * DEFAULT_MIN_FRACTION * mesh_factor
+        size_max = self.size_max or diagonal * DEFAULT_MAX_FRACTION * mesh_factor
+
+        def final(entry, scale):
+            size = min(entry["size"] * mesh_factor * scale, entry.get("feature", math.inf))
+            return min(max(size, size_min), size_max)
+
+        scale = 1.0
+        if self.element_budget:
+            # Clamping distorts a uniform scale, so refine the estimate a few times
+            for _ in range(4):
+                estimate = sum(triangle_count(s["area"], final(s, scale))
+                               for s in analysis["surfaces"].values())
+                if estimate <= self.element_budget:
+                    break
+                scale *= math.sqrt(estimate / self.element_budget)
+
+        return {
+            "surfaces": {tag: final(s, scale) / mesh_factor for tag, s in analysis["surfaces"].items()},
+            "curves": {tag: final(c, scale) / mesh_factor for tag, c in analysis["curves"].items()
+                       if math.isfinite(c["size"])},
+        }
+
+
+def _install_size_fields(sizes: Dict[str, Dict[int, float]]) -> List[int]:
+    """
+    One Constant field per size bin (entities rounded down to the bin's size).
+    Surface fields include their boundary curves, so edges between a fine and a
+    coarse face take the finer size.
+    """
+    bins = {}
+    for kind, values in sizes.items():
+        for tag, size in values.items():
+            level = math.floor(math.log(size) / math.log(SIZE_BIN_RATIO))
+            bins.setdefault(level, {"surfaces": [], "curves": []})[kind].append(int(tag))
+
+    fields = []
+    for level, members in bins.items():
+        field = gmsh.model.mesh.field.add("Constant")
+        gmsh.model.mesh.field.setNumber(field, "VIn", SIZE_BIN_RATIO ** level)
+        gmsh.model.mesh.field.setNumber(field, "IncludeBoundary", 1)
+        if members["surfaces"]:
+            gmsh.model.mesh.field.setNumbers(field, "SurfacesList", members["surfaces"])
+        if members["curves"]:
+            gmsh.model.mesh.field.setNumbers(field, "CurvesList", members["curves"])
+        fields.append(field)
+    return fields
+
+
+@contextlib.contextmanager
+def size_fields(sizes: Optional[Dict[str, Dict[int, float]]] = None,
+                interior: Optional[Dict[int, float]] = None):
+    """
+    Background size for the meshing done inside the block: the adaptive `sizes` (if any)
+    combined with `interior` sizes that refine surfaces without touching their boundary
+    curves. Point sizes are ignored while adaptive sizes are active, so flat faces can
+    coarsen past Gmsh's default. Every field is removed again on exit.
+    """
+    from_points = gmsh.option.getNumber("Mesh.MeshSizeFromPoints")
+    extend = gmsh.option.getNumber("Mesh.MeshSizeExtendFromBoundary")
+    fields = []
+    try:
+        if sizes:
+            fields += _install_size_fields(sizes)
+            gmsh.option.setNumber("Mesh.MeshSizeFromPoints", 0)
+            gmsh.option.setNumber("Mesh.MeshSizeExtendFromBoundary", 0)
+        for surface, size in (interior or {}).items():
+            field = gmsh.model.mesh.field.add("Constant")
+            gmsh.model.mesh.field.setNumbers(field, "SurfacesList", [surface])
+            gmsh.model.mesh.field.setNumber(field, "VIn", size)
+            gmsh.model.mesh.field.setNumber(field, "IncludeBoundary", 0)
+            fields.append(field)
+        if fields:
+            background = gmsh.model.mesh.field.add("Min")
+            gmsh.model.mesh.field.setNumbers(background, "FieldsList", fields)
+            gmsh.model.mesh.field.setAsBackgroundMesh(background)
+            fields.append(background)
+        yield
+    finally:
+        for field in fields:
+            gmsh.model.mesh.field.remove(field)
+        gmsh.option.setNumber("Mesh.MeshSizeFromPoints", from_points)
+        gmsh.option.setNumber("Mesh.MeshSizeExtendFromBoundary", extend)
@@ -0,0 +1,124 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from core.quality import triangle_jacobian
+
+# Edges whose faces meet at more than this dihedral angle (degrees) are features and stay put
+FEATURE_ANGLE = 30.0
+
+# Taubin's shrink (lambda) and inflate (mu) factors; |mu| slightly above lambda cancels the shrinkage
+TAUBIN_LAMBDA = 0.5
+TAUBIN_MU = -0.51
+
+MAX_ITERATIONS = 20
+
+# Smoothing stops once neither the minimum nor the mean quality improves by this much
+MIN_IMPROVEMENT = 1e-3
+
+METHODS = ("taubin", "quality")
+
+
+def umbrella_operator(faces: np.ndarray, vertex_count: int) -> sparse.csr_matrix:
+    """Row-normalized vertex adjacency: (L @ x)[i] is the mean of vertex i's neighbours."""
+    edges = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    adjacency = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(vertex_count, vertex_count))
+    # Interior edges appear once per face; only the neighbourship matters
+    adjacency.data[:] = 1.0
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    degree[degree == 0] = 1.0
+    return sparse.diags(1.0 / degree) @ adjacency
+
+
+def pinned_vertices(vertices: np.ndarray, faces: np.ndarray, feature_angle: float = FEATURE_ANGLE) -> np.ndarray:
+    """
+    Vertices that must not move: unused vertices and the ends of boundary, non-manifold
+    and feature edges (dihedral angle above feature_angle).
+    """
+    pinned = np.ones(len(vertices), dtype=bool)
+    pinned[faces.ravel()] = False
+
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    _, inverse, counts = np.unique(edges, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    pinned[edges[counts[inverse] != 2].ravel()] = True
+
+    # Manifold edges: compare the normals of their two faces
+    manifold = np.flatnonzero(counts[inverse] == 2)
+    manifold = manifold[np.argsort(inverse[manifold], kind="stable")].reshape(-1, 2)
+    a, b, c = (vertices[faces[:, i]] for i in range(3))
+    normals = np.cross(b - a, c - a)
+    normals /= np.maximum(np.linalg.norm(normals, axis=1), 1e-300)[:, None]
+    first, second = normals[manifold[:, 0] // 3], normals[manifold[:, 1] // 3]
+    cosine = np.einsum("ij,ij->i", first, second)
+    sharp = cosine < np.cos(np.radians(feature_angle))
+    pinned[edges[manifold[sharp, 0]].ravel()] = True
+    return pinned
+
+
+def _score(quality: np.ndarray) -> Tuple[float, float]:
+    return (float(quality.min()), float(quality.mean())) if len(quality) else (1.0, 1.0)
+
+
+def smooth(vertices: np.ndarray, faces: np.ndarray, method: str = "taubin",
+           max_iterations: int = MAX_ITERATIONS, feature_angle: float = FEATURE_ANGLE,
+           below_quality: Optional[float] = None) -> Tuple[np.ndarray, dict]:
+    """
+    Sparse smoothing driven by triangle quality (the Jacobian metric of core.quality).
+
+    "taubin" alternates a shrinking and an inflating umbrella step so the volume is kept;
+    "quality" moves each vertex toward its neighbours by one minus the worst quality around
+    it, so good regions stay where they are. Boundary and feature vertices are pinned. With
+    below_quality, only vertices of faces under that quality move. Iterations stop when
+    neither the minimum nor the mean quality of the affected faces improves, and an
+    iteration that lowers the minimum is undone.
+
+    Returns the new vertices and {"iterations", "moved_vertices", "quality_before", "quality_after"}.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown smoothing method: {method}")
+    vertices = np.array(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+
+    quality = triangle_jacobian(vertices, faces)
+    movable = ~pinned_vertices(vertices, faces, feature_angle)
+    if below_quality is not None:
+        poor = np.zeros(len(vertices), dtype=bool)
+        poor[faces[quality < below_quality].ravel()] = True
+        movable &= poor
+
+    # Only faces touching a movable vertex can change, so only those are re-scored
+    affected = np.flatnonzero(movable[faces].any(axis=1))
+    local_faces = faces[affected]
+    best = _score(quality[affected])
+    info = {"iterations": 0, "moved_vertices": int(movable.sum()), "quality_before": best, "quality_after": best}
+    if not len(affected):
+        return vertices, info
+
+    operator = umbrella_operator(faces, len(vertices))
+    # Pinned rows never move, so every step is masked to the movable vertices
+    index = np.flatnonzero(movable)
+    rows = operator[index]
+
+    for _ in range(max_iterations):
+        candidate = vertices.copy()
+        if method == "taubin":
+            for factor in (TAUBIN_LAMBDA, TAUBIN_MU):
+                candidate[index] += factor * (rows @ candidate - candidate[index])
+        else:
+            ring = np.ones(len(vertices))
+            np.minimum.at(ring, local_faces.ravel(), np.repeat(triangle_jacobian(candidate, local_faces), 3))
+            step = rows @ candidate - candidate[index]
+            candidate[index] += (1.0 - ring[index])[:, None] * step
+
+        score = _score(triangle_jacobian(candidate, local_faces))
+        if score[0] < best[0] or (score[0] < best[0] + MIN_IMPROVEMENT and score[1] < best[1] + MIN_IMPROVEMENT):
+            break
+        vertices, best = candidate, score
+        info["iterations"] += 1
+
+    info["quality_after"] = best
+    return vertices, info
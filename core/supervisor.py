@@ -1,129 +1,402 @@
 import os
 import shutil
-from typing import Optional
+from typing import List, Optional
+
+import gmsh
 
 from agents.parser import ParserAgent
 from agents.mesher import MesherAgent
 from agents.validator import ValidatorAgent
-from agents.optimizer import OptimizerAgent
-from core.types import Artifact, ArtifactType, AgentStatus
+from agents.optimizer import OptimizerAgent, REPAIR_PLAN
+from core.types import Artifact, ArtifactType, AgentResult, AgentStatus
+from core.session import GmshSession
+from core.cache import ArtifactCache
+from core.fineness import FinenessSearch
+from core.sizing import AdaptiveSizing
+from core.fidelity import FidelityCheck
+from core import trace
+from core.trace import Tracer, file_size
+from core.mesh_io import MESH_BIN_EXT, load_mesh, open_meshbin, write_mesh
+
+# Failures the Optimizer can repair in place; anything else needs a remesh
+REPAIRABLE = frozenset(failure for failure, _ in REPAIR_PLAN)
 
 class Supervisor:
-    def __init__(self, workspace_dir="workspace"):
+    def __init__(self, workspace_dir="workspace", export_brep=False, keep_intermediates=False,
+                 session: Optional[GmshSession] = None, cache: Optional[ArtifactCache] = None,
+                 face_budget: Optional[int] = None, fineness_history: Optional[str] = None,
+                 mesh_threads: Optional[int] = None, mesh_algorithm: Optional[str] = None,
+                 tracer: Optional[Tracer] = None, assembly_workers: Optional[int] = None,
+                 dedupe_instances: bool = True, mesh_sizing: Optional[AdaptiveSizing] = None,
+                 smoothing: str = "taubin", smooth_below: Optional[float] = None,
+                 lod_faces: Optional[List[int]] = None, lod_max_error: Optional[float] = None,
+                 max_deviation: Optional[float] = None):
         self.workspace_dir = os.path.abspath(workspace_dir)
         if not os.path.exists(self.workspace_dir):
             os.makedirs(self.workspace_dir)
             
         self.parser = ParserAgent()
-        self.mesher = MesherAgent()
+        self.dedupe_instances = dedupe_instances
+        self.mesher = MesherAgent(threads=mesh_threads, algorithm=mesh_algorithm, assembly_workers=assembly_workers,
+                                  dedupe_instances=dedupe_instances, sizing=mesh_sizing)
         self.validator = ValidatorAgent()
-        self.optimizer = OptimizerAgent()
+        self.optimizer = OptimizerAgent(smoothing=smoothing, smooth_below=smooth_below)
         
         self.max_iterations = 5
 
+        # Gmsh state shared by Parser and Mesher for the life of a job.
+        # A caller-provided session (e.g. a batch worker's) outlives the job and is not closed here.
+        # The .brep export is only kept for debugging.
+        self.owns_session = session is None
+        self.session = session if session is not None else GmshSession()
+        self.export_brep = export_brep
+
+        # Meshes travel between agents in memory; only the final mesh is written
+        # unless intermediates are requested.
+        self.keep_intermediates = keep_intermediates
+
+        # Optional content-addressed cache of parsed BREPs and meshes
+        self.cache = cache
+
+        # Remesh fineness is searched per job, bounded by an optional face budget;
+        # converged settings are remembered per part signature when a history file is given.
+        self.face_budget = face_budget
+        self.fineness_history = fineness_history
+
+        # Decimated levels of detail written next to the validated mesh (face targets and/or error bound)
+        self.lod_faces = lod_faces
+        self.lod_max_error = lod_max_error
+
+        # Optional per-iteration distance to the CAD surfaces (fraction of the bounding-box diagonal):
+        # repairs that push the mesh farther than this from the BREP are rejected in favour of a remesh
+        self.max_deviation = max_deviation
+        self.fidelity = FidelityCheck() if max_deviation is not None else None
+
+        # Per-stage timing/memory spans; a Tracer without a path records nothing
+        self.tracer = tracer if tracer is not None else Tracer()
+
     def run(self, input_step_path: str) -> dict:
+        try:
+            with self.tracer.activate(), \
+                    trace.span("run", model=os.path.basename(input_step_path)) as run_span:
+                result = self._run(input_step_path)
+                run_span.update(status=result["status"], iterations=result.get("iterations"))
+        finally:
+            if self.owns_session:
+                self.session.close()
+        if self.cache is not None:
+            result["cache"] = self.cache.stats()
+        return result
+
+    def _parse(self, input_step_path: str) -> AgentResult:
+        with trace.span("parse", input_bytes=file_size(input_step_path)) as parse_span:
+            parse_res = self._load_brep(input_step_path)
+            if parse_res.status == AgentStatus.SUCCESS:
+                parse_span.update(surfaces=parse_res.artifact.metadata.get("surface_count"),
+                                  brep_bytes=file_size(parse_res.artifact.path))
+        return parse_res
+
+    def _load_brep(self, input_step_path: str) -> AgentResult:
+        input_artifact = Artifact(ArtifactType.STEP_FILE, input_step_path)
+        if self.cache is None or not os.path.exists(input_step_path):
+            return self.parser.run(input_artifact, self.workspace_dir, session=self.session,
+                                   export_brep=self.export_brep, dedupe_instances=self.dedupe_instances)
+
+        content_hash = ArtifactCache.file_hash(input_step_path)
+        model_name = os.path.splitext(os.path.basename(input_step_path))[0]
+        key = self.brep_cache_key(content_hash)
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            metadata = dict(entry["metadata"], source_path=entry["path"],
+                            model_name=model_name, content_hash=content_hash)
+            return AgentResult(
+                status=AgentStatus.SUCCESS,
+                artifact=Artifact(ArtifactType.BREP_FILE, entry["path"], metadata),
+                log=f"Loaded parsed BREP from cache. Surfaces: {metadata.get('surface_count')}"
+            )
+
+        # The .brep is what gets cached, so it is always exported on a miss
+        parse_res = self.parser.run(input_artifact, self.workspace_dir, session=self.session, export_brep=True,
+                                    dedupe_instances=self.dedupe_instances)
+        if parse_res.status == AgentStatus.SUCCESS:
+            brep = parse_res.artifact
+            self.cache.put(key, "model.brep", lambda path: shutil.copyfile(brep.path, path),
+                           metadata={"surface_count": brep.metadata["surface_count"],
+                                     "volume_count": brep.metadata["volume_count"]})
+            brep.metadata["content_hash"] = content_hash
+        return parse_res
+
+    def _mesh(self, brep_artifact: Artifact, fineness: float) -> AgentResult:
+        with trace.span("mesh", fineness=fineness) as mesh_span:
+            mesh_res = self._generate_mesh(brep_artifact, fineness)
+            if mesh_res.status == AgentStatus.SUCCESS:
+                mesh_span.update(faces_after=self._face_count(mesh_res.artifact),
+                                 cache_hit=mesh_res.artifact.metadata.get("cache_hit", False))
+        return mesh_res
+
+    def _remesh_surfaces(self, brep_artifact: Artifact, surfaces, fineness: float) -> AgentResult:
+        # Same stage as a full remesh (stage timeouts apply), but never cached: the result
+        # depends on the mesh it was spliced into, not just on the fineness
+        with trace.span("mesh", fineness=fineness, local_surfaces=len(surfaces)) as mesh_span:
+            mesh_res = self.mesher.remesh_surfaces(brep_artifact, self.workspace_dir, surfaces,
+                                                   fineness=fineness, session=self.session)
+            if mesh_res.status == AgentStatus.SUCCESS:
+                mesh_span.update(faces_after=self._face_count(mesh_res.artifact))
+        return mesh_res
+
+    @staticmethod
+    def brep_cache_key(content_hash: str) -> str:
+        return ArtifactCache.key("brep", source=content_hash, gmsh=gmsh.__version__)
+
+    def _generate_mesh(self, brep_artifact: Artifact, fineness: float) -> AgentResult:
+        content_hash = brep_artifact.metadata.get("content_hash")
+        if self.cache is None or content_hash is None:
+            return self.mesher.run(brep_artifact, self.workspace_dir, fineness=fineness, session=self.session)
+
+        key = ArtifactCache.key("mesh", source=content_hash, fineness=fineness, gmsh=gmsh.__version__,
+                                options=self.mesher.cache_options())
+        entry = self.cache.get(key)
+        if entry is not None:
+            # Memory-mapped (copy-on-write), so repairs never modify the cached file
+            mesh = open_meshbin(entry["path"])
+            model_name = brep_artifact.metadata["model_name"]
+            return AgentResult(
+                status=AgentStatus.SUCCESS,
+                artifact=Artifact(
+                    type=ArtifactType.MESH_BIN,
+                    path=os.path.join(self.workspace_dir, f"{model_name}{MESH_BIN_EXT}"),
+                    metadata={"fineness": fineness, "face_count": len(mesh.faces), "cache_hit": True},
+                    payload=mesh,
+                    persisted=False
+                ),
+                log=f"Loaded mesh with fineness {fineness} from cache"
+            )
+
+        mesh_res = self.mesher.run(brep_artifact, self.workspace_dir, fineness=fineness, session=self.session)
+        if mesh_res.status == AgentStatus.SUCCESS:
+            # Cache the welded mesh together with its face adjacency
+            mesh = load_mesh(mesh_res.artifact)
+            self.cache.put(key, f"mesh{MESH_BIN_EXT}", lambda path: write_mesh(mesh, path, with_adjacency=True),
+                           metadata={"fineness": fineness, "face_count": len(mesh.faces)})
+        return mesh_res
+
+    def _validate(self, mesh_artifact: Artifact, stop_at=None, bodies: int = 1) -> AgentResult:
+        with trace.span("validate", faces=self._face_count(mesh_artifact)) as val_span:
+            val_res = self.validator.run(mesh_artifact, stop_at=stop_at, bodies=bodies)
+            if val_res.status == AgentStatus.SUCCESS:
+                report = val_res.artifact.metadata
+                val_span.update(status=report.get("status"), failures=report.get("failures"))
+        return val_res
+
+    def _optimize(self, mesh_artifact: Artifact, task: str, failures=None, bodies: int = 1) -> AgentResult:
+        # Individual repair steps are traced inside the Optimizer
+        with trace.span("optimize", task=task, faces_before=self._face_count(mesh_artifact)) as opt_span:
+            opt_res = self.optimizer.run(mesh_artifact, self.workspace_dir, task=task, failures=failures,
+                                         bodies=bodies)
+            if opt_res.status == AgentStatus.SUCCESS:
+                opt_span["faces_after"] = self._face_count(opt_res.artifact)
+        return opt_res
+
+    def _measure_fidelity(self, brep_artifact: Artifact, mesh_artifact: Artifact) -> dict:
+        # The check samples and projects onto the loaded geometry, which normally is still in memory
+        source_path = brep_artifact.metadata.get("source_path", brep_artifact.path)
+        with trace.span("fidelity", faces=self._face_count(mesh_artifact)) as fidelity_span:
+            if not self.session.is_loaded(source_path):
+                self.session.load(brep_artifact.path)
+            mesh = load_mesh(mesh_artifact)
+            fidelity = self.fidelity.measure(source_path, mesh.vertices, mesh.faces)
+            fidelity_span.update(hausdorff_relative=fidelity["hausdorff_relative"],
+                                 rms_relative=fidelity["rms_relative"])
+        return fidelity
+
+    def _finalize(self, mesh_artifact: Artifact) -> str:
+        # STL is the only deliverable format; intermediates stay in the internal container
+        stl_path = os.path.splitext(mesh_artifact.path)[0] + ".stl"
+        with trace.span("finalize", faces=self._face_count(mesh_artifact)) as final_span:
+            path = mesh_artifact.materialize(stl_path)
+            final_span["output_bytes"] = file_size(path)
+        return path
+
+    def _lods(self, mesh_artifact: Artifact, bodies: int = 1) -> list:
+        # Only levels of detail that pass the same validation as the full mesh are written
+        with trace.span("lods", faces_before=self._face_count(mesh_artifact)):
+            lod_res = self.optimizer.build_lods(mesh_artifact, self.workspace_dir,
+                                                face_targets=self.lod_faces, max_error=self.lod_max_error)
+        if lod_res.status == AgentStatus.FAILURE:
+            print(f"LOD Generation Failed: {lod_res.error}")
+            return []
+        print(f"LODs: {lod_res.log}")
+
+        lods = []
+        for lod in lod_res.artifacts:
+            val_res = self._validate(lod, bodies=bodies)
+            if val_res.status == AgentStatus.SUCCESS:
+                status, failures = val_res.artifact.metadata["status"], val_res.artifact.metadata["failures"]
+            else:
+                status, failures = "FAIL", [val_res.error]
+            entry = {name: lod.metadata[name] for name in ("lod", "target_faces", "face_count", "deviation")}
+            entry.update(status=status, failures=failures,
+                         path=self._finalize(lod) if status == "SUCCESS" else None)
+            if failures:
+                print(f"LOD{entry['lod']} not written: {failures}")
+            lods.append(entry)
+        return lods
+
+    @staticmethod
+    def _body_count(brep_artifact: Artifact) -> int:
+        # Every separate CAD solid is a component of the mesh, not a stray piece to drop
+        return max(int(brep_artifact.metadata.get("volume_count") or 0), 1)
+
+    @staticmethod
+    def _face_count(mesh_artifact: Artifact) -> Optional[int]:
+        # Without forcing a load: from metadata, or from an in-memory payload
+        if "face_count" in mesh_artifact.metadata:
+            return mesh_artifact.metadata["face_count"]
+        payload = mesh_artifact.payload
+        if isinstance(payload, tuple):
+            return len(payload[1])
+        if payload is not None:
+            return len(payload.faces)
+        return None
+
+    def _run(self, input_step_path: str) -> dict:
         print(f"=== ACMS Supervisor: Processing {input_step_path} ===")
         
         # 1. Parse
-        input_artifact = Artifact(ArtifactType.STEP_FILE, input_step_path)
-        parse_res = self.parser.run(input_artifact, self.workspace_dir)
+        parse_res = self._parse(input_step_path)
         
         if parse_res.status == AgentStatus.FAILURE:
             print(f"Parsing Failed: {parse_res.error}")
             return {"model": os.path.basename(input_step_path), "status": "FAILURE", "error": parse_res.error}
             
         brep_artifact = parse_res.artifact
+        bodies = self._body_count(brep_artifact)
         print(f"Parsed: {parse_res.log}")
 
         # 2. Initial Mesh
-        mesh_res = self.mesher.run(brep_artifact, self.workspace_dir, fineness=0.5)
+        search = FinenessSearch(face_budget=self.face_budget, history_path=self.fineness_history)
+        fineness = search.initial(brep_artifact.metadata)
+        mesh_res = self._mesh(brep_artifact, fineness=fineness)
         if mesh_res.status == AgentStatus.FAILURE:
             print(f"Meshing Failed: {mesh_res.error}")
             return {"model": os.path.basename(input_step_path), "status": "FAILURE", "error": mesh_res.error}
             
         current_mesh = mesh_res.artifact
+        search.record(fineness, current_mesh.metadata.get("face_count"))
         print(f"Initial Mesh: {mesh_res.log}")
 
         # 3. Validation Loop
+        fidelity = None
         for i in range(self.max_iterations):
-            print(f"\n--- Iteration {i+1} ---")
+            with trace.span("iteration", index=i + 1):
+                print(f"\n--- Iteration {i+1} ---")
+                if self.keep_intermediates:
+                    current_mesh.materialize()
             
-            val_res = self.validator.run(current_mesh)
-            if val_res.status == AgentStatus.FAILURE:
-                print(f"Validator Tool Failed: {val_res.error}")
-                return {"model": os.path.basename(input_step_path), "status": "FAILURE", "error": val_res.error}
+                # Only the repair-or-remesh decision matters here: once a repairable failure is
+                # found, checks that could only add unrepairable ones (intersections) are skipped
+                val_res = self._validate(current_mesh, stop_at=REPAIRABLE, bodies=bodies)
+                if val_res.status == AgentStatus.FAILURE:
+                    print(f"Validator Tool Failed: {val_res.error}")
+                    return {"model": os.path.basename(input_step_path), "status": "FAILURE", "error": val_res.error}
                 
-            report = val_res.artifact.metadata
-            print(f"Validation Status: {report['status']}")
+                report = val_res.artifact.metadata
+                print(f"Validation Status: {report['status']}")
             
-            # Prepare result for potential return
-            result = {
-                "model": os.path.basename(input_step_path),
-                "status": "FAILURE",
-                "iterations": i + 1,
-                "final_mesh_path": current_mesh.path if current_mesh else None,
-                "validation_report": report
-            }
-
-            if report["status"] == "SUCCESS":
-                print(f"\n>>> SUCCESS: Mesh validated. Final path: {current_mesh.path}")
-                result["status"] = "SUCCESS"
-                return result
+                # Prepare result for potential return
+                result = {
+                    "model": os.path.basename(input_step_path),
+                    "status": "FAILURE",
+                    "iterations": i + 1,
+                    "final_mesh_path": current_mesh.path if current_mesh else None,
+                    "validation_report": report
+                }
+                if self.fidelity is not None:
+                    if fidelity is None:
+                        fidelity = self._measure_fidelity(brep_artifact, current_mesh)
+                    result["fidelity"] = fidelity
+                    print(f"Deviation from CAD: {fidelity['hausdorff_relative']:.2e} of the diagonal")
+
+                if report["status"] == "SUCCESS":
+                    result["final_mesh_path"] = self._finalize(current_mesh)
+                    if self.lod_faces or self.lod_max_error is not None:
+                        result["lods"] = self._lods(current_mesh, bodies)
+                    search.remember(brep_artifact.metadata)
+                    print(f"\n>>> SUCCESS: Mesh validated. Final path: {result['final_mesh_path']}")
+                    result["status"] = "SUCCESS"
+                    return result
             
-            # Reasoning Logic
-            failures = report.get("failures", [])
-            print(f"Failures: {failures}")
+                # Reasoning Logic
+                failures = report.get("failures", [])
+                print(f"Failures: {failures}")
             
-            if "is_watertight" in failures:
-                print("Strategy: Repair Watertightness")
-                opt_res = self.optimizer.run(current_mesh, self.workspace_dir, task="repair_watertight")
-                if opt_res.status == AgentStatus.SUCCESS:
-                    current_mesh = opt_res.artifact
-                else:
-                    print(f"Optimization Failed: {opt_res.error}")
-                    result["error"] = opt_res.error
-                    return result # Fatal error in optimization
-                    
-            elif "bad_aspect_ratio" in failures:
-                print("Strategy: Optimize Element Quality (Smoothing)")
-                opt_res = self.optimizer.run(current_mesh, self.workspace_dir, task="optimize_jacobian")
-                if opt_res.status == AgentStatus.SUCCESS:
-                    current_mesh = opt_res.artifact
-                else:
-                    print(f"Optimization Failed: {opt_res.error}")
-                    result["error"] = opt_res.error
-                    return result
-            elif "self_intersection" in failures:
-                print("Strategy: Repair Self-Intersections")
-                opt_res = self.optimizer.run(current_mesh, self.workspace_dir, task="repair_intersection")
-                if opt_res.status == AgentStatus.SUCCESS:
-                    current_mesh = opt_res.artifact
-                else:
-                    print(f"Optimization Failed: {opt_res.error}")
-                    result["error"] = opt_res.error
-                    return result
+                # Every repairable failure is handled in one fused optimizer pass
+                repairs = [task for failure, task in REPAIR_PLAN if failure in failures]
+                remesh = not repairs
+                if repairs:
+                    print(f"Strategy: Repair Plan {repairs}")
+                    # The Optimizer repairs its input in place; while the repair can still be
+                    # rejected, it gets a copy so that the current mesh stays as it was
+                    repair_input = current_mesh
+                    if self.fidelity is not None:
+                        repair_input = Artifact(current_mesh.type, current_mesh.path, dict(current_mesh.metadata),
+                                                payload=load_mesh(current_mesh).copy(), persisted=False)
+                    opt_res = self._optimize(repair_input, "repair_plan", failures, bodies)
+                    if opt_res.status == AgentStatus.FAILURE:
+                        print(f"Optimization Failed: {opt_res.error}")
+                        result["error"] = opt_res.error
+                        return result # Fatal error in optimization
 
-            elif "disconnected_components" in failures:
-                print("Strategy: Remove Disconnected Components")
-                opt_res = self.optimizer.run(current_mesh, self.workspace_dir, task="repair_components")
-                if opt_res.status == AgentStatus.SUCCESS:
-                    current_mesh = opt_res.artifact
-                else:
-                    print(f"Optimization Failed: {opt_res.error}")
-                    result["error"] = opt_res.error
-                    return result
+                    repaired = None
+                    if self.fidelity is not None:
+                        repaired = self._measure_fidelity(brep_artifact, opt_res.artifact)
+                    # A repair may not buy quality with accuracy: past the limit, and worse than
+                    # before, it is dropped and the mesh is regenerated instead
+                    if (repaired is not None and repaired["hausdorff_relative"] > self.max_deviation
+                            and repaired["hausdorff_relative"] > fidelity["hausdorff_relative"]):
+                        print(f"Repairs rejected: deviation {repaired['hausdorff_relative']:.2e} "
+                              f"exceeds {self.max_deviation:.2e}")
+                        remesh = True
+                    else:
+                        current_mesh, fidelity = opt_res.artifact, repaired
+                        print(f"Repairs: {opt_res.log}")
 
-            else:
-                print("Strategy: Remesh with Higher Fineness")
-                # Note: We need to go back to B-Rep for remeshing
-                mesh_res = self.mesher.run(brep_artifact, self.workspace_dir, fineness=0.8)
-                if mesh_res.status == AgentStatus.SUCCESS:
-                    current_mesh = mesh_res.artifact
-                else:
-                    print(f"Remeshing Failed: {mesh_res.error}")
-                    result["error"] = mesh_res.error
-                    return result
+                if remesh:
+                    fineness = search.next()
+                    if fineness is None:
+                        print(f"Strategy: Remesh exhausted ({search.exhausted_reason()})")
+                        result["error"] = "remesh_search_exhausted"
+                        result["final_mesh_path"] = self._finalize(current_mesh)
+                        return result
+
+                    # Remesh only the CAD surfaces the failures map to, when the Validator could
+                    # trace them; otherwise (or if that fails) go back to B-Rep for a full remesh
+                    mesh_res = None
+                    surfaces = report.get("failing_surfaces")
+                    if surfaces:
+                        print(f"Strategy: Remesh {len(surfaces)} Failing Surface(s) with Higher Fineness ({fineness})")
+                        mesh_res = self._remesh_surfaces(brep_artifact, surfaces, fineness)
+                        if mesh_res.status == AgentStatus.SUCCESS:
+                            # Only part of the mesh changed, so it says nothing about full-mesh face counts
+                            search.record(fineness, None)
+                        else:
+                            print(f"Local Remesh Failed ({mesh_res.error}); remeshing everything")
+                            mesh_res = None
+                    if mesh_res is None:
+                        print(f"Strategy: Remesh with Higher Fineness ({fineness})")
+                        mesh_res = self._mesh(brep_artifact, fineness=fineness)
+                        if mesh_res.status == AgentStatus.SUCCESS:
+                            search.record(fineness, mesh_res.artifact.metadata.get("face_count"))
+                    if mesh_res.status == AgentStatus.SUCCESS:
+                        current_mesh, fidelity = mesh_res.artifact, None
+                        print(f"Remesh: {mesh_res.log}")
+                    else:
+                        print(f"Remeshing Failed: {mesh_res.error}")
+                        result["error"] = mesh_res.error
+                        return result
                     
+        result["final_mesh_path"] = self._finalize(current_mesh)
         print("\n>>> FAILURE: Max iterations reached.")
         return result
 
@@ -132,29 +405,41 @@ class Supervisor:
         Runs the linear baseline: Parser -> Mesher -> Optimizer (Blind) -> Validator (Report only)
         No feedback loop.
         """
+        try:
+            with self.tracer.activate(), \
+                    trace.span("run_baseline", model=os.path.basename(input_step_path)) as run_span:
+                result = self._run_baseline(input_step_path)
+                run_span.update(status=result["status"])
+        finally:
+            if self.owns_session:
+                self.session.close()
+        if self.cache is not None:
+            result["cache"] = self.cache.stats()
+        return result
+
+    def _run_baseline(self, input_step_path: str) -> dict:
         print(f"=== ACMS Baseline: Processing {input_step_path} ===")
         
         # 1. Parse
-        input_artifact = Artifact(ArtifactType.STEP_FILE, input_step_path)
-        parse_res = self.parser.run(input_artifact, self.workspace_dir)
+        parse_res = self._parse(input_step_path)
         if parse_res.status == AgentStatus.FAILURE:
             return {"model": os.path.basename(input_step_path), "status": "FAILURE", "error": parse_res.error}
         brep_artifact = parse_res.artifact
 
         # 2. Mesh (Default parameters)
-        mesh_res = self.mesher.run(brep_artifact, self.workspace_dir, fineness=0.5)
+        mesh_res = self._mesh(brep_artifact, fineness=0.5)
         if mesh_res.status == AgentStatus.FAILURE:
             return {"model": os.path.basename(input_step_path), "status": "FAILURE", "error": mesh_res.error}
         current_mesh = mesh_res.artifact
 
         # 3. Optimizer (Blind pass - e.g. just smoothing or simple repair)
         # Baseline typically does a standard "cleanup"
-        opt_res = self.optimizer.run(current_mesh, self.workspace_dir, task="repair_watertight")
+        opt_res = self._optimize(current_mesh, "repair_watertight")
         if opt_res.status == AgentStatus.SUCCESS:
             current_mesh = opt_res.artifact
 
         # 4. Validate (Just to get metrics)
-        val_res = self.validator.run(current_mesh)
+        val_res = self._validate(current_mesh, bodies=self._body_count(brep_artifact))
         report = {}
         if val_res.status == AgentStatus.SUCCESS:
             report = val_res.artifact.metadata
@@ -165,6 +450,6 @@ class Supervisor:
             "model": os.path.basename(input_step_path),
             "status": status,
             "iterations": 1,
-            "final_mesh_path": current_mesh.path,
+            "final_mesh_path": self._finalize(current_mesh),
             "validation_report": report
         }
@@ -0,0 +1,62 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+class EdgeMap:
+    """
+    The edges of a triangle mesh grouped once (one sort of 64-bit edge keys), so
+    watertightness, winding, Euler number and connectivity are read off the same arrays
+    instead of each rebuilding its own. Definitions match trimesh's properties of the same names.
+    """
+
+    def __init__(self, vertex_count: int, faces):
+        self.vertex_count = vertex_count
+        self.faces = np.asarray(faces, dtype=np.int64)
+        # Half-edges in face order: half-edge i belongs to face i // 3
+        self.edges = self.faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+        base = max(vertex_count, 1)
+        keys = self.edges.min(axis=1) * base + self.edges.max(axis=1)
+
+        # Half-edges of the same edge are adjacent in this order
+        self.order = np.argsort(keys)
+        keys = keys[self.order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        self.starts = np.flatnonzero(first)
+        self.counts = np.diff(np.append(self.starts, len(keys)))
+        self.inverse = np.empty(len(keys), dtype=np.int64)
+        self.inverse[self.order] = np.cumsum(first) - 1
+        self.unique_edges = np.column_stack([keys[self.starts] // base, keys[self.starts] % base])
+
+    @property
+    def is_watertight(self) -> bool:
+        # Every edge shared by exactly two faces
+        return bool(len(self.faces)) and bool(np.all(self.counts == 2))
+
+    @property
+    def is_winding_consistent(self) -> bool:
+        # Every edge shared by two faces is traversed in opposite directions
+        if not len(self.faces):
+            return False
+        paired = self.starts[self.counts == 2]
+        first, second = self.edges[self.order[paired]], self.edges[self.order[paired + 1]]
+        return bool(np.all(first[:, 1] == second[:, 0]))
+
+    def open_edge_faces(self) -> np.ndarray:
+        """Faces with an edge no other face shares."""
+        return np.flatnonzero(self.counts[self.inverse] == 1) // 3
+
+    @property
+    def euler_number(self) -> int:
+        referenced = np.count_nonzero(np.bincount(self.faces.ravel(), minlength=self.vertex_count))
+        return int(referenced - len(self.unique_edges) + len(self.faces))
+
+    @property
+    def body_count(self) -> int:
+        # Connected groups of vertices (an unreferenced vertex is a group of its own)
+        n = self.vertex_count
+        edges = self.unique_edges
+        graph = coo_matrix((np.ones(len(edges), dtype=bool), (edges[:, 0], edges[:, 1])), shape=(n, n))
+        count, _ = connected_components(graph, directed=False)
+        return int(count)
@@ -0,0 +1,151 @@
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Tracer that module-level span() reports to; set by Tracer.activate()
+_active: Optional["Tracer"] = None
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def file_size(path: Optional[str]) -> Optional[int]:
+    if path and os.path.isfile(path):
+        return os.path.getsize(path)
+    return None
+
+
+class Tracer:
+    """
+    Records nested timing spans (parse, mesh, validate, optimizer steps, ...).
+
+    Each span records its duration, the growth of the process peak RSS and, with
+    trace_malloc, the Python/NumPy allocation delta and peak. Callers attach their own
+    attributes (face counts, file sizes) to the dict yielded by span().
+    Spans go to `path` as JSON lines as they finish, or as a Chrome trace
+    (chrome://tracing, Perfetto) when the path ends in .json. Without a path nothing is recorded.
+    on_span_start(name) is called as every span begins, with or without a path
+    (batch workers use it as a stage heartbeat).
+    """
+
+    def __init__(self, path: Optional[str] = None, trace_malloc: bool = False,
+                 on_span_start: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.trace_malloc = trace_malloc
+        self.on_span_start = on_span_start
+        self.enabled = path is not None
+        self.chrome = self.enabled and path.endswith(".json")
+        self.spans = []
+        self._stack = []
+        self._file = None
+        self._started_malloc = False
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Makes this tracer the target of module-level span() calls (used inside agents)."""
+        global _active
+        previous, _active = _active, self
+        if self.enabled and self.trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_malloc = True
+        try:
+            yield self
+        finally:
+            _active = previous
+            if self._started_malloc:
+                tracemalloc.stop()
+                self._started_malloc = False
+            self.flush()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attrs):
+        if self.on_span_start is not None:
+            self.on_span_start(name)
+        if not self.enabled:
+            yield attrs
+            return
+
+        malloc = self.trace_malloc and tracemalloc.is_tracing()
+        frame = {"peak": 0, "current": 0}
+        if malloc:
+            # Nested spans reset the tracemalloc peak, so fold it into the parent first
+            if self._stack:
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            frame["current"] = tracemalloc.get_traced_memory()[0]
+        depth = len(self._stack)
+        self._stack.append(frame)
+
+        rss_before = _max_rss_mb()
+        start_wall = time.time()
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            duration = time.perf_counter() - start
+            self._stack.pop()
+            record = {"name": name, "start": start_wall, "duration_s": round(duration, 6), "depth": depth}
+            rss_after = _max_rss_mb()
+            if rss_after is not None:
+                record["max_rss_mb"] = round(rss_after, 1)
+                record["rss_growth_mb"] = round(rss_after - rss_before, 1)
+            if malloc:
+                current, peak = tracemalloc.get_traced_memory()
+                frame["peak"] = max(frame["peak"], peak)
+                record["malloc_delta_mb"] = round((current - frame["current"]) / 1024 ** 2, 3)
+                record["malloc_peak_mb"] = round((frame["peak"] - frame["current"]) / 1024 ** 2, 3)
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent["peak"] = max(parent["peak"], frame["peak"])
+                tracemalloc.reset_peak()
+            record.update({k: v for k, v in attrs.items() if v is not None})
+            self._record(record)
+
+    def _record(self, record: dict):
+        self.spans.append(record)
+        if self.chrome:
+            return
+        # JSON lines are appended as spans finish, so a crashed run still leaves its trace
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+
+    def flush(self):
+        if not self.enabled:
+            return
+        if self.chrome:
+            events = [{
+                "name": s["name"],
+                "ph": "X",
+                "ts": int(s["start"] * 1e6),
+                "dur": int(s["duration_s"] * 1e6),
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": {k: v for k, v in s.items() if k not in ("name", "start", "duration_s")},
+            } for s in self.spans]
+            with open(self.path, "w") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        elif self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def span(name: str, **attrs):
+    """Span on the active tracer, or a no-op when tracing is off."""
+    if _active is None:
+        return contextlib.nullcontext(attrs)
+    return _active.span(name, **attrs)
@@ -7,6 +7,7 @@ class ArtifactType(Enum):
     BREP_FILE = "BREP_FILE"
     STL_FILE = "STL_FILE"
     MSH_FILE = "MSH_FILE"
+    MESH_BIN = "MESH_BIN"  # Internal indexed mesh container (core.mesh_io), memory-mappable
     VALIDATION_REPORT = "VALIDATION_REPORT"
 
 @dataclass
@@ -14,10 +15,28 @@ class Artifact:
     type: ArtifactType
     path: str
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Live geometry (trimesh.Trimesh or (vertices, faces) arrays) passed between agents by reference.
+    # When set, `path` is where the mesh will be written on materialize().
+    payload: Any = field(default=None, compare=False)
+    persisted: bool = True
 
     def __repr__(self):
         return f"Artifact({self.type.name}, path='{self.path}')"
 
+    def materialize(self, path: Optional[str] = None) -> str:
+        """
+        Writes the mesh to `path` (default: self.path) and returns it. The format follows
+        the extension, so this also converts an intermediate .meshbin into the final STL.
+        """
+        target = path or self.path
+        if target == self.path and self.persisted:
+            return target
+        from core.mesh_io import load_mesh, write_mesh
+        write_mesh(self.payload if self.payload is not None else load_mesh(self), target)
+        if target == self.path:
+            self.persisted = True
+        return target
+
 class AgentStatus(Enum):
     SUCCESS = "SUCCESS"
     FAILURE = "FAILURE"
@@ -28,3 +47,5 @@ class AgentResult:
     artifact: Optional[Artifact] = None
     log: str = ""
     error: Optional[str] = None
+    # Further outputs of agents that produce several meshes at once (e.g. levels of detail)
+    artifacts: List[Artifact] = field(default_factory=list)
@@ -2,11 +2,37 @@ import argparse
 import sys
 import os
 from core.supervisor import Supervisor
+from core.cache import ArtifactCache
+from agents.mesher import ALGORITHMS_2D
+from core.trace import Tracer
+from core.sizing import AdaptiveSizing
+from core.smoothing import METHODS as SMOOTHING_METHODS
 
 def main():
     parser = argparse.ArgumentParser(description="ACMS: Automated CAD-to-Mesh System")
     parser.add_argument("input_file", help="Path to the input STEP file")
     parser.add_argument("--workspace", default="workspace", help="Directory for intermediate artifacts")
+    parser.add_argument("--export-brep", action="store_true", help="Also write the parsed .brep to the workspace (debugging)")
+    parser.add_argument("--cache-dir", default=None, help="Reuse parsed BREPs and meshes from this content-addressed cache")
+    parser.add_argument("--cache-size-mb", type=int, default=2048, help="Cache size limit; least recently used entries are evicted")
+    parser.add_argument("--face-budget", type=int, default=None, help="Never remesh finer than this predicted face count")
+    parser.add_argument("--fineness-history", default=None, help="JSON file remembering converged fineness per part signature")
+    parser.add_argument("--threads", type=int, default=None, help="Gmsh meshing threads (default: all cores)")
+    parser.add_argument("--algorithm", choices=sorted(ALGORITHMS_2D), default=None, help="Gmsh 2D meshing algorithm (default: Gmsh's own)")
+    parser.add_argument("--assembly-workers", type=int, default=None, help="Mesh the bodies of a multi-body STEP on this many processes and stitch the result")
+    parser.add_argument("--no-instances", action="store_true", help="Mesh every copy of a repeated solid separately instead of placing one mesh")
+    parser.add_argument("--sizing", choices=["uniform", "adaptive"], default="uniform", help="Element sizes: one global size, or derived from curvature and feature size")
+    parser.add_argument("--size-min", type=float, default=None, help="Smallest adaptive element size in model units (default: scales with the model)")
+    parser.add_argument("--size-max", type=float, default=None, help="Largest adaptive element size in model units (default: scales with the model)")
+    parser.add_argument("--element-budget", type=int, default=None, help="Coarsen adaptive sizes until the estimated triangle count fits")
+    parser.add_argument("--smoothing", choices=SMOOTHING_METHODS, default="taubin", help="Smoothing used to repair poor elements (taubin keeps the volume)")
+    parser.add_argument("--smooth-below", type=float, default=None, help="Only move vertices of elements below this Jacobian quality (0-1)")
+    parser.add_argument("--lod-faces", type=int, nargs="+", default=None, help="Also write decimated levels of detail with these face counts")
+    parser.add_argument("--lod-max-error", type=float, default=None, help="Largest surface deviation a LOD may introduce (model units); alone it writes one LOD")
+    parser.add_argument("--max-deviation", type=float, default=None, help="Measure the distance to the CAD surfaces every iteration and reject repairs that exceed this fraction of the model diagonal")
+    parser.add_argument("--trace", default=None, help="Write per-stage timing/memory spans here (.jsonl, or .json for Chrome trace format)")
+    parser.add_argument("--trace-malloc", action="store_true", help="Also record tracemalloc allocation deltas (slower)")
+    parser.add_argument("--keep-intermediates", action="store_true", help="Write every intermediate mesh to the workspace, not just the final one")
     
     args = parser.parse_args()
     
@@ -17,8 +43,23 @@ def main():
         
     print(f"Starting ACMS on {input_path}...")
     
-    supervisor = Supervisor(workspace_dir=args.workspace)
+    sizing = None
+    if args.sizing == "adaptive":
+        sizing = AdaptiveSizing(size_min=args.size_min, size_max=args.size_max, element_budget=args.element_budget)
+
+    cache = ArtifactCache(args.cache_dir, max_bytes=args.cache_size_mb * 1024 ** 2) if args.cache_dir else None
+    supervisor = Supervisor(workspace_dir=args.workspace, export_brep=args.export_brep,
+                            keep_intermediates=args.keep_intermediates, cache=cache,
+                            face_budget=args.face_budget, fineness_history=args.fineness_history,
+                            mesh_threads=args.threads, mesh_algorithm=args.algorithm,
+                            assembly_workers=args.assembly_workers, dedupe_instances=not args.no_instances,
+                            mesh_sizing=sizing, smoothing=args.smoothing, smooth_below=args.smooth_below,
+                            lod_faces=args.lod_faces, lod_max_error=args.lod_max_error,
+                            max_deviation=args.max_deviation,
+                            tracer=Tracer(args.trace, trace_malloc=args.trace_malloc))
     result = supervisor.run(input_path)
+    if cache is not None:
+        print(cache.report())
     
     if result["status"] == "SUCCESS":
         print("\nACMS Completed Successfully.")
@@ -1,49 +1,48 @@
+import argparse
 import os
-import subprocess
-import sys
+from core.batch import find_cad_files, run_batch as run_models
 
-def run_batch():
+def run_batch(workers=None, workspace="workspace", cache_dir=None, trace=False, stage_timeout=None,
+              journal=None, resume=True):
     base_dir = os.path.dirname(os.path.abspath(__file__))
     cad_dir = os.path.join(base_dir, "tests", "CAD files")
-    main_script = os.path.join(base_dir, "main.py")
     
     if not os.path.exists(cad_dir):
         print(f"Error: Directory not found: {cad_dir}")
         return
 
-    files = [f for f in os.listdir(cad_dir) if f.lower().endswith(('.step', '.stp', '.igs', '.iges'))]
+    files = find_cad_files(cad_dir, extensions=('.step', '.stp', '.igs', '.iges'))
     
     print(f"Found {len(files)} CAD files in {cad_dir}")
-    
-    results = []
-    
-    for f in files:
-        input_path = os.path.join(cad_dir, f)
-        print(f"\nProcessing {f}...")
-        
-        try:
-            # Run main.py
-            cmd = [sys.executable, main_script, input_path]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print(f"SUCCESS: {f}")
-                results.append((f, "SUCCESS"))
-            else:
-                print(f"FAILURE: {f}")
-                print(f"Output:\n{result.stdout}")
-                print(f"Error:\n{result.stderr}")
-                results.append((f, "FAILURE"))
-                
-        except Exception as e:
-            print(f"ERROR running {f}: {e}")
-            results.append((f, "ERROR"))
+
+    def report(row):
+        print(f"{row['Status']}: {row['Model']}")
+        if row["Error"]:
+            print(f"Error:\n{row['Error']}")
+
+    # All models share a pool of pre-started worker processes instead of one interpreter per file
+    output_dir = os.path.abspath(workspace)
+    results_csv = os.path.join(output_dir, "batch_results.csv")
+    results = run_models(files, output_dir, results_csv, workers=workers, on_result=report,
+                         cache_dir=cache_dir and os.path.abspath(cache_dir), trace=trace,
+                         stage_timeout=stage_timeout, journal=journal and os.path.abspath(journal), resume=resume)
             
     print("\n" + "="*30)
     print("BATCH PROCESSING SUMMARY")
     print("="*30)
-    for name, status in results:
-        print(f"{name}: {status}")
+    for row in results:
+        print(f"{row['Model']}: {row['Status']}")
+    print(f"\nResults saved to {results_csv}")
 
 if __name__ == "__main__":
-    run_batch()
+    parser = argparse.ArgumentParser(description="ACMS batch processing over tests/CAD files")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--cache-dir", default=None, help="Shared cache of parsed BREPs and meshes")
+    parser.add_argument("--trace", action="store_true", help="Write per-stage spans to trace.jsonl in each model's workspace")
+    parser.add_argument("--journal", default=None, help="Crash-safe JSON-lines journal of finished models; rerunning resumes from it")
+    parser.add_argument("--no-resume", action="store_true", help="Run every model even if it is already in the journal")
+    parser.add_argument("--stage-timeout", type=float, default=None, help="Kill a model whose parse/mesh/validate/... stage runs longer than this (status TIMEOUT)")
+    parser.add_argument("--workspace", default="workspace", help="Per-model workspaces and the results CSV go here")
+    args = parser.parse_args()
+    run_batch(workers=args.workers, workspace=args.workspace, cache_dir=args.cache_dir, trace=args.trace,
+              stage_timeout=args.stage_timeout, journal=args.journal, resume=not args.no_resume)
@@ -0,0 +1,52 @@
+import argparse
+import json
+import sys
+from core.service import JOB_OPTIONS, JobQueue, MeshService
+
+def main():
+    parser = argparse.ArgumentParser(description="ACMS mesh service: pre-warmed workers consuming a job queue")
+    parser.add_argument("--queue-dir", default="queue", help="Directory-backed job queue shared with clients")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    start = commands.add_parser("start", help="Run the service until interrupted")
+    start.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    start.add_argument("--output-dir", default=None, help="Per-job workspaces (default: <queue-dir>/output)")
+    start.add_argument("--cache-dir", default=None, help="Shared cache of parsed BREPs and meshes")
+    start.add_argument("--jobs-file", default=None, help="JSON-lines file to tail for jobs ({\"input_path\": ..., \"options\": {...}})")
+    start.add_argument("--http", type=int, default=None, metavar="PORT", help="Also accept jobs over HTTP on 127.0.0.1:PORT")
+
+    submit = commands.add_parser("submit", help="Queue a STEP file")
+    submit.add_argument("input_file")
+    submit.add_argument("--id", default=None, help="Job id (default: random)")
+    submit.add_argument("--options", default=None, help=f"JSON object of Supervisor options: {', '.join(JOB_OPTIONS)}")
+    submit.add_argument("--wait", type=float, default=0, help="Wait up to this many seconds for the result")
+
+    status = commands.add_parser("status", help="Show a job's state or result")
+    status.add_argument("job_id")
+    status.add_argument("--wait", type=float, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == "start":
+        service = MeshService(args.queue_dir, output_dir=args.output_dir, workers=args.workers,
+                              cache_dir=args.cache_dir)
+        if args.http is not None:
+            service.serve_http(port=args.http)
+            print(f"HTTP API on http://127.0.0.1:{args.http}/jobs")
+        print(f"Serving queue {service.queue.root} with {service.workers} workers (Ctrl+C to stop)")
+        service.serve_forever(jobs_file=args.jobs_file)
+        return
+
+    queue = JobQueue(args.queue_dir)
+    if args.command == "submit":
+        options = json.loads(args.options) if args.options else None
+        job_id = queue.submit(args.input_file, options, args.id)
+        result = queue.wait(job_id, args.wait) if args.wait > 0 else queue.status(job_id)
+    else:
+        result = queue.wait(args.job_id, args.wait) if args.wait > 0 else queue.status(args.job_id)
+
+    print(json.dumps(result, indent=2, default=str))
+    sys.exit(1 if result.get("state") == "done" and result.get("status") != "SUCCESS" else 0)
+
+if __name__ == "__main__":
+    main()
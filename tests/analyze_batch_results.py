@@ -1,9 +1,13 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+import argparse
 import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.journal import read_rows
 
-def analyze_results():
+def analyze_results(journal_path=None):
     # Setup paths
     base_dir = os.path.dirname(os.path.abspath(__file__))
     csv_path = os.path.join(base_dir, "numerical_results.csv")
@@ -12,8 +16,11 @@ def analyze_results():
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         
-    # Load Data
-    df = pd.read_csv(csv_path)
+    # Load Data: straight from a batch journal (also mid-run), or from the CSV
+    if journal_path:
+        df = pd.DataFrame(read_rows(journal_path))
+    else:
+        df = pd.read_csv(csv_path)
     
     # Clean Data
     # Convert numeric columns, coercing errors to NaN
@@ -62,7 +69,8 @@ def analyze_results():
         plt.close()
         
     # --- Figure 4: Failure Analysis ---
-    fail_df = df[df['Status'] == 'FAILURE'].copy()
+    # FAILURE, TIMEOUT (stage killed by the scheduler) and CRASH rows
+    fail_df = df[df['Status'] != 'SUCCESS'].copy()
     if not fail_df.empty:
         plt.figure(figsize=(10, 6))
         # Simplify error messages for plotting
@@ -77,4 +85,7 @@ def analyze_results():
     print(f"Analysis complete. Figures saved to {output_dir}")
 
 if __name__ == "__main__":
-    analyze_results()
+    parser = argparse.ArgumentParser(description="Plot batch results")
+    parser.add_argument("--journal", default=None, help="Read results from a batch journal instead of numerical_results.csv")
+    args = parser.parse_args()
+    analyze_results(args.journal)
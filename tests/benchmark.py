@@ -0,0 +1,146 @@
+import argparse
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import gmsh
+import trimesh
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.batch import ROW_FIELDS, find_cad_files, make_row
+from core.session import GmshSession
+from core.supervisor import Supervisor
+from core.trace import Tracer
+from generate_test_step import create_array_step
+
+# Supervisor stages summed from the trace spans of one run
+STAGES = ["parse", "mesh", "validate", "optimize", "finalize"]
+
+BENCH_FIELDS = ROW_FIELDS + ["Source", "Repeat", "Surfaces"] + \
+    [f"{stage.capitalize()}_sec" for stage in STAGES] + ["Max_RSS_MB", "Malloc_Peak_MB", "Gmsh", "Trimesh"]
+
+# Synthetic series: (shape, fillet radius, solid counts)
+SYNTHETIC_SERIES = [
+    ("cube", 0.0, [1, 4, 16, 64]),
+    ("cylinder", 0.0, [1, 4, 16, 64]),
+    ("cube", 0.5, [1, 4, 16]),
+]
+
+
+def synthetic_cases(output_dir, series=SYNTHETIC_SERIES):
+    paths = []
+    for shape, fillet, counts in series:
+        for count in counts:
+            suffix = f"_fillet{fillet:g}" if fillet else ""
+            path = os.path.join(output_dir, f"{shape}_array_{count}{suffix}.step")
+            if not os.path.exists(path):
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    create_array_step(path, count, shape=shape, fillet=fillet)
+            paths.append(path)
+    return paths
+
+
+def measure(input_path, workspace, trace_malloc=False) -> dict:
+    """
+    One full Supervisor run (no cache) in the calling process; returns its
+    numerical_results.csv row extended with per-stage times and memory.
+    """
+    trace_path = os.path.join(workspace, "trace.jsonl")
+    # Gmsh writes to the C-level stdout, so its terminal output is switched off instead of redirected
+    session = GmshSession(terminal=0)
+    supervisor = Supervisor(workspace_dir=workspace, session=session,
+                            tracer=Tracer(trace_path, trace_malloc=trace_malloc))
+
+    start = time.time()
+    with open(os.path.join(workspace, "supervisor.log"), "w") as log, contextlib.redirect_stdout(log):
+        try:
+            result = supervisor.run(input_path)
+        except Exception as e:
+            result = {"model": os.path.basename(input_path), "status": "CRASH", "error": str(e)}
+        finally:
+            session.close()
+    row = make_row(os.path.basename(input_path), result, time.time() - start)
+    # Workspaces are temporary; the mesh path would be dangling
+    row["Final_Mesh"] = ""
+
+    spans = []
+    if os.path.exists(trace_path):
+        with open(trace_path) as f:
+            spans = [json.loads(line) for line in f]
+    run = next((s for s in spans if s["name"] == "run"), {})
+    parse = next((s for s in spans if s["name"] == "parse"), {})
+    for stage in STAGES:
+        row[f"{stage.capitalize()}_sec"] = round(sum(s["duration_s"] for s in spans if s["name"] == stage), 4)
+    row.update({
+        "Surfaces": parse.get("surfaces", ""),
+        "Max_RSS_MB": run.get("max_rss_mb", ""),
+        "Malloc_Peak_MB": run.get("malloc_peak_mb", ""),
+        "Gmsh": gmsh.__version__,
+        "Trimesh": trimesh.__version__,
+    })
+    return row
+
+
+def run_benchmark(inputs, results_csv, repeat=3, trace_malloc=False, on_result=None):
+    """
+    Runs every (source, path) in inputs `repeat` times, each run in a fresh process so
+    peak RSS is per run, one at a time so runs do not compete for cores.
+    """
+    rows = []
+    ctx = multiprocessing.get_context("spawn")
+    with open(results_csv, "w", newline="") as csv_file, tempfile.TemporaryDirectory() as tmp:
+        writer = csv.DictWriter(csv_file, fieldnames=BENCH_FIELDS)
+        writer.writeheader()
+        for source, path in inputs:
+            for r in range(repeat):
+                workspace = os.path.join(tmp, f"{os.path.splitext(os.path.basename(path))[0]}_{r}")
+                os.makedirs(workspace)
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    row = pool.submit(measure, path, workspace, trace_malloc).result()
+                row.update(Source=source, Repeat=r)
+                writer.writerow(row)
+                csv_file.flush()
+                rows.append(row)
+                if on_result:
+                    on_result(row)
+    return rows
+
+
+def main():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Per-stage ACMS benchmark over tests/CAD files and synthetic arrays")
+    parser.add_argument("--output", default=os.path.join(base_dir, "benchmark_results.csv"))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per model (use the median when comparing)")
+    parser.add_argument("--no-cad", action="store_true", help="Skip the bundled CAD files")
+    parser.add_argument("--no-synthetic", action="store_true", help="Skip the synthetic arrays")
+    parser.add_argument("--synthetic-dir", default=os.path.join(tempfile.gettempdir(), "acms_synthetic"),
+                        help="Where generated STEP files are kept between runs")
+    parser.add_argument("--trace-malloc", action="store_true", help="Record tracemalloc peaks (slower)")
+    args = parser.parse_args()
+
+    inputs = []
+    if not args.no_cad:
+        inputs += [("cad", p) for p in find_cad_files(os.path.join(base_dir, "CAD files"))]
+    if not args.no_synthetic:
+        os.makedirs(args.synthetic_dir, exist_ok=True)
+        inputs += [("synthetic", p) for p in synthetic_cases(args.synthetic_dir)]
+
+    def report(row):
+        stages = " ".join(f"{stage}={row[f'{stage.capitalize()}_sec']}" for stage in STAGES)
+        print(f"{row['Model']} #{row['Repeat']}: {row['Status']} faces={row['Faces']} "
+              f"total={row['Duration_sec']}s {stages} rss={row['Max_RSS_MB']}MB")
+
+    run_benchmark(inputs, args.output, repeat=args.repeat, trace_malloc=args.trace_malloc, on_result=report)
+    print(f"\nBenchmark results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.mesher import ALGORITHMS_2D, MesherAgent, default_threads
+from core.batch import find_cad_files
+from core.session import GmshSession
+from core.types import AgentStatus, Artifact, ArtifactType
+
+
+def time_meshing(path, threads, algorithm=None, fineness=0.5, repeat=3):
+    """
+    Best-of-`repeat` meshing time for one model and thread count. The geometry is
+    loaded once up front so only mesh generation is measured.
+    """
+    session = GmshSession(terminal=0)
+    mesher = MesherAgent(threads=threads, algorithm=algorithm)
+    best, faces = None, None
+    try:
+        session.load(path)
+        with tempfile.TemporaryDirectory() as tmp:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                res = mesher.run(Artifact(ArtifactType.STEP_FILE, path), tmp, fineness=fineness, session=session)
+                elapsed = time.perf_counter() - start
+                if res.status != AgentStatus.SUCCESS:
+                    raise RuntimeError(res.error)
+                best = elapsed if best is None else min(best, elapsed)
+                faces = res.artifact.metadata["face_count"]
+    finally:
+        session.close()
+    return best, faces
+
+
+def main():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Compare Gmsh meshing time across thread counts")
+    parser.add_argument("inputs", nargs="*", help="STEP files (default: tests/CAD files)")
+    parser.add_argument("--threads", type=int, nargs="+", default=sorted({1, default_threads()}),
+                        help="Thread counts to compare (default: 1 and all cores)")
+    parser.add_argument("--algorithm", choices=sorted(ALGORITHMS_2D), default=None)
+    parser.add_argument("--fineness", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    inputs = args.inputs or find_cad_files(os.path.join(base_dir, "CAD files"))
+
+    print(f"{'Model':<45} {'Threads':>7} {'Faces':>9} {'Time (s)':>9} {'Speedup':>8}")
+    for path in inputs:
+        baseline = None
+        for threads in args.threads:
+            elapsed, faces = time_meshing(path, threads, args.algorithm, args.fineness, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{os.path.basename(path)[:45]:<45} {threads:>7} {faces:>9} {elapsed:>9.3f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
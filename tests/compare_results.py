@@ -0,0 +1,118 @@
+import argparse
+import csv
+import statistics
+import sys
+
+# Compared when present in both files: total time plus the benchmark's per-stage times and memory
+TIME_METRICS = ["Duration_sec", "Parse_sec", "Mesh_sec", "Validate_sec", "Optimize_sec", "Finalize_sec"]
+MEMORY_METRICS = ["Max_RSS_MB"]
+
+
+def load_runs(path: str) -> dict:
+    """{model: [row, ...]} from a numerical_results.csv / benchmark_results.csv file."""
+    runs = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            runs.setdefault(row["Model"], []).append(row)
+    return runs
+
+
+def _values(rows, metric):
+    values = []
+    for row in rows:
+        try:
+            values.append(float(row.get(metric, "")))
+        except ValueError:
+            continue
+    return values
+
+
+def summarize(values):
+    """(median, IQR); a single run has no spread."""
+    if len(values) < 2:
+        return values[0], 0.0
+    q1, _, q3 = statistics.quantiles(values, n=4, method="inclusive")
+    return statistics.median(values), q3 - q1
+
+
+def compare(baseline: dict, candidate: dict, threshold: float = 0.10, min_delta: float = 0.05,
+            iqr_factor: float = 1.5, metrics=None) -> list:
+    """
+    One finding per (model, metric). A slowdown is a regression only when the candidate
+    median exceeds the baseline median by more than `threshold` (relative), by more than
+    `min_delta` (absolute: seconds or MB) and by more than `iqr_factor` times the larger
+    of the two IQRs, so run-to-run noise is not reported. A model that succeeded in the
+    baseline and does not in the candidate is always a regression.
+    """
+    metrics = metrics or TIME_METRICS + MEMORY_METRICS
+    findings = []
+    for model in sorted(baseline):
+        base_rows = baseline[model]
+        cand_rows = candidate.get(model)
+        if not cand_rows:
+            findings.append({"model": model, "metric": "missing", "regression": True})
+            continue
+
+        base_ok = all(r["Status"] == "SUCCESS" for r in base_rows)
+        cand_ok = all(r["Status"] == "SUCCESS" for r in cand_rows)
+        if base_ok and not cand_ok:
+            statuses = sorted({r["Status"] for r in cand_rows})
+            findings.append({"model": model, "metric": "Status", "regression": True,
+                             "candidate": "/".join(statuses)})
+
+        for metric in metrics:
+            base_values, cand_values = _values(base_rows, metric), _values(cand_rows, metric)
+            if not base_values or not cand_values:
+                continue
+            base_median, base_iqr = summarize(base_values)
+            cand_median, cand_iqr = summarize(cand_values)
+            delta = cand_median - base_median
+            ratio = cand_median / base_median if base_median > 0 else float("inf") if delta > 0 else 1.0
+            regression = (ratio > 1.0 + threshold and delta > min_delta
+                          and delta > iqr_factor * max(base_iqr, cand_iqr))
+            findings.append({
+                "model": model, "metric": metric, "regression": regression,
+                "baseline": base_median, "candidate": cand_median,
+                "ratio": ratio, "noise": max(base_iqr, cand_iqr), "runs": (len(base_values), len(cand_values)),
+            })
+    return findings
+
+
+def format_report(findings) -> str:
+    lines = [f"{'Model':<40} {'Metric':<14} {'Baseline':>10} {'Candidate':>10} {'Ratio':>7} {'IQR':>7}"]
+    for f in findings:
+        if f["metric"] == "missing":
+            lines.append(f"{f['model'][:40]:<40} {'(missing from candidate)':<14}  REGRESSION")
+            continue
+        if f["metric"] == "Status":
+            lines.append(f"{f['model'][:40]:<40} {'Status':<14} {'SUCCESS':>10} {f['candidate']:>10}  REGRESSION")
+            continue
+        flag = "  REGRESSION" if f["regression"] else ""
+        lines.append(f"{f['model'][:40]:<40} {f['metric']:<14} {f['baseline']:>10.3f} {f['candidate']:>10.3f} "
+                     f"{f['ratio']:>6.2f}x {f['noise']:>7.3f}{flag}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when a benchmark/batch run is slower than a stored baseline")
+    parser.add_argument("baseline", help="Baseline results CSV (numerical_results.csv or benchmark_results.csv)")
+    parser.add_argument("candidate", help="Candidate results CSV with the same schema")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that counts (default: 10%%)")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="Ignore absolute changes below this (s or MB)")
+    parser.add_argument("--iqr-factor", type=float, default=1.5, help="Slowdown must exceed this many IQRs")
+    parser.add_argument("--metrics", nargs="+", default=None, help="Columns to compare (default: times and peak RSS)")
+    parser.add_argument("--all", action="store_true", help="List every comparison, not only regressions")
+    args = parser.parse_args()
+
+    findings = compare(load_runs(args.baseline), load_runs(args.candidate), threshold=args.threshold,
+                       min_delta=args.min_delta, iqr_factor=args.iqr_factor, metrics=args.metrics)
+    regressions = [f for f in findings if f["regression"]]
+    shown = findings if args.all else regressions
+    if shown:
+        print(format_report(shown))
+    print(f"\n{len(regressions)} regression(s) in {len(findings)} comparison(s)")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
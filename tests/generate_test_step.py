@@ -1,18 +1,72 @@
+import argparse
+import math
+
 import gmsh
-import sys
 
 def create_cube_step(filename):
     gmsh.initialize()
     gmsh.model.add("cube")
-    
+
     # Create a box
     gmsh.model.occ.addBox(0, 0, 0, 10, 10, 10)
     gmsh.model.occ.synchronize()
-    
+
     # Export to STEP
     gmsh.write(filename)
     gmsh.finalize()
 
+def create_array_step(filename, count, shape="cube", size=10.0, fillet=0.0):
+    """
+    Writes a single solid made of `count` cubes or cylinders standing on a base plate,
+    laid out on a square grid. A nonzero `fillet` rounds every edge of each cube/cylinder
+    with that radius, which adds many small surfaces. Surface and face counts grow
+    with `count`, so a series of these measures how the pipeline scales.
+    """
+    gmsh.initialize()
+    gmsh.option.setNumber("General.Terminal", 0)
+    gmsh.model.add(f"{shape}_array_{count}")
+    occ = gmsh.model.occ
+
+    side = math.ceil(math.sqrt(count))
+    pitch = 2.0 * size
+    thickness = 0.2 * size
+    plate = occ.addBox(-0.5 * size, -0.5 * size, 0, side * pitch, side * pitch, thickness)
+
+    solids = []
+    for i in range(count):
+        x, y = (i % side) * pitch, (i // side) * pitch
+        # Sink each solid slightly into the plate so the fuse has a real overlap
+        z = 0.9 * thickness
+        if shape == "cube":
+            tag = occ.addBox(x, y, z, size, size, size)
+        elif shape == "cylinder":
+            tag = occ.addCylinder(x + 0.5 * size, y + 0.5 * size, z, 0, 0, size, 0.5 * size)
+        else:
+            raise ValueError(f"Unknown shape: {shape}")
+        if fillet > 0:
+            occ.synchronize()
+            surfaces = gmsh.model.getBoundary([(3, tag)], combined=False, oriented=False)
+            curves = sorted({c for _, c in gmsh.model.getBoundary(surfaces, combined=False, oriented=False)})
+            tag = occ.fillet([tag], curves, [fillet], removeVolume=True)[0][1]
+        solids.append((3, tag))
+
+    occ.fuse([(3, plate)], solids)
+    occ.synchronize()
+
+    gmsh.write(filename)
+    gmsh.finalize()
+
 if __name__ == "__main__":
-    create_cube_step("tests/test_cube.step")
-    print("Created tests/test_cube.step")
+    parser = argparse.ArgumentParser(description="Generate STEP test geometry")
+    parser.add_argument("output", nargs="?", default="tests/test_cube.step")
+    parser.add_argument("--count", type=int, default=None, help="Write an array of this many solids instead of a cube")
+    parser.add_argument("--shape", choices=["cube", "cylinder"], default="cube")
+    parser.add_argument("--size", type=float, default=10.0)
+    parser.add_argument("--fillet", type=float, default=0.0, help="Fillet radius for every edge of the array solids")
+    args = parser.parse_args()
+
+    if args.count is None:
+        create_cube_step(args.output)
+    else:
+        create_array_step(args.output, args.count, shape=args.shape, size=args.size, fillet=args.fillet)
+    print(f"Created {args.output}")
@@ -1,83 +1,41 @@
 import os
-import csv
-import shutil
-import time
+import argparse
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from core.supervisor import Supervisor
+from core.batch import find_cad_files, run_batch as run_models
 
-def run_batch():
+def run_batch(workers=None, cache_dir=None, trace=False, stage_timeout=None, journal=None, resume=True):
     input_dir = os.path.abspath("tests/CAD files")
     output_dir = os.path.abspath("tests/Mesh results")
     results_csv = os.path.abspath("tests/numerical_results.csv")
     
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    files = [f for f in os.listdir(input_dir) if f.lower().endswith(('.step', '.stp'))]
+    files = find_cad_files(input_dir)
     print(f"Found {len(files)} STEP files in {input_dir}")
-    
-    results = []
-    
-    for i, filename in enumerate(files):
-        print(f"\n[{i+1}/{len(files)}] Processing {filename}...")
-        input_path = os.path.join(input_dir, filename)
-        
-        # Create a dedicated workspace for this model to avoid collisions
-        model_name = os.path.splitext(filename)[0]
-        model_workspace = os.path.join(output_dir, model_name)
-        if not os.path.exists(model_workspace):
-            os.makedirs(model_workspace)
-            
-        supervisor = Supervisor(workspace_dir=model_workspace)
-        
-        # --- Run ACMS ---
-        print(f"  > Running ACMS on {filename}...")
-        start_time = time.time()
-        try:
-            res_acms = supervisor.run(input_path)
-        except Exception as e:
-            print(f"CRITICAL ERROR processing {filename} (ACMS): {e}")
-            res_acms = {"model": filename, "status": "CRASH", "error": str(e)}
-        duration_acms = time.time() - start_time
-        
-        # Log ACMS
-        row_acms = {
-            "Model": filename,
-            "Status": res_acms["status"],
-            "Iterations": res_acms.get("iterations", 0),
-            "Duration_sec": round(duration_acms, 2),
-            "Error": res_acms.get("error", ""),
-            "Final_Mesh": res_acms.get("final_mesh_path", "")
-        }
-        report_acms = res_acms.get("validation_report", {}).get("metrics", {})
-        row_acms.update({
-            "Watertight": report_acms.get("is_watertight", ""),
-            "Faces": report_acms.get("face_count", ""),
-            "Vertices": report_acms.get("vertex_count", ""),
-            "Volume": report_acms.get("volume", ""),
-            "Avg_Jacobian": report_acms.get("avg_jacobian", ""),
-            "Min_Jacobian": report_acms.get("min_jacobian", "")
-        })
-        results.append(row_acms)
 
-        # Copy final mesh to main output dir if successful
-        if res_acms["status"] == "SUCCESS" and res_acms.get("final_mesh_path"):
-            final_mesh = res_acms["final_mesh_path"]
-            if os.path.exists(final_mesh):
-                dest_name = f"{model_name}_final.stl"
-                shutil.copy(final_mesh, os.path.join(output_dir, dest_name))
+    done = []
+
+    def report(row):
+        done.append(row)
+        print(f"[{len(done)}/{len(files)}] {row['Model']}: {row['Status']} ({row['Duration_sec']} s)")
+
+    # Each model runs in its own workspace under output_dir; rows are streamed to the CSV
+    results = run_models(files, output_dir, results_csv, workers=workers, on_result=report,
+                         cache_dir=cache_dir and os.path.abspath(cache_dir), trace=trace,
+                         stage_timeout=stage_timeout, journal=journal and os.path.abspath(journal), resume=resume)
 
-    # Save CSV
     if results:
-        keys = results[0].keys()
-        with open(results_csv, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(results)
         print(f"\nBatch processing complete. Results saved to {results_csv}")
     else:
         print("\nNo results to save.")
 
 if __name__ == "__main__":
-    run_batch()
+    parser = argparse.ArgumentParser(description="ACMS batch test over tests/CAD files")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--cache-dir", default=None, help="Shared cache of parsed BREPs and meshes")
+    parser.add_argument("--trace", action="store_true", help="Write per-stage spans to trace.jsonl in each model's workspace")
+    parser.add_argument("--journal", default=None, help="Crash-safe JSON-lines journal of finished models; rerunning resumes from it")
+    parser.add_argument("--no-resume", action="store_true", help="Run every model even if it is already in the journal")
+    parser.add_argument("--stage-timeout", type=float, default=None, help="Kill a model whose parse/mesh/validate/... stage runs longer than this (status TIMEOUT)")
+    args = parser.parse_args()
+    run_batch(workers=args.workers, cache_dir=args.cache_dir, trace=args.trace, stage_timeout=args.stage_timeout,
+              journal=args.journal, resume=not args.no_resume)
@@ -0,0 +1,34 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.assembly import partition, weld
+
+class TestAssembly(unittest.TestCase):
+
+    def test_partition_balances_groups(self):
+        groups = {1: [1, 2, 3, 4], 2: [5, 6], 3: [7, 8], 4: [9]}
+        tasks = partition(groups, 2)
+        self.assertEqual(sorted(len(t) for t in tasks), [4, 5])
+        self.assertEqual(sorted(s for t in tasks for s in t), list(range(1, 10)))
+        # Never more tasks than groups
+        self.assertEqual(len(partition(groups, 16)), 4)
+
+    def test_weld_merges_shared_interface(self):
+        # Two triangles meshed in different parts share the edge (1,0,0)-(0,1,0)
+        a = (np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=float), np.array([[0, 1, 2]]))
+        b = (np.array([[1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=float), np.array([[0, 1, 2]]))
+        vertices, faces = weld([a, b], tolerance=1e-9)
+
+        self.assertEqual(len(vertices), 4)
+        np.testing.assert_allclose(vertices[faces[0]], a[0])
+        np.testing.assert_allclose(vertices[faces[1]], b[0])
+        self.assertEqual(len(set(faces[0]) & set(faces[1])), 2)
+
+if __name__ == '__main__':
+    unittest.main()
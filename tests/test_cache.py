@@ -0,0 +1,50 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.cache import ArtifactCache
+
+def write_bytes(n):
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * n)
+    return write
+
+class TestArtifactCache(unittest.TestCase):
+
+    def test_key_depends_on_every_part(self):
+        base = ArtifactCache.key("mesh", source="abc", fineness=0.5, gmsh="4.11")
+        self.assertEqual(base, ArtifactCache.key("mesh", gmsh="4.11", fineness=0.5, source="abc"))
+        self.assertNotEqual(base, ArtifactCache.key("mesh", source="abc", fineness=0.8, gmsh="4.11"))
+        self.assertNotEqual(base, ArtifactCache.key("mesh", source="abc", fineness=0.5, gmsh="4.12"))
+
+    def test_hit_miss_and_lru_eviction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ArtifactCache(tmp, max_bytes=2500)
+            self.assertIsNone(cache.get("a" * 64))
+
+            cache.put("a" * 64, "data.bin", write_bytes(1000), {"n": 1})
+            time.sleep(0.01)
+            cache.put("b" * 64, "data.bin", write_bytes(1000))
+            time.sleep(0.01)
+
+            # Touch "a" so that "b" becomes the least recently used entry
+            entry = cache.get("a" * 64)
+            self.assertEqual(entry["metadata"], {"n": 1})
+            time.sleep(0.01)
+
+            cache.put("c" * 64, "data.bin", write_bytes(1000))
+            self.assertIsNone(cache.get("b" * 64))
+            self.assertIsNotNone(cache.get("a" * 64))
+
+            stats = cache.stats()
+            self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 2, 1))
+            self.assertEqual(stats["entries"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
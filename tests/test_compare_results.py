@@ -0,0 +1,34 @@
+import unittest
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from compare_results import compare
+
+def runs(model, durations, status="SUCCESS"):
+    return {model: [{"Model": model, "Status": status, "Duration_sec": str(d)} for d in durations]}
+
+class TestCompareResults(unittest.TestCase):
+
+    def test_slowdown_beyond_noise_is_a_regression(self):
+        findings = compare(runs("gear", [1.0, 1.1, 0.9]), runs("gear", [1.5, 1.6, 1.4]))
+        self.assertEqual([(f["metric"], f["regression"]) for f in findings], [("Duration_sec", True)])
+
+    def test_slowdown_within_noise_is_not(self):
+        # Same medians as above, but the baseline spread covers the difference
+        findings = compare(runs("gear", [0.2, 1.0, 2.0]), runs("gear", [1.0, 1.5, 2.0]))
+        self.assertFalse(findings[0]["regression"])
+        # Tiny absolute changes are ignored as well
+        self.assertFalse(compare(runs("gear", [0.01]), runs("gear", [0.03]))[0]["regression"])
+
+    def test_lost_success_and_missing_models(self):
+        baseline = dict(runs("gear", [1.0]), **runs("bracket", [1.0]))
+        findings = compare(baseline, runs("gear", [1.0], status="FAILURE"))
+        regressions = {(f["model"], f["metric"]) for f in findings if f["regression"]}
+        self.assertEqual(regressions, {("bracket", "missing"), ("gear", "Status")})
+
+if __name__ == '__main__':
+    unittest.main()
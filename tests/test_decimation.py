@@ -0,0 +1,42 @@
+import unittest
+import os
+import sys
+
+import trimesh
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.decimation import decimate, deviation
+from core.quality import element_quality
+
+class TestDecimation(unittest.TestCase):
+
+    def test_face_targets_give_valid_lods(self):
+        sphere = trimesh.creation.icosphere(subdivisions=4)
+        lods = decimate(sphere.vertices, sphere.faces, face_targets=[300, 1000])
+
+        self.assertEqual([len(lod["faces"]) for lod in lods], [1000, 300])
+        for lod in lods:
+            mesh = trimesh.Trimesh(lod["vertices"], lod["faces"], process=False)
+            self.assertTrue(mesh.is_watertight)
+            self.assertTrue(mesh.is_winding_consistent)
+            self.assertEqual(element_quality(lod["vertices"], lod["faces"])["bad_element_count"], 0)
+        coarse = deviation(sphere, trimesh.Trimesh(lods[1]["vertices"], lods[1]["faces"]))
+        fine = deviation(sphere, trimesh.Trimesh(lods[0]["vertices"], lods[0]["faces"]))
+        self.assertLess(fine["hausdorff"], coarse["hausdorff"])
+        self.assertLess(coarse["hausdorff_relative"], 0.01)
+
+    def test_error_bound_only_removes_flat_detail(self):
+        box = trimesh.creation.box().subdivide().subdivide()
+        lods = decimate(box.vertices, box.faces, max_error=1e-9)
+
+        self.assertEqual(len(lods), 1)
+        mesh = trimesh.Trimesh(lods[0]["vertices"], lods[0]["faces"], process=False)
+        self.assertLess(len(mesh.faces), len(box.faces) // 4)
+        self.assertTrue(mesh.is_watertight)
+        self.assertAlmostEqual(mesh.volume, 1.0)
+        self.assertLess(deviation(box, mesh)["hausdorff"], 1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
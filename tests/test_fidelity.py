@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+
+import gmsh
+import numpy as np
+import trimesh
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fidelity import FidelityCheck, TriangleIndex, sample_surfaces
+
+def mesh_model():
+    gmsh.model.mesh.generate(2)
+    tags, coords, _ = gmsh.model.mesh.getNodes()
+    index = np.zeros(int(tags.max()) + 1, dtype=np.int64)
+    index[tags.astype(np.int64)] = np.arange(len(tags))
+    _, _, nodes = gmsh.model.mesh.getElements(2)
+    return coords.reshape(-1, 3), index[nodes[0].astype(np.int64)].reshape(-1, 3)
+
+class TestFidelity(unittest.TestCase):
+
+    def setUp(self):
+        gmsh.initialize()
+        gmsh.option.setNumber("General.Terminal", 0)
+
+    def tearDown(self):
+        gmsh.finalize()
+
+    def test_triangle_index_distances_are_exact(self):
+        box = trimesh.creation.box().subdivide()
+        points = np.random.default_rng(0).uniform(-2, 2, size=(2000, 3))
+        distances, faces = TriangleIndex(box.vertices, box.faces).query(points)
+
+        # Distance to the surface of the unit box: outside, to the solid; inside, to the nearest face
+        outside = np.linalg.norm(np.maximum(np.abs(points) - 0.5, 0), axis=1)
+        inside = np.min(0.5 - np.abs(points), axis=1)
+        expected = np.where(outside > 0, outside, inside)
+        np.testing.assert_allclose(distances, expected, atol=1e-12)
+        self.assertTrue((faces >= 0).all())
+
+    def test_triangle_index_on_graded_mesh(self):
+        # A few large faces next to many small ones: one index point per triangle either way
+        mesh = trimesh.util.concatenate([trimesh.creation.icosphere(subdivisions=3),
+                                         trimesh.creation.box(extents=[10, 10, 10])])
+        index = TriangleIndex(mesh.vertices, mesh.faces)
+        self.assertEqual(sum(tree.n for tree, _, _ in index.classes), len(mesh.faces))
+
+        points = np.random.default_rng(0).uniform(-6, 6, size=(500, 3))
+        distances, faces = index.query(points)
+        expected = trimesh.proximity.closest_point(mesh, points)[1]
+        np.testing.assert_allclose(distances, expected, atol=1e-9)
+        self.assertTrue((faces >= 0).all())
+
+    def test_samples_stay_on_trimmed_faces(self):
+        box = gmsh.model.occ.addBox(0, 0, 0, 2, 2, 1)
+        hole = gmsh.model.occ.addCylinder(1, 1, 0, 0, 0, 1, 0.5)
+        gmsh.model.occ.cut([(3, box)], [(3, hole)])
+        gmsh.model.occ.synchronize()
+
+        points, normals, radii = sample_surfaces(4000)
+        self.assertAlmostEqual(len(points), 4000, delta=len(gmsh.model.getEntities(2)))
+        self.assertTrue((radii > 0).all())
+        # Nothing inside the hole (up to the chords of its polygonal (u, v) outline),
+        # and every point on the solid's boundary
+        radius = np.linalg.norm(points[:, :2] - 1.0, axis=1)
+        self.assertGreater(radius.min(), 0.5 - 1e-3)
+        on_box = np.isclose(points, 0).any(axis=1) | np.isclose(points, [2, 2, 1]).any(axis=1)
+        on_hole = np.isclose(radius, 0.5)
+        self.assertTrue((on_box | on_hole).all())
+        # Unit normals: radial in the hole, along an axis elsewhere
+        np.testing.assert_allclose(np.linalg.norm(normals, axis=1), 1.0)
+        radial = np.abs(np.einsum("ij,ij->i", normals[on_hole, :2], points[on_hole, :2] - 1.0)) / 0.5
+        np.testing.assert_allclose(radial, 1.0, atol=1e-6)
+        np.testing.assert_allclose(np.abs(normals[~on_hole]).max(axis=1), 1.0, atol=1e-6)
+
+    def test_deviation_tracks_mesh_accuracy(self):
+        gmsh.model.occ.addCylinder(0, 0, 0, 0, 0, 2, 1)
+        gmsh.model.occ.synchronize()
+        gmsh.option.setNumber("Mesh.MeshSizeMax", 0.1)
+        vertices, faces = mesh_model()
+
+        check = FidelityCheck(samples=5000)
+        fine = check.measure("cylinder", vertices, faces)
+        # The chord error of 0.1 segments on a unit circle
+        self.assertLess(fine["hausdorff"], 0.01)
+        self.assertLess(fine["brep_to_mesh"]["rms"], fine["hausdorff"])
+
+        # Pushing the vertices outward by 5% shows up on both sides
+        inflated = vertices * [1.05, 1.05, 1.0]
+        coarse = check.measure("cylinder", inflated, faces)
+        self.assertGreater(coarse["brep_to_mesh"]["max"], 0.04)
+        self.assertGreater(coarse["mesh_to_brep"]["max"], 0.04)
+        self.assertAlmostEqual(coarse["hausdorff_relative"], coarse["hausdorff"] / np.sqrt(12), places=6)
+
+if __name__ == '__main__':
+    unittest.main()
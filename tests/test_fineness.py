@@ -0,0 +1,50 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fineness import FinenessSearch
+
+class TestFinenessSearch(unittest.TestCase):
+
+    def test_bisects_upwards_until_exhausted(self):
+        search = FinenessSearch(min_step=0.15)
+        search.record(search.initial({}), 1000)
+        self.assertEqual(search.next(), 0.75)
+        search.record(0.75, 4000)
+        self.assertEqual(search.next(), 0.875)
+        search.record(0.875, 8000)
+        # Less than min_step left between the failed setting and max_fineness
+        self.assertIsNone(search.next())
+        self.assertIn("maximum fineness", search.exhausted_reason())
+
+    def test_face_budget_caps_fineness(self):
+        search = FinenessSearch(face_budget=4000)
+        search.record(search.initial({}), 1000)
+        limit = search.budget_limit()
+        self.assertAlmostEqual(search.predict_faces(limit), 4000)
+        self.assertLessEqual(search.predict_faces(search.next()), 4000)
+
+        search.record(limit, 4000)
+        self.assertIsNone(search.next())
+        self.assertIn("face budget", search.exhausted_reason())
+
+    def test_remembers_converged_fineness(self):
+        meta = {"surface_count": 12, "volume_count": 1}
+        with tempfile.TemporaryDirectory() as tmp:
+            history = os.path.join(tmp, "history.json")
+            first = FinenessSearch(history_path=history)
+            first.record(first.initial(meta), 1000)
+            first.record(first.next(), 4000)
+            first.remember(meta)
+
+            second = FinenessSearch(history_path=history)
+            self.assertEqual(second.initial(meta), 0.75)
+            # Different signature starts from the default
+            self.assertEqual(FinenessSearch(history_path=history).initial({"surface_count": 500}), 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
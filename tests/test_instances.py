@@ -0,0 +1,57 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.instances import placement, place
+
+def frame(points):
+    # Same shape as core.instances._frame: center, principal axes, probe points
+    points = np.asarray(points, dtype=float)
+    center = points.mean(axis=0)
+    offsets = points - center
+    inertia = np.eye(3) * (offsets ** 2).sum() - offsets.T @ offsets
+    _, axes = np.linalg.eigh(inertia)
+    return center, axes, points
+
+def rotation(axis, angle):
+    axis = np.asarray(axis, dtype=float) / np.linalg.norm(axis)
+    k = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+    return np.eye(3) + np.sin(angle) * k + (1 - np.cos(angle)) * k @ k
+
+# An L-shaped bracket with a tab on one end: no repeated principal moments and chiral
+BRACKET = [[0, 0, 0], [6, 0, 0], [6, 1, 0], [1, 1, 0], [1, 4, 0], [0, 4, 0],
+           [0, 0, 2], [6, 0, 2], [6, 1, 2], [1, 1, 2], [1, 4, 2], [0, 4, 2], [6, 0.5, 3]]
+
+class TestInstances(unittest.TestCase):
+
+    def test_rotated_copy_is_placed(self):
+        source = np.array(BRACKET, dtype=float)
+        r = rotation([1, 2, 3], 0.8)
+        target = source @ r.T + [10, -5, 3]
+
+        transform = placement(frame(source), frame(target))
+        self.assertIsNotNone(transform)
+        np.testing.assert_allclose(place(source, transform), target, atol=1e-9)
+
+    def test_round_part_with_repeated_moments(self):
+        # A square prism: two equal principal moments leave its axes arbitrary
+        square = [[x, y, z] for x in (0, 2) for y in (0, 2) for z in (0, 5)] + [[0, 0.5, 0]]
+        source = np.array(square, dtype=float)
+        target = source @ rotation([0, 1, 1], 1.1).T + [3, 3, 3]
+
+        transform = placement(frame(source), frame(target))
+        self.assertIsNotNone(transform)
+        np.testing.assert_allclose(place(source, transform), target, atol=1e-9)
+
+    def test_mirrored_part_is_not_an_instance(self):
+        source = np.array(BRACKET, dtype=float)
+        mirrored = source * [-1, 1, 1]
+        self.assertIsNone(placement(frame(source), frame(mirrored)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import trimesh
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.intersections import _triangles_intersect, find_self_intersections
+
+class TestSelfIntersections(unittest.TestCase):
+
+    def test_clean_mesh_has_none(self):
+        sphere = trimesh.creation.icosphere(subdivisions=3)
+        self.assertEqual(len(find_self_intersections(sphere.vertices, sphere.faces)), 0)
+
+    def test_overlapping_shells_are_reported(self):
+        a = trimesh.creation.icosphere(subdivisions=2)
+        b = a.copy()
+        b.apply_translation([0.5, 0.0, 0.0])
+        mesh = trimesh.util.concatenate([a, b])
+
+        pairs = find_self_intersections(mesh.vertices, mesh.faces)
+        self.assertGreater(len(pairs), 0)
+        # Every reported pair has one face from each shell, and no pair is reported twice
+        n = len(a.faces)
+        self.assertTrue(np.all((pairs.min(axis=1) < n) & (pairs.max(axis=1) >= n)))
+        self.assertEqual(len(np.unique(np.sort(pairs, axis=1), axis=0)), len(pairs))
+
+    def test_crossing_triangles(self):
+        vertices = np.array([
+            [0, 0, 0], [2, 0, 0], [0, 2, 0],        # flat triangle in z=0
+            [0.5, 0.5, -1], [0.5, 0.5, 1], [1.5, 0.2, 0],  # pierces it
+            [5, 5, 1], [6, 5, 1], [5, 6, 1]          # far away
+        ], dtype=float)
+        faces = np.array([[0, 1, 2], [3, 4, 5], [6, 7, 8]])
+        pairs = find_self_intersections(vertices, faces)
+        self.assertEqual(sorted(pairs[0].tolist()), [0, 1])
+        self.assertEqual(len(pairs), 1)
+
+    def test_tiny_scale_crossing_is_reported(self):
+        # The parallel tolerance follows the triangle size, not absolute units
+        vertices = np.array([
+            [0, 0, 0], [2, 0, 0], [0, 2, 0],
+            [0.5, 0.5, -1], [0.5, 0.5, 1], [1.5, 0.2, 0]
+        ], dtype=float) * 1e-5
+        faces = np.array([[0, 1, 2], [3, 4, 5]])
+        self.assertEqual(len(find_self_intersections(vertices, faces)), 1)
+
+    def test_graded_mesh_matches_brute_force(self):
+        # Small sphere triangles poking through large box faces
+        sphere = trimesh.creation.icosphere(subdivisions=3)
+        box = trimesh.creation.box(extents=[1.5, 1.5, 1.5])
+        mesh = trimesh.util.concatenate([sphere, box])
+
+        pairs = find_self_intersections(mesh.vertices, mesh.faces)
+        n = len(sphere.faces)
+        a, b = np.meshgrid(np.arange(n), np.arange(n, len(mesh.faces)), indexing="ij")
+        triangles = mesh.vertices[mesh.faces]
+        expected = _triangles_intersect(triangles[a.ravel()], triangles[b.ravel()]).sum()
+        self.assertGreater(expected, 0)
+        self.assertEqual(len(pairs), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.batch import batch_settings, run_batch
+from core.cache import ArtifactCache
+from core.journal import BatchJournal, read_rows
+
+class TestBatchJournal(unittest.TestCase):
+
+    def test_survives_a_torn_last_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = BatchJournal(os.path.join(tmp, "journal.jsonl"))
+            key = BatchJournal.job_key("abc", {"gmsh": "4.15"})
+            journal.append(key, "gear.step", {"Model": "gear.step", "Status": "SUCCESS"})
+            # Crash in the middle of writing the next record
+            with open(journal.path, "a") as f:
+                f.write('{"key": "def", "row": {"Mod')
+            journal.append("k2", "bracket.step", {"Model": "bracket.step", "Status": "TIMEOUT"})
+
+            self.assertEqual(set(journal.latest()), {key, "k2"})
+            # The timed-out job is not done: a resumed batch runs it again
+            self.assertEqual(set(journal.completed()), {key})
+            self.assertEqual([r["Model"] for r in read_rows(journal.path)], ["gear.step", "bracket.step"])
+
+    def test_latest_outcome_decides(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = BatchJournal(os.path.join(tmp, "journal.jsonl"))
+            journal.append("k1", "gear.step", {"Model": "gear.step", "Status": "CRASH"})
+            journal.append("k1", "gear.step", {"Model": "gear.step", "Status": "FAILURE"})
+            journal.append("k2", "bracket.step", {"Model": "bracket.step", "Status": "SUCCESS"})
+            journal.append("k2", "bracket.step", {"Model": "bracket.step", "Status": "TIMEOUT"})
+
+            self.assertEqual(set(journal.completed()), {"k1"})
+
+    def test_resumed_batch_leaves_the_callers_history_alone(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            step_path = os.path.join(tmp, "gear.step")
+            with open(step_path, "w") as f:
+                f.write("ISO-10303-21;")
+            journal = BatchJournal(os.path.join(tmp, "journal.jsonl"))
+            key = BatchJournal.job_key(ArtifactCache.file_hash(step_path), batch_settings())
+            journal.append(key, step_path, {"Model": "gear.step", "Status": "SUCCESS", "Duration_sec": 12.0})
+
+            history = {"bracket.step": 3.0}
+            rows = run_batch([step_path], os.path.join(tmp, "out"), history=history, journal=journal.path)
+            self.assertEqual([row["Status"] for row in rows], ["SUCCESS"])
+            self.assertEqual(history, {"bracket.step": 3.0})
+
+    def test_key_depends_on_settings(self):
+        self.assertNotEqual(BatchJournal.job_key("abc", {"gmsh": "4.15"}),
+                            BatchJournal.job_key("abc", {"gmsh": "4.16"}))
+
+if __name__ == '__main__':
+    unittest.main()
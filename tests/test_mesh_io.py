@@ -0,0 +1,132 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+import trimesh
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.mesh_io import load_mesh, read_meshbin, read_ply, read_stl, stl_view, write_mesh, write_ply, write_stl
+from core.types import Artifact, ArtifactType
+
+class TestMeshPayload(unittest.TestCase):
+
+    def test_payload_is_written_lazily(self):
+        box = trimesh.creation.box()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "box.stl")
+            artifact = Artifact(ArtifactType.STL_FILE, path,
+                                payload=(box.vertices, box.faces), persisted=False)
+
+            # Loading hands back the live mesh without touching the disk
+            mesh = load_mesh(artifact)
+            self.assertIs(load_mesh(artifact), mesh)
+            self.assertFalse(os.path.exists(path))
+
+            self.assertEqual(artifact.materialize(), path)
+            self.assertTrue(artifact.persisted)
+            self.assertEqual(len(trimesh.load(path).faces), len(box.faces))
+
+    def test_file_artifact_is_parsed_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "box.stl")
+            trimesh.creation.box().export(path)
+            artifact = Artifact(ArtifactType.STL_FILE, path)
+
+            mesh = load_mesh(artifact)
+            os.remove(path)
+            self.assertIs(load_mesh(artifact), mesh)
+
+class TestMeshBin(unittest.TestCase):
+
+    def test_roundtrip_is_memory_mapped(self):
+        sphere = trimesh.creation.icosphere(subdivisions=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_mesh(sphere, os.path.join(tmp, "sphere.meshbin"), with_adjacency=True)
+
+            arrays = read_meshbin(path)
+            self.assertIsInstance(arrays["vertices"], np.memmap)
+            np.testing.assert_array_equal(arrays["faces"], sphere.faces)
+            np.testing.assert_array_equal(arrays["face_adjacency"], sphere.face_adjacency)
+
+            artifact = Artifact(ArtifactType.MESH_BIN, path)
+            mesh = load_mesh(artifact)
+            self.assertEqual(len(mesh.vertices), len(sphere.vertices))
+            self.assertTrue(mesh.is_watertight)
+
+            # Copy-on-write: edits to the loaded mesh never reach the file
+            mesh.vertices[0] = [100.0, 100.0, 100.0]
+            np.testing.assert_array_equal(read_meshbin(path)["vertices"][0], sphere.vertices[0])
+
+            stl_path = artifact.materialize(os.path.join(tmp, "sphere.stl"))
+            self.assertEqual(len(trimesh.load(stl_path).faces), len(sphere.faces))
+
+class TestStreamingIO(unittest.TestCase):
+
+    def test_stl_roundtrip_in_chunks(self):
+        sphere = trimesh.creation.icosphere(subdivisions=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            # A chunk size that does not divide the face count
+            path = write_stl(os.path.join(tmp, "sphere.stl"), sphere.vertices, sphere.faces, chunk_faces=7)
+
+            reference = trimesh.load(path)
+            self.assertEqual(len(reference.faces), len(sphere.faces))
+            np.testing.assert_allclose(reference.face_normals, sphere.face_normals, atol=1e-6)
+
+            records = stl_view(path)
+            self.assertIsInstance(records, np.memmap)
+            self.assertFalse(records.flags.writeable)
+            np.testing.assert_allclose(records["vertices"], sphere.vertices[sphere.faces], atol=1e-6)
+
+            vertices, faces = read_stl(path, chunk_faces=7)
+            self.assertEqual(len(vertices), len(sphere.vertices))
+            np.testing.assert_allclose(vertices[faces], sphere.vertices[sphere.faces], atol=1e-6)
+            self.assertTrue(load_mesh(Artifact(ArtifactType.STL_FILE, path)).is_watertight)
+
+    def test_stl_weld_survives_hash_collisions(self):
+        sphere = trimesh.creation.icosphere(subdivisions=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_stl(os.path.join(tmp, "sphere.stl"), sphere.vertices, sphere.faces)
+            # Every corner hashing alike only slows the weld down
+            with patch("core.mesh_io._corner_hash", lambda bits: np.zeros(len(bits), dtype=np.uint64)):
+                vertices, faces = read_stl(path, chunk_faces=7)
+            self.assertEqual(len(vertices), len(sphere.vertices))
+            np.testing.assert_allclose(vertices[faces], sphere.vertices[sphere.faces], atol=1e-6)
+
+    def test_ply_roundtrip_in_chunks(self):
+        sphere = trimesh.creation.icosphere(subdivisions=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_ply(os.path.join(tmp, "sphere.ply"), sphere.vertices, sphere.faces, chunk_faces=7)
+
+            vertices, faces = read_ply(path)
+            np.testing.assert_array_equal(vertices, sphere.vertices)
+            np.testing.assert_array_equal(faces, sphere.faces)
+            reference = trimesh.load(path, process=False)
+            np.testing.assert_array_equal(reference.faces, sphere.faces)
+
+            # trimesh's own binary PLY is read the same way
+            other = os.path.join(tmp, "other.ply")
+            sphere.export(other)
+            vertices, faces = read_ply(other)
+            np.testing.assert_allclose(vertices[faces], sphere.vertices[sphere.faces])
+
+    def test_unsupported_files_fall_back_to_trimesh(self):
+        box = trimesh.creation.box()
+        with tempfile.TemporaryDirectory() as tmp:
+            ascii_stl = os.path.join(tmp, "box.stl")
+            box.export(ascii_stl, file_type="stl_ascii")
+            with self.assertRaises(ValueError):
+                read_stl(ascii_stl)
+            self.assertEqual(len(load_mesh(Artifact(ArtifactType.STL_FILE, ascii_stl)).faces), 12)
+
+            ascii_ply = os.path.join(tmp, "box.ply")
+            box.export(ascii_ply, encoding="ascii")
+            self.assertIsNone(read_ply(ascii_ply))
+            self.assertEqual(len(load_mesh(Artifact(ArtifactType.STL_FILE, ascii_ply)).faces), 12)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+import os
+import sys
+
+import trimesh
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.optimizer import OptimizerAgent
+from core.types import AgentStatus, Artifact, ArtifactType
+
+class TestRepairPlan(unittest.TestCase):
+
+    def test_single_pass_skips_repairs_that_no_longer_apply(self):
+        sphere = trimesh.creation.icosphere(subdivisions=2)
+        holed = trimesh.Trimesh(sphere.vertices, sphere.faces[1:])
+        artifact = Artifact(ArtifactType.MESH_BIN, "holed.meshbin", payload=holed, persisted=False)
+
+        res = OptimizerAgent().run(artifact, "out", task="repair_plan",
+                                   failures=["inconsistent_winding", "is_watertight"])
+
+        self.assertEqual(res.status, AgentStatus.SUCCESS)
+        # Filling the hole leaves a consistently wound mesh, so the winding step is skipped
+        self.assertEqual(res.artifact.metadata["applied"], ["repair_watertight"])
+        self.assertTrue(res.artifact.payload.is_watertight)
+        self.assertFalse(res.artifact.persisted)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import trimesh
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.quality import element_quality
+
+class TestElementQuality(unittest.TestCase):
+
+    def test_equilateral_triangle(self):
+        vertices = np.array([[0, 0, 0], [1, 0, 0], [0.5, np.sqrt(3) / 2, 0]])
+        q = element_quality(vertices, np.array([[0, 1, 2]]))
+        self.assertAlmostEqual(q["jacobian"]["min"], 1.0)
+        self.assertAlmostEqual(q["aspect_ratio"]["max"], 1.0)
+        self.assertAlmostEqual(q["min_angle"]["min"], 60.0)
+        self.assertAlmostEqual(q["skewness"]["max"], 0.0)
+        self.assertEqual(q["bad_element_count"], 0)
+
+    def test_chunking_matches_single_pass(self):
+        mesh = trimesh.creation.icosphere(subdivisions=3)
+        # Break the sphere's symmetry so the worst elements are unique
+        mesh.vertices += np.random.default_rng(0).normal(scale=1e-3, size=mesh.vertices.shape)
+        whole = element_quality(mesh.vertices, mesh.faces)
+        chunked = element_quality(mesh.vertices, mesh.faces, chunk_size=97)
+        for name in ("jacobian", "aspect_ratio", "min_angle", "max_angle", "skewness"):
+            self.assertAlmostEqual(whole[name]["mean"], chunked[name]["mean"])
+            self.assertEqual(whole[name]["histogram"]["counts"], chunked[name]["histogram"]["counts"])
+        self.assertEqual(sorted(whole["worst_faces"]), sorted(chunked["worst_faces"]))
+
+    def test_sliver_is_flagged_and_ranked_worst(self):
+        mesh = trimesh.creation.icosphere(subdivisions=2)
+        vertices = np.vstack([mesh.vertices, [[10, 0, 0], [20, 0, 0], [15, 0.01, 0]]])
+        n = len(mesh.vertices)
+        faces = np.vstack([mesh.faces, [[n, n + 1, n + 2]]])
+
+        q = element_quality(vertices, faces, aspect_ratio_limit=50.0, worst_count=5)
+        self.assertEqual(q["bad_element_count"], 1)
+        self.assertEqual(q["worst_faces"][0], len(faces) - 1)
+
+if __name__ == '__main__':
+    unittest.main()
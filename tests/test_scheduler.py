@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.scheduler import Scheduler, estimate_cost
+
+def fake_job(input_path, on_stage=None):
+    # Stands in for batch.process_model; "hang" models never leave the mesh stage
+    on_stage("parse")
+    on_stage("mesh")
+    if "hang" in input_path:
+        time.sleep(60)
+    on_stage("iteration")
+    on_stage("validate")
+    on_stage("fidelity")
+    if "slow-fidelity" in input_path:
+        time.sleep(60)
+    return {"Model": input_path, "Status": "SUCCESS"}
+
+def fake_failure_row(input_path, status, error, duration):
+    return {"Model": input_path, "Status": status, "Error": error}
+
+class TestScheduler(unittest.TestCase):
+
+    def test_largest_first_and_stage_timeout(self):
+        scheduler = Scheduler(1, fake_job, failure_row=fake_failure_row,
+                              stage_timeouts={"mesh": 1.0}, poll_interval=0.05)
+        rows = []
+        start = time.monotonic()
+        scheduler.run([("small", 1.0), ("hang", 5.0), ("large", 10.0)], rows.append)
+
+        self.assertEqual([r["Model"] for r in rows], ["large", "hang", "small"])
+        self.assertEqual([r["Status"] for r in rows], ["SUCCESS", "TIMEOUT", "SUCCESS"])
+        self.assertIn("mesh", rows[1]["Error"])
+        # The hung worker was killed and replaced instead of blocking the batch
+        self.assertLess(time.monotonic() - start, 30)
+
+    def test_later_stages_have_their_own_timers(self):
+        # Time spent measuring fidelity is not charged to validation
+        scheduler = Scheduler(1, fake_job, failure_row=fake_failure_row,
+                              stage_timeouts={"validate": 1.0, "fidelity": 2.0}, poll_interval=0.05)
+        rows = []
+        scheduler.run([("slow-fidelity", 1.0)], rows.append)
+        self.assertEqual(rows[0]["Status"], "TIMEOUT")
+        self.assertIn("fidelity exceeded 2s", rows[0]["Error"])
+
+    def test_cost_signals(self):
+        with tempfile.NamedTemporaryFile(suffix=".step") as f:
+            f.write(b"x" * 1024 ** 2)
+            f.flush()
+            name = os.path.basename(f.name)
+            self.assertEqual(estimate_cost(f.name, history={name: 42.0}), (42.0, "history"))
+            self.assertEqual(estimate_cost(f.name, surface_count=200)[1], "surfaces")
+            # Assemblies cost more than a single solid with the same surfaces
+            self.assertGreater(estimate_cost(f.name, surface_count=200, volume_count=12)[0],
+                               estimate_cost(f.name, surface_count=200, volume_count=1)[0])
+            seconds, signal = estimate_cost(f.name)
+            self.assertEqual(signal, "file_size")
+            self.assertGreater(seconds, 0)
+
+if __name__ == '__main__':
+    unittest.main()
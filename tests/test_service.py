@@ -0,0 +1,84 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.service import JobQueue, MeshService, make_http_server
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_job_lifecycle(self):
+        job_id = self.queue.submit("part.step", {"face_budget": 1000}, job_id="job-1")
+        self.assertEqual(self.queue.status(job_id)["state"], "pending")
+
+        job = self.queue.claim("w1")
+        self.assertEqual((job["id"], job["options"]), ("job-1", {"face_budget": 1000}))
+        # Claimed exactly once
+        self.assertIsNone(self.queue.claim("w2"))
+        self.assertEqual(self.queue.status(job_id), {"id": "job-1", "state": "running", "worker": "w1"})
+
+        self.queue.complete(job, "w1", {"status": "SUCCESS"})
+        status = self.queue.wait(job_id, timeout=1.0)
+        self.assertEqual((status["state"], status["status"]), ("done", "SUCCESS"))
+
+    def test_rejects_unknown_options_and_ids(self):
+        with self.assertRaises(ValueError):
+            self.queue.submit("part.step", {"rm_rf": True})
+        with self.assertRaises(ValueError):
+            self.queue.submit("part.step", job_id="../escape")
+        self.assertEqual(self.queue.status("../escape")["state"], "unknown")
+
+    def test_dead_worker_jobs_are_failed(self):
+        job_id = self.queue.submit("part.step")
+        self.queue.claim("w1")
+        self.assertEqual(self.queue.recover("w1"), [job_id])
+        self.assertEqual(self.queue.status(job_id)["status"], "CRASH")
+
+    def test_jobs_file_is_tailed(self):
+        jobs_file = os.path.join(self.tmp.name, "jobs.jsonl")
+        service = MeshService(self.tmp.name, workers=1)
+        with open(jobs_file, "w") as f:
+            f.write(json.dumps({"id": "a", "input_path": "a.step"}) + "\n")
+            f.write(json.dumps({"id": "b", "input_path": "b.step"}))  # still being written
+        self.assertEqual(service.poll_jobs_file(jobs_file), ["a"])
+        with open(jobs_file, "a") as f:
+            f.write("\n")
+        self.assertEqual(service.poll_jobs_file(jobs_file), ["b"])
+        self.assertEqual(service.poll_jobs_file(jobs_file), [])
+
+        # A restarted service picks up where the last one stopped
+        with open(jobs_file, "a") as f:
+            f.write(json.dumps({"id": "c", "input_path": "c.step"}) + "\n")
+        self.assertEqual(MeshService(self.tmp.name, workers=1).poll_jobs_file(jobs_file), ["c"])
+
+    def test_http_rejects_bad_wait_before_submitting(self):
+        server = make_http_server(self.queue, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{server.server_address[1]}/jobs", method="POST",
+                data=json.dumps({"id": "w", "input_path": "w.step", "wait": "soon"}).encode("utf-8"))
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                urllib.request.urlopen(request)
+            self.assertEqual(raised.exception.code, 400)
+            self.assertEqual(self.queue.status("w")["state"], "unknown")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
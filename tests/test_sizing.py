@@ -0,0 +1,55 @@
+import unittest
+import math
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.sizing import AdaptiveSizing, curvature_size, triangle_count
+
+# Synthetic analysis: a large flat face, a tight fillet and a thin strip
+ANALYSIS = {
+    "diagonal": 100.0,
+    "surfaces": {
+        1: {"area": 5000.0, "size": math.inf, "feature": 50.0},
+        2: {"area": 50.0, "size": 0.5, "feature": 10.0},
+        3: {"area": 20.0, "size": math.inf, "feature": 0.4},
+    },
+    "curves": {10: {"length": 10.0, "size": 0.5}, 11: {"length": 100.0, "size": math.inf}},
+}
+
+class TestSizing(unittest.TestCase):
+
+    def test_curvature_size_bounds_chord_deviation(self):
+        self.assertEqual(curvature_size(0.0, 0.1), math.inf)
+        radius, tolerance = 10.0, 0.1
+        chord = curvature_size(1.0 / radius, tolerance)
+        sagitta = radius - math.sqrt(radius ** 2 - (chord / 2) ** 2)
+        self.assertAlmostEqual(sagitta, tolerance)
+        # Bends tighter than the tolerance get two elements across their diameter
+        self.assertEqual(curvature_size(1.0 / 0.05, tolerance), 0.1)
+
+    def test_sizes_clamp_and_keep_features(self):
+        sizes = AdaptiveSizing(size_min=1.0, size_max=20.0).sizes(ANALYSIS, mesh_factor=0.5)
+        # Field values are divided by the factor Gmsh multiplies them with again
+        final = {tag: size * 0.5 for tag, size in sizes["surfaces"].items()}
+        self.assertEqual(final, {1: 20.0, 2: 1.0, 3: 1.0})
+        # Straight curves are left to their surfaces
+        self.assertEqual(list(sizes["curves"]), [10])
+
+    def test_element_budget_coarsens(self):
+        sizing = AdaptiveSizing(element_budget=200)
+        unlimited = AdaptiveSizing().sizes(ANALYSIS, mesh_factor=1.0)
+        limited = sizing.sizes(ANALYSIS, mesh_factor=1.0)
+
+        def estimate(sizes):
+            return sum(triangle_count(s["area"], sizes["surfaces"][tag]) for tag, s in ANALYSIS["surfaces"].items())
+
+        self.assertGreater(estimate(unlimited), 200)
+        self.assertLess(estimate(limited), estimate(unlimited))
+        # The thin strip's feature size is a cap the budget never coarsens past
+        self.assertLessEqual(limited["surfaces"][3], 0.4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import trimesh
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.smoothing import pinned_vertices, smooth
+from core.quality import triangle_jacobian
+
+def noisy_sphere(scale=0.03):
+    sphere = trimesh.creation.icosphere(subdivisions=3)
+    rng = np.random.default_rng(0)
+    return sphere.vertices + rng.normal(scale=scale, size=sphere.vertices.shape), sphere.faces, sphere.volume
+
+class TestSmoothing(unittest.TestCase):
+
+    def test_box_edges_are_pinned(self):
+        box = trimesh.creation.box().subdivide().subdivide()
+        pinned = pinned_vertices(box.vertices, box.faces)
+        # Every pinned vertex lies on a box edge (two coordinates at +-0.5)
+        on_edge = (np.isclose(np.abs(box.vertices), 0.5).sum(axis=1) >= 2)
+        np.testing.assert_array_equal(pinned, on_edge)
+
+        # Flat faces cannot improve a regular box mesh, so nothing changes
+        vertices, info = smooth(box.vertices, box.faces)
+        np.testing.assert_allclose(vertices[pinned], box.vertices[pinned])
+
+    def test_taubin_improves_quality_and_keeps_volume(self):
+        vertices, faces, volume = noisy_sphere()
+        smoothed, info = smooth(vertices, faces, feature_angle=180.0)
+
+        self.assertGreater(info["iterations"], 0)
+        self.assertGreater(info["quality_after"][0], info["quality_before"][0])
+        self.assertGreater(info["quality_after"][1], info["quality_before"][1])
+        self.assertAlmostEqual(triangle_jacobian(smoothed, faces).min(), info["quality_after"][0])
+        # Unlike plain Laplacian smoothing, the sphere does not shrink
+        self.assertAlmostEqual(trimesh.Trimesh(smoothed, faces).volume, volume, delta=volume * 0.01)
+
+    def test_below_quality_moves_only_poor_elements(self):
+        vertices, faces, _ = noisy_sphere()
+        quality = triangle_jacobian(vertices, faces)
+        poor = np.unique(faces[quality < 0.6])
+        smoothed, info = smooth(vertices, faces, method="quality", feature_angle=180.0, below_quality=0.6)
+
+        moved = np.flatnonzero(np.any(smoothed != vertices, axis=1))
+        self.assertTrue(len(moved))
+        self.assertTrue(np.isin(moved, poor).all())
+        self.assertEqual(info["moved_vertices"], len(poor))
+        self.assertGreaterEqual(info["quality_after"][0], info["quality_before"][0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,13 +2,31 @@ import unittest
 from unittest.mock import MagicMock, patch
 import os
 import sys
+import tempfile
+
+import gmsh
+import numpy as np
+import trimesh
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from core.mesh_io import load_mesh
+from core.session import GmshSession
 from core.supervisor import Supervisor
 from core.types import AgentResult, AgentStatus, Artifact, ArtifactType
 
+def write_separate_solids(path):
+    # Four identical cylinders next to a plate, none of them touching
+    gmsh.initialize()
+    gmsh.option.setNumber("General.Terminal", 0)
+    for i in range(4):
+        gmsh.model.occ.addCylinder(3 * i, 0, 0, 0, 0, 2, 1)
+    gmsh.model.occ.addBox(0, 5, 0, 10, 4, 1)
+    gmsh.model.occ.synchronize()
+    gmsh.write(path)
+    gmsh.finalize()
+
 class TestACMS(unittest.TestCase):
     
     @patch('core.supervisor.ParserAgent')
@@ -79,5 +97,196 @@ class TestACMS(unittest.TestCase):
                 optimizer_instance.run.assert_called_once() # Called once for repair
                 print("\nTest passed: Supervisor correctly triggered repair loop.")
 
+    @patch('core.supervisor.ParserAgent')
+    def test_remesh_only_failing_surfaces(self, MockParser):
+        MockParser.return_value.run.return_value = AgentResult(
+            status=AgentStatus.SUCCESS,
+            artifact=Artifact(ArtifactType.BREP_FILE, "mock_model.brep", {"surface_count": 10}),
+            log="Mock Parsed"
+        )
+
+        with patch('core.supervisor.MesherAgent') as MockMesher, \
+             patch('core.supervisor.ValidatorAgent') as MockValidator, \
+             patch('core.supervisor.OptimizerAgent'):
+
+            mesher_instance = MockMesher.return_value
+            mesher_instance.run.return_value = AgentResult(
+                status=AgentStatus.SUCCESS,
+                artifact=Artifact(ArtifactType.STL_FILE, "mock_mesh.stl", {"face_count": 100}),
+                log="Mock Meshed"
+            )
+            mesher_instance.remesh_surfaces.return_value = AgentResult(
+                status=AgentStatus.SUCCESS,
+                artifact=Artifact(ArtifactType.STL_FILE, "mock_mesh_local.stl", {"face_count": 120}),
+                log="Mock Remeshed"
+            )
+
+            # Real self-intersections are not repairable, so the Supervisor remeshes
+            MockValidator.return_value.run.side_effect = [
+                AgentResult(
+                    status=AgentStatus.SUCCESS,
+                    artifact=Artifact(ArtifactType.VALIDATION_REPORT, "mem",
+                                      {"status": "FAIL", "failures": ["self_intersection"], "failing_surfaces": [3, 7]}),
+                ),
+                AgentResult(
+                    status=AgentStatus.SUCCESS,
+                    artifact=Artifact(ArtifactType.VALIDATION_REPORT, "mem", {"status": "SUCCESS"}),
+                )
+            ]
+
+            supervisor = Supervisor(workspace_dir="test_workspace")
+            with patch('os.path.exists', return_value=True), \
+                 patch('os.makedirs'):
+                result = supervisor.run("dummy.step")
+
+            self.assertEqual(result["status"], "SUCCESS")
+            mesher_instance.run.assert_called_once()  # only the initial mesh
+            args, kwargs = mesher_instance.remesh_surfaces.call_args
+            self.assertEqual(args[2], [3, 7])
+
+    @patch('core.supervisor.load_mesh')
+    @patch('core.supervisor.FidelityCheck')
+    @patch('core.supervisor.ParserAgent')
+    def test_repair_that_leaves_the_cad_is_rejected(self, MockParser, MockFidelity, mock_load_mesh):
+        MockParser.return_value.run.return_value = AgentResult(
+            status=AgentStatus.SUCCESS,
+            artifact=Artifact(ArtifactType.BREP_FILE, "mock_model.brep", {"surface_count": 10}),
+            log="Mock Parsed"
+        )
+        # Initial mesh, repaired mesh (too far from the CAD), remesh
+        MockFidelity.return_value.measure.side_effect = [
+            {"hausdorff_relative": 0.001, "rms_relative": 0.0005},
+            {"hausdorff_relative": 0.02, "rms_relative": 0.002},
+            {"hausdorff_relative": 0.0008, "rms_relative": 0.0004},
+        ]
+
+        with patch('core.supervisor.MesherAgent') as MockMesher, \
+             patch('core.supervisor.ValidatorAgent') as MockValidator, \
+             patch('core.supervisor.OptimizerAgent') as MockOptimizer:
+
+            mesher_instance = MockMesher.return_value
+            mesher_instance.run.return_value = AgentResult(
+                status=AgentStatus.SUCCESS,
+                artifact=Artifact(ArtifactType.STL_FILE, "mock_mesh.stl", {"face_count": 100}),
+                log="Mock Meshed"
+            )
+            MockOptimizer.return_value.run.return_value = AgentResult(
+                status=AgentStatus.SUCCESS,
+                artifact=Artifact(ArtifactType.STL_FILE, "mock_mesh_fixed.stl"),
+                log="Mock Repaired"
+            )
+            MockValidator.return_value.run.side_effect = [
+                AgentResult(
+                    status=AgentStatus.SUCCESS,
+                    artifact=Artifact(ArtifactType.VALIDATION_REPORT, "mem",
+                                      {"status": "FAIL", "failures": ["bad_aspect_ratio"]}),
+                ),
+                AgentResult(
+                    status=AgentStatus.SUCCESS,
+                    artifact=Artifact(ArtifactType.VALIDATION_REPORT, "mem", {"status": "SUCCESS"}),
+                )
+            ]
+
+            supervisor = Supervisor(workspace_dir="test_workspace", session=MagicMock(), max_deviation=0.01)
+            with patch('os.path.exists', return_value=True), \
+                 patch('os.makedirs'):
+                result = supervisor.run("dummy.step")
+
+            self.assertEqual(result["status"], "SUCCESS")
+            MockOptimizer.return_value.run.assert_called_once()
+            # The repair was dropped and the part remeshed instead
+            self.assertEqual(mesher_instance.run.call_count, 2)
+            self.assertEqual(result["fidelity"]["hausdorff_relative"], 0.0008)
+
+    @patch('core.supervisor.FinenessSearch')
+    @patch('core.supervisor.FidelityCheck')
+    @patch('core.supervisor.ParserAgent')
+    def test_rejected_repair_leaves_the_mesh_unchanged(self, MockParser, MockFidelity, MockSearch):
+        MockParser.return_value.run.return_value = AgentResult(
+            status=AgentStatus.SUCCESS,
+            artifact=Artifact(ArtifactType.BREP_FILE, "mock_model.brep", {"surface_count": 10}),
+            log="Mock Parsed"
+        )
+        MockFidelity.return_value.measure.side_effect = [
+            {"hausdorff_relative": 0.001, "rms_relative": 0.0005},
+            {"hausdorff_relative": 0.02, "rms_relative": 0.002},
+        ]
+        # No finer setting left: the current mesh is written as it is
+        MockSearch.return_value.initial.return_value = 1.0
+        MockSearch.return_value.next.return_value = None
+
+        box = trimesh.creation.box()
+        original = box.vertices.copy()
+
+        def repair_in_place(artifact, output_dir, task, failures, bodies):
+            # Like the Optimizer, repair the input payload itself
+            mesh = load_mesh(artifact)
+            mesh.vertices = mesh.vertices * 1.5
+            return AgentResult(status=AgentStatus.SUCCESS, log="Mock Repaired",
+                               artifact=Artifact(ArtifactType.MESH_BIN, "mock_mesh_fixed.meshbin",
+                                                 payload=mesh, persisted=False))
+
+        with patch('core.supervisor.MesherAgent') as MockMesher, \
+             patch('core.supervisor.ValidatorAgent') as MockValidator, \
+             patch('core.supervisor.OptimizerAgent') as MockOptimizer, \
+             patch.object(Supervisor, '_finalize', return_value="mock_mesh.stl") as finalize:
+
+            MockMesher.return_value.run.return_value = AgentResult(
+                status=AgentStatus.SUCCESS,
+                artifact=Artifact(ArtifactType.STL_FILE, "mock_mesh.stl", {"face_count": 12}, payload=box),
+                log="Mock Meshed"
+            )
+            MockOptimizer.return_value.run.side_effect = repair_in_place
+            MockValidator.return_value.run.return_value = AgentResult(
+                status=AgentStatus.SUCCESS,
+                artifact=Artifact(ArtifactType.VALIDATION_REPORT, "mem",
+                                  {"status": "FAIL", "failures": ["bad_aspect_ratio"]}),
+            )
+
+            supervisor = Supervisor(workspace_dir="test_workspace", session=MagicMock(), max_deviation=0.01)
+            with patch('os.path.exists', return_value=True), \
+                 patch('os.makedirs'):
+                result = supervisor.run("dummy.step")
+
+            self.assertEqual(result["error"], "remesh_search_exhausted")
+            finalized = finalize.call_args[0][0]
+            np.testing.assert_array_equal(load_mesh(finalized).vertices, original)
+
+    def test_every_solid_reaches_the_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            step_path = os.path.join(tmp, "solids.step")
+            write_separate_solids(step_path)
+            with GmshSession(terminal=0) as session:
+                result = Supervisor(workspace_dir=tmp, session=session).run(step_path)
+
+            self.assertEqual(result["status"], "SUCCESS")
+            self.assertEqual(result["iterations"], 1)
+            self.assertEqual(trimesh.load(result["final_mesh_path"]).body_count, 5)
+
+    def test_instances_off_skips_fingerprinting(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            step_path = os.path.join(tmp, "solids.step")
+            write_separate_solids(step_path)
+            with GmshSession(terminal=0) as session, \
+                 patch('agents.parser.find_instances') as parser_find, \
+                 patch('agents.mesher.find_instances') as mesher_find:
+                result = Supervisor(workspace_dir=tmp, session=session, dedupe_instances=False).run(step_path)
+
+            self.assertEqual(result["status"], "SUCCESS")
+            parser_find.assert_not_called()
+            mesher_find.assert_not_called()
+            self.assertEqual(trimesh.load(result["final_mesh_path"]).body_count, 5)
+
+    def test_assembly_keeps_every_body(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            step_path = os.path.join(tmp, "solids.step")
+            write_separate_solids(step_path)
+            with GmshSession(terminal=0) as session:
+                result = Supervisor(workspace_dir=tmp, session=session, assembly_workers=2).run(step_path)
+
+            self.assertEqual(result["status"], "SUCCESS")
+            self.assertEqual(result["iterations"], 1)
+            self.assertEqual(trimesh.load(result["final_mesh_path"]).body_count, 5)
+
 if __name__ == '__main__':
     unittest.main()
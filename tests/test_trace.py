@@ -0,0 +1,59 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import trace
+from core.trace import Tracer
+
+class TestTracer(unittest.TestCase):
+
+    def test_nested_spans_as_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.jsonl")
+            with Tracer(path, trace_malloc=True).activate():
+                with trace.span("run", model="part.step"):
+                    with trace.span("mesh", fineness=0.5) as mesh_span:
+                        data = bytearray(4 * 1024 ** 2)
+                        mesh_span["faces_after"] = 100
+                    del data
+
+            with open(path) as f:
+                spans = [json.loads(line) for line in f]
+            # Children finish (and are written) before their parent
+            self.assertEqual([s["name"] for s in spans], ["mesh", "run"])
+            mesh, run = spans
+            self.assertEqual((mesh["depth"], mesh["faces_after"], mesh["fineness"]), (1, 100, 0.5))
+            self.assertGreaterEqual(mesh["malloc_peak_mb"], 4.0)
+            # The parent's peak includes the child's allocation
+            self.assertGreaterEqual(run["malloc_peak_mb"], mesh["malloc_peak_mb"])
+            self.assertGreaterEqual(run["duration_s"], mesh["duration_s"])
+
+    def test_chrome_trace_format(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            with Tracer(path).activate():
+                with trace.span("parse", surfaces=3):
+                    pass
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+            self.assertEqual(events[0]["name"], "parse")
+            self.assertEqual(events[0]["ph"], "X")
+            self.assertEqual(events[0]["args"]["surfaces"], 3)
+
+    def test_span_without_active_tracer_is_a_no_op(self):
+        with trace.span("validate", faces=10) as attrs:
+            attrs["status"] = "SUCCESS"
+        self.assertEqual(attrs, {"faces": 10, "status": "SUCCESS"})
+        tracer = Tracer()
+        with tracer.activate():
+            with trace.span("validate"):
+                pass
+        self.assertEqual(tracer.spans, [])
+
+if __name__ == '__main__':
+    unittest.main()
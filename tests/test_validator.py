@@ -0,0 +1,93 @@
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import trimesh
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.validator import ValidatorAgent
+from agents.optimizer import REPAIR_PLAN
+from core.quality import element_quality
+from core.types import AgentStatus, Artifact, ArtifactType
+
+class TestValidator(unittest.TestCase):
+
+    def test_open_edges_map_to_surfaces(self):
+        box = trimesh.creation.box()
+        # Tag the faces by the box side they belong to, then cut a hole into one side
+        face_surfaces = np.argmax(np.abs(box.face_normals), axis=1) * 2 + (box.face_normals.sum(axis=1) > 0) + 1
+        hole = 3
+        keep = np.ones(len(box.faces), dtype=bool)
+        keep[hole] = False
+        artifact = Artifact(ArtifactType.MESH_BIN, "memory.meshbin",
+                            metadata={"face_surfaces": face_surfaces[keep]},
+                            payload=(box.vertices, box.faces[keep]), persisted=False)
+
+        report = ValidatorAgent().run(artifact).artifact.metadata
+        self.assertIn("is_watertight", report["failures"])
+        # Faces around the hole: its own side and the sides it borders
+        self.assertIn(int(face_surfaces[hole]), report["failing_surfaces"])
+        self.assertLess(len(report["failing_surfaces"]), 6)
+
+    def test_untagged_mesh_has_no_failing_surfaces(self):
+        box = trimesh.creation.box()
+        artifact = Artifact(ArtifactType.MESH_BIN, "memory.meshbin",
+                            payload=(box.vertices, box.faces[1:]), persisted=False)
+        report = ValidatorAgent().run(artifact).artifact.metadata
+        self.assertEqual(report["failing_surfaces"], [])
+
+    def test_components_count_against_the_cad_solids(self):
+        boxes = trimesh.util.concatenate([trimesh.creation.box(), trimesh.creation.box().apply_translation([3, 0, 0])])
+        artifact = Artifact(ArtifactType.MESH_BIN, "memory.meshbin",
+                            payload=(boxes.vertices, boxes.faces), persisted=False)
+        self.assertIn("disconnected_components", ValidatorAgent().run(artifact).artifact.metadata["failures"])
+        self.assertEqual(ValidatorAgent().run(artifact, bodies=2).artifact.metadata["status"], "SUCCESS")
+
+    def test_quality_errors_fail_the_validation(self):
+        box = trimesh.creation.box()
+        artifact = Artifact(ArtifactType.MESH_BIN, "memory.meshbin",
+                            payload=(box.vertices, box.faces), persisted=False)
+        with patch("agents.validator.element_quality", side_effect=MemoryError("out of memory")):
+            result = ValidatorAgent().run(artifact)
+        self.assertEqual(result.status, AgentStatus.FAILURE)
+        self.assertIn("out of memory", result.error)
+
+    def test_decision_mode_skips_checks_that_cannot_change_it(self):
+        repairable = {failure for failure, _ in REPAIR_PLAN}
+        box = trimesh.creation.box().subdivide()
+        artifact = Artifact(ArtifactType.MESH_BIN, "memory.meshbin",
+                            payload=(box.vertices, box.faces[1:]), persisted=False)
+
+        full = ValidatorAgent().run(artifact).artifact.metadata
+        early = ValidatorAgent().run(artifact, stop_at=repairable).artifact.metadata
+        self.assertEqual(full["failures"], early["failures"])
+        self.assertEqual(full["skipped"], [])
+        self.assertEqual(full["metrics"]["self_intersection_count"], 0)
+        # Intersections could only add a failure that is not repaired in place
+        self.assertEqual(early["skipped"], ["intersections"])
+        self.assertIsNone(early["metrics"]["self_intersection_count"])
+        # Quality still ran, but only as far as the decision needs
+        self.assertAlmostEqual(early["metrics"]["min_jacobian"], full["metrics"]["min_jacobian"])
+        self.assertNotIn("histogram", early["quality"]["jacobian"])
+
+    def test_passing_mesh_gets_full_report_in_decision_mode(self):
+        sphere = trimesh.creation.icosphere(subdivisions=2)
+        artifact = Artifact(ArtifactType.MESH_BIN, "memory.meshbin",
+                            payload=(sphere.vertices, sphere.faces), persisted=False)
+        with patch("agents.validator.element_quality", wraps=element_quality) as full_quality:
+            report = ValidatorAgent().run(artifact, stop_at={"is_watertight"}).artifact.metadata
+
+        self.assertEqual(report["status"], "SUCCESS")
+        # The quality tier runs once, with the full statistics
+        full_quality.assert_called_once()
+        self.assertEqual(report["skipped"], [])
+        self.assertEqual(report["metrics"]["euler_number"], 2)
+        self.assertIn("histogram", report["quality"]["jacobian"])
+        self.assertEqual(len(report["worst_faces"]), 50)
+
+if __name__ == '__main__':
+    unittest.main()